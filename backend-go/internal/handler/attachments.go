@@ -164,7 +164,7 @@ func (h *AttachmentsHandler) Upload(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	id := uuid.New().String()
+	id := repository.NewID()
 	fk := fullKey(userID, id)
 	tk := thumbKey(userID, id)
 
@@ -9,11 +9,11 @@ import (
 	"unicode/utf8"
 
 	"github.com/go-chi/chi/v5"
-	"github.com/google/uuid"
 
 	"github.com/quiverscore/backend-go/internal/auth"
 	"github.com/quiverscore/backend-go/internal/config"
 	"github.com/quiverscore/backend-go/internal/middleware"
+	"github.com/quiverscore/backend-go/internal/repository"
 	"github.com/quiverscore/backend-go/internal/storage"
 )
 
@@ -117,7 +117,7 @@ func (h *AuthHandler) Register(w http.ResponseWriter, r *http.Request) {
 		displayName = *req.DisplayName
 	}
 
-	userID := uuid.New().String()
+	userID := repository.NewID()
 	err = h.Users.Create(ctx, userID, req.Email, req.Username, hashedPw, displayName, verificationToken)
 	if err != nil {
 		if strings.Contains(err.Error(), "duplicate key") || strings.Contains(err.Error(), "unique constraint") {
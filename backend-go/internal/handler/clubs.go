@@ -9,7 +9,6 @@ import (
 	"time"
 
 	"github.com/go-chi/chi/v5"
-	"github.com/google/uuid"
 
 	"github.com/quiverscore/backend-go/internal/config"
 	"github.com/quiverscore/backend-go/internal/middleware"
@@ -166,7 +165,7 @@ func (h *ClubsHandler) Create(w http.ResponseWriter, r *http.Request) {
 	}
 
 	userID := middleware.GetUserID(r.Context())
-	id := uuid.New().String()
+	id := repository.NewID()
 
 	club, err := h.Clubs.Create(r.Context(), id, req.Name, req.Description, userID)
 	if err != nil {
@@ -254,7 +253,7 @@ func (h *ClubsHandler) CreateInvite(w http.ResponseWriter, r *http.Request) {
 	}
 
 	code := generateInviteCode()
-	id := uuid.New().String()
+	id := repository.NewID()
 
 	var expiresAt *time.Time
 	if req.ExpiresInHours != nil {
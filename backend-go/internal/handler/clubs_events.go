@@ -5,9 +5,9 @@ import (
 	"time"
 
 	"github.com/go-chi/chi/v5"
-	"github.com/google/uuid"
 
 	"github.com/quiverscore/backend-go/internal/middleware"
+	"github.com/quiverscore/backend-go/internal/repository"
 )
 
 // ── Events ────────────────────────────────────────────────────────────
@@ -35,7 +35,7 @@ func (h *ClubsHandler) CreateEvent(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	id := uuid.New().String()
+	id := repository.NewID()
 	event, err := h.Clubs.CreateEvent(r.Context(), id, clubID, userID, req.Name, req.Description, req.TemplateID, eventDate, req.Location)
 	if err != nil {
 		Error(w, http.StatusUnauthorized, "Only owner or admin can create events")
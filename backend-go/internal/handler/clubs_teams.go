@@ -4,7 +4,6 @@ import (
 	"net/http"
 
 	"github.com/go-chi/chi/v5"
-	"github.com/google/uuid"
 
 	"github.com/quiverscore/backend-go/internal/middleware"
 	"github.com/quiverscore/backend-go/internal/repository"
@@ -27,7 +26,7 @@ func (h *ClubsHandler) CreateTeam(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	id := uuid.New().String()
+	id := repository.NewID()
 	team, err := h.Clubs.CreateTeam(r.Context(), id, clubID, userID, req.Name, req.Description, req.LeaderID)
 	if err != nil {
 		Error(w, http.StatusUnauthorized, "Only owner or admin can create teams")
@@ -6,7 +6,6 @@ import (
 	"time"
 
 	"github.com/go-chi/chi/v5"
-	"github.com/google/uuid"
 
 	"github.com/quiverscore/backend-go/internal/middleware"
 	"github.com/quiverscore/backend-go/internal/repository"
@@ -49,7 +48,7 @@ func (h *ClubsHandler) CreateTournament(w http.ResponseWriter, r *http.Request)
 		return
 	}
 
-	id := uuid.New().String()
+	id := repository.NewID()
 	tourney, err := h.Clubs.CreateTournament(r.Context(), id, clubID, userID, req.Name, req.Description, req.TemplateID, req.MaxParticipants, regDeadline, startDate, endDate)
 	if err != nil {
 		Error(w, http.StatusUnauthorized, "Only owner or admin can create tournaments")
@@ -212,7 +211,7 @@ func (h *ClubsHandler) AddTournamentRound(w http.ResponseWriter, r *http.Request
 		return
 	}
 
-	id := uuid.New().String()
+	id := repository.NewID()
 	round, err := h.Clubs.AddTournamentRound(r.Context(), id, clubID, tournamentID, userID, req.Name, req.TemplateID, req.Advancement, req.RoundType)
 	if err != nil {
 		Error(w, http.StatusForbidden, "Cannot add round")
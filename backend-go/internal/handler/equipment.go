@@ -89,7 +89,7 @@ func (h *EquipmentHandler) Create(w http.ResponseWriter, r *http.Request) {
 	}
 
 	userID := middleware.GetUserID(r.Context())
-	id := uuid.New().String()
+	id := repository.NewID()
 
 	e, err := h.Equipment.Create(r.Context(), id, userID, req.Category, req.Name, req.Brand, req.Model, req.Specs, req.Notes)
 	if err != nil {
@@ -5,8 +5,11 @@ import (
 	"context"
 	"encoding/csv"
 	"encoding/json"
+	"errors"
 	"fmt"
 	"net/http"
+	"slices"
+	"strconv"
 	"time"
 
 	"github.com/go-chi/chi/v5"
@@ -29,9 +32,9 @@ type ScoringRepository interface {
 	GetEndCount(ctx context.Context, sessionID string) int
 	SubmitEnd(ctx context.Context, sessionID, stageID string, endNumber int, arrows []repository.ArrowIn, scoreMap map[string]int) (*repository.EndOut, error)
 	UndoLastEnd(ctx context.Context, sessionID string) error
+	ListEndEvents(ctx context.Context, sessionID string, after int64) (*repository.EndEventsOut, error)
 	GetSessionForComplete(ctx context.Context, sessionID, userID string) (templateID, status string, totalScore int, err error)
 	CompleteSession(ctx context.Context, sessionID string, now time.Time, notes, location, weather *string) error
-	UpsertPersonalRecord(ctx context.Context, userID, templateID, sessionID string, totalScore int, now time.Time) (bool, error)
 	GetTemplateName(ctx context.Context, templateID string) string
 	InsertClassification(ctx context.Context, userID, system, classification, roundType string, score int, now time.Time, sessionID string) error
 	InsertNotification(ctx context.Context, userID, nType, title, message, link string, now time.Time) error
@@ -41,6 +44,9 @@ type ScoringRepository interface {
 	Stats(ctx context.Context, userID string) (*repository.StatsOut, error)
 	PersonalRecords(ctx context.Context, userID string) ([]repository.PersonalRecordOut, error)
 	Trends(ctx context.Context, userID string) ([]repository.TrendDataItem, error)
+	TrendSeries(ctx context.Context, userID, templateID string, points int) (*repository.TrendSeriesOut, error)
+	ScorePercentile(ctx context.Context, sessionID string) (*repository.PercentileOut, error)
+	SessionHandicap(ctx context.Context, sessionID string) (*repository.HandicapOut, error)
 	ExportBulkData(ctx context.Context, userID string, templateID, dateFrom, dateTo, search *string) ([]repository.BulkExportRow, error)
 }
 
@@ -60,12 +66,16 @@ func (h *ScoringHandler) Routes(r chi.Router) {
 	r.Get("/stats", h.Stats)
 	r.Get("/personal-records", h.PersonalRecords)
 	r.Get("/trends", h.Trends)
+	r.Get("/trends/series", h.TrendSeries)
 
 	r.Get("/{id}", h.Get)
 	r.Delete("/{id}", h.Delete)
 	r.Get("/{id}/export", h.ExportSingle)
 	r.Post("/{id}/ends", h.SubmitEnd)
 	r.Delete("/{id}/ends/last", h.UndoLastEnd)
+	r.Get("/{id}/events", h.Events)
+	r.Get("/{id}/percentile", h.Percentile)
+	r.Get("/{id}/handicap", h.Handicap)
 	r.Post("/{id}/complete", h.Complete)
 	r.Post("/{id}/abandon", h.Abandon)
 }
@@ -116,7 +126,7 @@ func (h *ScoringHandler) Create(w http.ResponseWriter, r *http.Request) {
 		}
 	}
 
-	id := uuid.New().String()
+	id := repository.NewID()
 	now := time.Now().UTC()
 
 	if err := h.Scoring.CreateSession(ctx, id, userID, req.TemplateID, req.SetupProfileID,
@@ -283,6 +293,45 @@ func (h *ScoringHandler) UndoLastEnd(w http.ResponseWriter, r *http.Request) {
 	JSON(w, http.StatusOK, out)
 }
 
+// ── End Events ───────────────────────────────────────────────────────
+
+// Events returns the submits and undos after ?after=<seq> (default 0), for a
+// client that holds the session as of that sequence number (last_event_seq
+// in the session response) to catch up without reloading it.
+func (h *ScoringHandler) Events(w http.ResponseWriter, r *http.Request) {
+	sessionID := chi.URLParam(r, "id")
+	if _, err := uuid.Parse(sessionID); err != nil {
+		Error(w, http.StatusNotFound, "Session not found")
+		return
+	}
+
+	var after int64
+	if a := r.URL.Query().Get("after"); a != "" {
+		v, err := strconv.ParseInt(a, 10, 64)
+		if err != nil || v < 0 {
+			ValidationError(w, "after must be a non-negative integer")
+			return
+		}
+		after = v
+	}
+
+	userID := middleware.GetUserID(r.Context())
+	ctx := r.Context()
+
+	if _, err := h.Scoring.GetSessionStatus(ctx, sessionID, userID); err != nil {
+		Error(w, http.StatusNotFound, "Session not found")
+		return
+	}
+
+	events, err := h.Scoring.ListEndEvents(ctx, sessionID, after)
+	if err != nil {
+		Error(w, http.StatusInternalServerError, "Internal server error")
+		return
+	}
+
+	JSON(w, http.StatusOK, events)
+}
+
 // ── Complete ──────────────────────────────────────────────────────────
 
 func (h *ScoringHandler) Complete(w http.ResponseWriter, r *http.Request) {
@@ -311,8 +360,9 @@ func (h *ScoringHandler) Complete(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	// Check / update personal record
-	isPersonalBest, _ := h.Scoring.UpsertPersonalRecord(ctx, userID, templateID, sessionID, totalScore, now)
+	// The database offers the score to the user's personal record for the
+	// template as the session completes; a strictly higher one takes it.
+	isPersonalBest := h.Scoring.IsPersonalBest(ctx, userID, sessionID)
 
 	// Classification
 	templateName := h.Scoring.GetTemplateName(ctx, templateID)
@@ -447,6 +497,109 @@ func (h *ScoringHandler) Trends(w http.ResponseWriter, r *http.Request) {
 	JSON(w, http.StatusOK, items)
 }
 
+// TrendSeries returns one template's trend with its moving average and
+// EWMA, downsampled when ?points is one of repository.TrendResolutions.
+func (h *ScoringHandler) TrendSeries(w http.ResponseWriter, r *http.Request) {
+	templateID := r.URL.Query().Get("template_id")
+	if _, err := uuid.Parse(templateID); err != nil {
+		ValidationError(w, "template_id must be a valid UUID")
+		return
+	}
+
+	points := 0
+	if p := r.URL.Query().Get("points"); p != "" {
+		v, err := strconv.Atoi(p)
+		if err != nil || !slices.Contains(repository.TrendResolutions, v) {
+			ValidationError(w, fmt.Sprintf("points must be one of %v", repository.TrendResolutions))
+			return
+		}
+		points = v
+	}
+
+	userID := middleware.GetUserID(r.Context())
+	series, err := h.Scoring.TrendSeries(r.Context(), userID, templateID, points)
+	if err != nil {
+		if errors.Is(err, repository.ErrNotFound) {
+			Error(w, http.StatusNotFound, "Round template not found")
+			return
+		}
+		Error(w, http.StatusInternalServerError, "Internal server error")
+		return
+	}
+
+	JSON(w, http.StatusOK, series)
+}
+
+// ── Percentile ────────────────────────────────────────────────────────
+
+func (h *ScoringHandler) Percentile(w http.ResponseWriter, r *http.Request) {
+	sessionID := chi.URLParam(r, "id")
+	if _, err := uuid.Parse(sessionID); err != nil {
+		Error(w, http.StatusNotFound, "Session not found")
+		return
+	}
+
+	userID := middleware.GetUserID(r.Context())
+	ctx := r.Context()
+
+	status, err := h.Scoring.GetSessionStatus(ctx, sessionID, userID)
+	if err != nil {
+		Error(w, http.StatusNotFound, "Session not found")
+		return
+	}
+	if status != "completed" {
+		ValidationError(w, "Only completed sessions have a percentile")
+		return
+	}
+
+	out, err := h.Scoring.ScorePercentile(ctx, sessionID)
+	if err != nil {
+		if errors.Is(err, repository.ErrNotFound) {
+			Error(w, http.StatusNotFound, "Session not found")
+			return
+		}
+		Error(w, http.StatusInternalServerError, "Internal server error")
+		return
+	}
+
+	JSON(w, http.StatusOK, out)
+}
+
+// ── Handicap ──────────────────────────────────────────────────────────
+
+func (h *ScoringHandler) Handicap(w http.ResponseWriter, r *http.Request) {
+	sessionID := chi.URLParam(r, "id")
+	if _, err := uuid.Parse(sessionID); err != nil {
+		Error(w, http.StatusNotFound, "Session not found")
+		return
+	}
+
+	userID := middleware.GetUserID(r.Context())
+	ctx := r.Context()
+
+	status, err := h.Scoring.GetSessionStatus(ctx, sessionID, userID)
+	if err != nil {
+		Error(w, http.StatusNotFound, "Session not found")
+		return
+	}
+	if status != "completed" {
+		ValidationError(w, "Only completed sessions have a handicap")
+		return
+	}
+
+	out, err := h.Scoring.SessionHandicap(ctx, sessionID)
+	if err != nil {
+		if errors.Is(err, repository.ErrNotFound) {
+			Error(w, http.StatusNotFound, "Session not found")
+			return
+		}
+		Error(w, http.StatusInternalServerError, "Internal server error")
+		return
+	}
+
+	JSON(w, http.StatusOK, out)
+}
+
 // ── Export Single Session ─────────────────────────────────────────────
 
 func (h *ScoringHandler) ExportSingle(w http.ResponseWriter, r *http.Request) {
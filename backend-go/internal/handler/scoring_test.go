@@ -49,6 +49,10 @@ type mockScoringRepo struct {
 
 	undoLastEndErr error
 
+	listEndEventsResult *repository.EndEventsOut
+	listEndEventsErr    error
+	listEndEventsAfter  int64
+
 	getSessionForCompleteTemplateID string
 	getSessionForCompleteStatus     string
 	getSessionForCompleteTotalScore int
@@ -56,9 +60,6 @@ type mockScoringRepo struct {
 
 	completeSessionErr error
 
-	upsertPersonalRecordResult bool
-	upsertPersonalRecordErr    error
-
 	getTemplateNameResult string
 
 	insertClassificationErr error
@@ -77,6 +78,16 @@ type mockScoringRepo struct {
 	trendsResult []repository.TrendDataItem
 	trendsErr    error
 
+	trendSeriesResult *repository.TrendSeriesOut
+	trendSeriesErr    error
+	trendSeriesPoints int
+
+	scorePercentileResult *repository.PercentileOut
+	scorePercentileErr    error
+
+	sessionHandicapResult *repository.HandicapOut
+	sessionHandicapErr    error
+
 	exportBulkDataResult []repository.BulkExportRow
 	exportBulkDataErr    error
 }
@@ -121,6 +132,11 @@ func (m *mockScoringRepo) UndoLastEnd(_ context.Context, _ string) error {
 	return m.undoLastEndErr
 }
 
+func (m *mockScoringRepo) ListEndEvents(_ context.Context, _ string, after int64) (*repository.EndEventsOut, error) {
+	m.listEndEventsAfter = after
+	return m.listEndEventsResult, m.listEndEventsErr
+}
+
 func (m *mockScoringRepo) GetSessionForComplete(_ context.Context, _, _ string) (string, string, int, error) {
 	return m.getSessionForCompleteTemplateID, m.getSessionForCompleteStatus, m.getSessionForCompleteTotalScore, m.getSessionForCompleteErr
 }
@@ -129,10 +145,6 @@ func (m *mockScoringRepo) CompleteSession(_ context.Context, _ string, _ time.Ti
 	return m.completeSessionErr
 }
 
-func (m *mockScoringRepo) UpsertPersonalRecord(_ context.Context, _, _, _ string, _ int, _ time.Time) (bool, error) {
-	return m.upsertPersonalRecordResult, m.upsertPersonalRecordErr
-}
-
 func (m *mockScoringRepo) GetTemplateName(_ context.Context, _ string) string {
 	return m.getTemplateNameResult
 }
@@ -169,6 +181,19 @@ func (m *mockScoringRepo) Trends(_ context.Context, _ string) ([]repository.Tren
 	return m.trendsResult, m.trendsErr
 }
 
+func (m *mockScoringRepo) TrendSeries(_ context.Context, _, _ string, points int) (*repository.TrendSeriesOut, error) {
+	m.trendSeriesPoints = points
+	return m.trendSeriesResult, m.trendSeriesErr
+}
+
+func (m *mockScoringRepo) ScorePercentile(_ context.Context, _ string) (*repository.PercentileOut, error) {
+	return m.scorePercentileResult, m.scorePercentileErr
+}
+
+func (m *mockScoringRepo) SessionHandicap(_ context.Context, _ string) (*repository.HandicapOut, error) {
+	return m.sessionHandicapResult, m.sessionHandicapErr
+}
+
 func (m *mockScoringRepo) ExportBulkData(_ context.Context, _ string, _, _, _, _ *string) ([]repository.BulkExportRow, error) {
 	return m.exportBulkDataResult, m.exportBulkDataErr
 }
@@ -411,7 +436,6 @@ func TestCompleteSession_Success(t *testing.T) {
 		getSessionForCompleteTemplateID: uuid.New().String(),
 		getSessionForCompleteStatus:     "in_progress",
 		getSessionForCompleteTotalScore: 250,
-		upsertPersonalRecordResult:      false,
 		getTemplateNameResult:           "Practice Round",
 		loadSessionOutResult:            out,
 	}
@@ -623,6 +647,281 @@ func TestGetTrends_Success(t *testing.T) {
 	}
 }
 
+// ── Trend series ─────────────────────────────────────────────────────
+
+func TestTrendSeries_Success(t *testing.T) {
+	templateID := uuid.New().String()
+	mock := &mockScoringRepo{
+		trendSeriesResult: &repository.TrendSeriesOut{
+			TemplateID:   templateID,
+			TemplateName: "WA 18m",
+			MaxScore:     600,
+			TotalPoints:  1200,
+			Points: []repository.TrendPoint{
+				{SessionID: uuid.New().String(), TotalScore: 540, Percentage: 90, MovingAvg: 88.2, EWMA: 87.5, CompletedAt: time.Now().UTC()},
+			},
+		},
+	}
+	h := scoringHandler(mock)
+
+	rr := httptest.NewRecorder()
+	h.TrendSeries(rr, authedRequest(http.MethodGet, "/trends/series?template_id="+templateID+"&points=100", "user-1"))
+
+	if rr.Code != http.StatusOK {
+		t.Fatalf("expected 200, got %d: %s", rr.Code, rr.Body.String())
+	}
+	if mock.trendSeriesPoints != 100 {
+		t.Errorf("expected points=100, got %d", mock.trendSeriesPoints)
+	}
+
+	var result repository.TrendSeriesOut
+	if err := json.NewDecoder(rr.Body).Decode(&result); err != nil {
+		t.Fatalf("failed to decode: %v", err)
+	}
+	if result.TotalPoints != 1200 || len(result.Points) != 1 {
+		t.Errorf("expected 1 of 1200 points, got %d of %d", len(result.Points), result.TotalPoints)
+	}
+	if result.Points[0].EWMA != 87.5 {
+		t.Errorf("expected ewma 87.5, got %v", result.Points[0].EWMA)
+	}
+}
+
+func TestTrendSeries_InvalidParams(t *testing.T) {
+	templateID := uuid.New().String()
+	for _, query := range []string{"", "template_id=bogus", "template_id=" + templateID + "&points=250", "template_id=" + templateID + "&points=x"} {
+		h := scoringHandler(&mockScoringRepo{})
+
+		rr := httptest.NewRecorder()
+		h.TrendSeries(rr, authedRequest(http.MethodGet, "/trends/series?"+query, "user-1"))
+
+		if rr.Code != http.StatusUnprocessableEntity {
+			t.Errorf("%q: expected 422, got %d", query, rr.Code)
+		}
+	}
+}
+
+func TestTrendSeries_TemplateNotFound(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{trendSeriesErr: repository.ErrNotFound})
+
+	rr := httptest.NewRecorder()
+	h.TrendSeries(rr, authedRequest(http.MethodGet, "/trends/series?template_id="+uuid.New().String(), "user-1"))
+
+	if rr.Code != http.StatusNotFound {
+		t.Errorf("expected 404, got %d", rr.Code)
+	}
+}
+
+func TestTrendSeries_Error(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{trendSeriesErr: errors.New("db error")})
+
+	rr := httptest.NewRecorder()
+	h.TrendSeries(rr, authedRequest(http.MethodGet, "/trends/series?template_id="+uuid.New().String(), "user-1"))
+
+	if rr.Code != http.StatusInternalServerError {
+		t.Errorf("expected 500, got %d", rr.Code)
+	}
+}
+
+// ── Percentile ───────────────────────────────────────────────────────
+
+func percentileRequest(sessionID string) *http.Request {
+	req := authedRequest(http.MethodGet, "/"+sessionID+"/percentile", "user-1")
+	return withURLParam(req, "id", sessionID)
+}
+
+func TestPercentile_Success(t *testing.T) {
+	sessionID := uuid.New().String()
+	percentile, top := 87.5, 12.4
+	mock := &mockScoringRepo{
+		getSessionStatusResult: "completed",
+		scorePercentileResult: &repository.PercentileOut{
+			SessionID:    sessionID,
+			TemplateName: "Portsmouth",
+			TotalScore:   560,
+			Sessions:     120000,
+			Percentile:   &percentile,
+			TopPercent:   &top,
+		},
+	}
+	h := scoringHandler(mock)
+
+	rr := httptest.NewRecorder()
+	h.Percentile(rr, percentileRequest(sessionID))
+
+	if rr.Code != http.StatusOK {
+		t.Fatalf("expected 200, got %d: %s", rr.Code, rr.Body.String())
+	}
+	var result repository.PercentileOut
+	if err := json.NewDecoder(rr.Body).Decode(&result); err != nil {
+		t.Fatalf("failed to decode: %v", err)
+	}
+	if result.TopPercent == nil || *result.TopPercent != 12.4 {
+		t.Errorf("expected top_percent 12.4, got %v", result.TopPercent)
+	}
+}
+
+func TestPercentile_NoHistogram(t *testing.T) {
+	sessionID := uuid.New().String()
+	mock := &mockScoringRepo{
+		getSessionStatusResult: "completed",
+		scorePercentileResult:  &repository.PercentileOut{SessionID: sessionID},
+	}
+	h := scoringHandler(mock)
+
+	rr := httptest.NewRecorder()
+	h.Percentile(rr, percentileRequest(sessionID))
+
+	if rr.Code != http.StatusOK {
+		t.Fatalf("expected 200, got %d: %s", rr.Code, rr.Body.String())
+	}
+	var result map[string]any
+	if err := json.NewDecoder(rr.Body).Decode(&result); err != nil {
+		t.Fatalf("failed to decode: %v", err)
+	}
+	if result["percentile"] != nil {
+		t.Errorf("expected null percentile, got %v", result["percentile"])
+	}
+}
+
+func TestPercentile_NotCompleted(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{getSessionStatusResult: "in_progress"})
+
+	rr := httptest.NewRecorder()
+	h.Percentile(rr, percentileRequest(uuid.New().String()))
+
+	if rr.Code != http.StatusUnprocessableEntity {
+		t.Errorf("expected 422, got %d", rr.Code)
+	}
+}
+
+func TestPercentile_NotFound(t *testing.T) {
+	for _, sessionID := range []string{"bad-uuid", uuid.New().String()} {
+		h := scoringHandler(&mockScoringRepo{getSessionStatusErr: errNotFound})
+
+		rr := httptest.NewRecorder()
+		h.Percentile(rr, percentileRequest(sessionID))
+
+		if rr.Code != http.StatusNotFound {
+			t.Errorf("%s: expected 404, got %d", sessionID, rr.Code)
+		}
+	}
+}
+
+func TestPercentile_Error(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{getSessionStatusResult: "completed", scorePercentileErr: errors.New("db error")})
+
+	rr := httptest.NewRecorder()
+	h.Percentile(rr, percentileRequest(uuid.New().String()))
+
+	if rr.Code != http.StatusInternalServerError {
+		t.Errorf("expected 500, got %d", rr.Code)
+	}
+}
+
+// ── Handicap ─────────────────────────────────────────────────────────
+
+func handicapRequest(sessionID string) *http.Request {
+	req := authedRequest(http.MethodGet, "/"+sessionID+"/handicap", "user-1")
+	return withURLParam(req, "id", sessionID)
+}
+
+func TestHandicap_Success(t *testing.T) {
+	sessionID := uuid.New().String()
+	handicap := 29
+	mock := &mockScoringRepo{
+		getSessionStatusResult: "completed",
+		sessionHandicapResult: &repository.HandicapOut{
+			SessionID:    sessionID,
+			TemplateName: "Portsmouth",
+			TotalScore:   560,
+			Handicap:     &handicap,
+		},
+	}
+	h := scoringHandler(mock)
+
+	rr := httptest.NewRecorder()
+	h.Handicap(rr, handicapRequest(sessionID))
+
+	if rr.Code != http.StatusOK {
+		t.Fatalf("expected 200, got %d: %s", rr.Code, rr.Body.String())
+	}
+	var result repository.HandicapOut
+	if err := json.NewDecoder(rr.Body).Decode(&result); err != nil {
+		t.Fatalf("failed to decode: %v", err)
+	}
+	if result.Handicap == nil || *result.Handicap != 29 {
+		t.Errorf("expected handicap 29, got %v", result.Handicap)
+	}
+}
+
+func TestHandicap_NoTable(t *testing.T) {
+	sessionID := uuid.New().String()
+	mock := &mockScoringRepo{
+		getSessionStatusResult: "completed",
+		sessionHandicapResult:  &repository.HandicapOut{SessionID: sessionID},
+	}
+	h := scoringHandler(mock)
+
+	rr := httptest.NewRecorder()
+	h.Handicap(rr, handicapRequest(sessionID))
+
+	if rr.Code != http.StatusOK {
+		t.Fatalf("expected 200, got %d: %s", rr.Code, rr.Body.String())
+	}
+	var result map[string]any
+	if err := json.NewDecoder(rr.Body).Decode(&result); err != nil {
+		t.Fatalf("failed to decode: %v", err)
+	}
+	if result["handicap"] != nil {
+		t.Errorf("expected null handicap, got %v", result["handicap"])
+	}
+}
+
+func TestHandicap_NotCompleted(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{getSessionStatusResult: "in_progress"})
+
+	rr := httptest.NewRecorder()
+	h.Handicap(rr, handicapRequest(uuid.New().String()))
+
+	if rr.Code != http.StatusUnprocessableEntity {
+		t.Errorf("expected 422, got %d", rr.Code)
+	}
+}
+
+func TestHandicap_NotFound(t *testing.T) {
+	for _, sessionID := range []string{"bad-uuid", uuid.New().String()} {
+		h := scoringHandler(&mockScoringRepo{getSessionStatusErr: errNotFound})
+
+		rr := httptest.NewRecorder()
+		h.Handicap(rr, handicapRequest(sessionID))
+
+		if rr.Code != http.StatusNotFound {
+			t.Errorf("%s: expected 404, got %d", sessionID, rr.Code)
+		}
+	}
+}
+
+func TestHandicap_Error(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{getSessionStatusResult: "completed", sessionHandicapErr: errors.New("db error")})
+
+	rr := httptest.NewRecorder()
+	h.Handicap(rr, handicapRequest(uuid.New().String()))
+
+	if rr.Code != http.StatusInternalServerError {
+		t.Errorf("expected 500, got %d", rr.Code)
+	}
+}
+
+func TestHandicapForScore(t *testing.T) {
+	scores := []int32{600, 590, 590, 550, 400}
+	cases := map[int]int{600: 0, 595: 1, 590: 1, 589: 3, 550: 3, 401: 4, 400: 4, 10: 4}
+	for score, want := range cases {
+		if got := repository.HandicapForScore(scores, score); got != want {
+			t.Errorf("score %d: expected handicap %d, got %d", score, want, got)
+		}
+	}
+}
+
 // ── ExportCSV (Single Session) ───────────────────────────────────────
 
 func TestExportCSV_Success(t *testing.T) {
@@ -954,6 +1253,99 @@ func TestUndoEnd_InvalidUUID(t *testing.T) {
 	}
 }
 
+// ── End Events ───────────────────────────────────────────────────────
+
+func TestEndEvents_Success(t *testing.T) {
+	mock := &mockScoringRepo{
+		getSessionStatusResult: "in_progress",
+		listEndEventsResult: &repository.EndEventsOut{
+			LastSeq: 5,
+			Events: []repository.EndEventOut{
+				{Seq: 4, Kind: "submit", EndNumber: 3, EndID: "end-3", End: &repository.EndOut{ID: "end-3", EndNumber: 3, EndTotal: 27}},
+				{Seq: 5, Kind: "undo", EndNumber: 3, EndID: "end-3"},
+			},
+		},
+	}
+	h := scoringHandler(mock)
+
+	sessionID := uuid.New().String()
+	req := authedRequest(http.MethodGet, "/"+sessionID+"/events?after=3", "user-1")
+	req = withURLParam(req, "id", sessionID)
+
+	rr := httptest.NewRecorder()
+	h.Events(rr, req)
+
+	if rr.Code != http.StatusOK {
+		t.Fatalf("expected 200, got %d: %s", rr.Code, rr.Body.String())
+	}
+	if mock.listEndEventsAfter != 3 {
+		t.Errorf("expected after=3, got %d", mock.listEndEventsAfter)
+	}
+
+	var result repository.EndEventsOut
+	if err := json.NewDecoder(rr.Body).Decode(&result); err != nil {
+		t.Fatalf("failed to decode response: %v", err)
+	}
+	if result.LastSeq != 5 || len(result.Events) != 2 {
+		t.Errorf("expected last_seq 5 and 2 events, got %d and %d", result.LastSeq, len(result.Events))
+	}
+	if result.Events[1].End != nil {
+		t.Error("expected no end on an undo event")
+	}
+}
+
+func TestEndEvents_InvalidAfter(t *testing.T) {
+	h := scoringHandler(&mockScoringRepo{getSessionStatusResult: "in_progress"})
+
+	sessionID := uuid.New().String()
+	req := authedRequest(http.MethodGet, "/"+sessionID+"/events?after=-1", "user-1")
+	req = withURLParam(req, "id", sessionID)
+
+	rr := httptest.NewRecorder()
+	h.Events(rr, req)
+
+	if rr.Code != http.StatusUnprocessableEntity {
+		t.Errorf("expected 422, got %d", rr.Code)
+	}
+}
+
+func TestEndEvents_NotFound(t *testing.T) {
+	mock := &mockScoringRepo{
+		getSessionStatusErr: errNotFound,
+	}
+	h := scoringHandler(mock)
+
+	sessionID := uuid.New().String()
+	req := authedRequest(http.MethodGet, "/"+sessionID+"/events", "user-1")
+	req = withURLParam(req, "id", sessionID)
+
+	rr := httptest.NewRecorder()
+	h.Events(rr, req)
+
+	if rr.Code != http.StatusNotFound {
+		t.Errorf("expected 404, got %d", rr.Code)
+	}
+}
+
+func TestEndEvents_Error(t *testing.T) {
+	mock := &mockScoringRepo{
+		getSessionStatusResult: "completed",
+		listEndEventsErr:       errors.New("db error"),
+	}
+	h := scoringHandler(mock)
+
+	sessionID := uuid.New().String()
+	req := authedRequest(http.MethodGet, "/"+sessionID+"/events", "user-1")
+	req = withURLParam(req, "id", sessionID)
+
+	rr := httptest.NewRecorder()
+	h.Events(rr, req)
+
+	if rr.Code != http.StatusInternalServerError {
+		t.Errorf("expected 500, got %d", rr.Code)
+	}
+}
+
 // ── ExportBulk error path ────────────────────────────────────────────
 
 func TestExportBulkCSV_Error(t *testing.T) {
@@ -1182,7 +1574,7 @@ func TestCompleteSession_PersonalBest(t *testing.T) {
 		getSessionForCompleteTemplateID: uuid.New().String(),
 		getSessionForCompleteStatus:     "in_progress",
 		getSessionForCompleteTotalScore: 600,
-		upsertPersonalRecordResult:      true,
+		isPersonalBestResult:            true,
 		getTemplateNameResult:           "WA 720 (70m)",
 		loadSessionOutResult:            out,
 	}
@@ -110,7 +110,7 @@ func (h *SightMarksHandler) Create(w http.ResponseWriter, r *http.Request) {
 	}
 
 	userID := middleware.GetUserID(r.Context())
-	id := uuid.New().String()
+	id := repository.NewID()
 
 	sm, err := h.SightMarks.Create(r.Context(), id, userID, req.EquipmentID, req.SetupID,
 		req.Distance, req.Setting, req.Notes, dateRecorded)
@@ -113,13 +113,21 @@ func (r *AttachmentRepo) CountByOwner(ctx context.Context, ownerType, ownerID st
 // Polymorphic FKs aren't a thing in Postgres, so the application checks each
 // owner_type's parent table to confirm the owner exists and belongs to userID.
 
+// ends is partitioned by session and ends.id is only unique (and indexed)
+// together with session_id, so this finds the end through the user's
+// sessions rather than by id alone. An archived session's end ids are in
+// session_archives.end_ids.
 func (r *AttachmentRepo) EndBelongsToUser(ctx context.Context, endID, userID string) (bool, error) {
 	var ok bool
 	err := r.DB.QueryRow(ctx,
 		`SELECT EXISTS(
-			SELECT 1 FROM ends e
-			JOIN scoring_sessions s ON s.id = e.session_id
-			WHERE e.id = $1 AND s.user_id = $2
+			SELECT 1 FROM scoring_sessions s
+			JOIN ends e ON e.session_id = s.id
+			WHERE s.user_id = $2 AND e.id = $1
+		) OR EXISTS(
+			SELECT 1 FROM scoring_sessions s
+			JOIN session_archives a ON a.session_id = s.id
+			WHERE s.user_id = $2 AND $1 = ANY(a.end_ids)
 		)`,
 		endID, userID,
 	).Scan(&ok)
@@ -5,7 +5,6 @@ import (
 	"errors"
 	"time"
 
-	"github.com/google/uuid"
 	"github.com/jackc/pgx/v5"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
@@ -32,7 +31,7 @@ type ChallengeOut struct {
 }
 
 func (r *ChallengesRepo) CreateChallenge(ctx context.Context, challengerID, challengeeID, templateID string, expiresAt *time.Time) (*ChallengeOut, error) {
-	id := uuid.New().String()
+	id := NewID()
 	now := time.Now()
 
 	_, err := r.DB.Exec(ctx, `
@@ -4,7 +4,6 @@ import (
 	"context"
 	"time"
 
-	"github.com/google/uuid"
 	"github.com/jackc/pgx/v5"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
@@ -122,7 +121,7 @@ func (r *ClubRepo) Create(ctx context.Context, id, name string, description *str
 		return nil, err
 	}
 
-	memberID := generateID()
+	memberID := NewID()
 	_, err = tx.Exec(ctx,
 		"INSERT INTO club_members (id, club_id, user_id, role, joined_at) VALUES ($1, $2, $3, 'owner', $4)",
 		memberID, id, ownerID, now,
@@ -433,7 +432,7 @@ func (r *ClubRepo) JoinViaInvite(ctx context.Context, code, userID string) (*Joi
 	}
 
 	now := time.Now().UTC()
-	memberID := generateID()
+	memberID := NewID()
 	_, err = r.DB.Exec(ctx,
 		"INSERT INTO club_members (id, club_id, user_id, role, joined_at) VALUES ($1, $2, $3, 'member', $4)",
 		memberID, clubID, userID, now,
@@ -793,7 +792,3 @@ func (r *ClubRepo) getMemberRole(ctx context.Context, clubID, userID string) (st
 	).Scan(&role)
 	return role, err
 }
-
-func generateID() string {
-	return uuid.New().String()
-}
@@ -158,7 +158,7 @@ func (r *ClubRepo) RSVPEvent(ctx context.Context, clubID, eventID, userID, statu
 		`INSERT INTO club_event_participants (id, event_id, user_id, status, rsvp_at)
 		 VALUES ($1, $2, $3, $4, $5)
 		 ON CONFLICT (event_id, user_id) DO UPDATE SET status = $4, rsvp_at = $5`,
-		generateID(), eventID, userID, status, now,
+		NewID(), eventID, userID, status, now,
 	)
 	if err != nil {
 		return nil, err
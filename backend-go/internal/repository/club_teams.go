@@ -219,7 +219,7 @@ func (r *ClubRepo) AddTeamMember(ctx context.Context, clubID, teamID, targetUser
 	now := time.Now().UTC()
 	_, err = r.DB.Exec(ctx,
 		"INSERT INTO club_team_members (id, team_id, user_id, joined_at) VALUES ($1, $2, $3, $4)",
-		generateID(), teamID, targetUserID, now,
+		NewID(), teamID, targetUserID, now,
 	)
 	return err
 }
@@ -229,7 +229,7 @@ func (r *ClubRepo) RegisterForTournament(ctx context.Context, clubID, tournament
 	now := time.Now().UTC()
 	_, err = r.DB.Exec(ctx,
 		"INSERT INTO tournament_participants (id, tournament_id, user_id, status, registered_at) VALUES ($1, $2, $3, 'registered', $4)",
-		generateID(), tournamentID, userID, now,
+		NewID(), tournamentID, userID, now,
 	)
 	return err
 }
@@ -579,7 +579,7 @@ func (r *ClubRepo) StartTournamentRound(ctx context.Context, clubID, tournamentI
 					partB = &participants[seedB-1]
 				}
 
-				matchID := generateID()
+				matchID := NewID()
 				matchNum := j + 1
 
 				var winnerID *string
@@ -647,7 +647,7 @@ func (r *ClubRepo) StartTournamentRound(ctx context.Context, clubID, tournamentI
 				partA := winners[2*j]
 				partB := winners[2*j+1]
 
-				matchID := generateID()
+				matchID := NewID()
 				matchNum := j + 1
 
 				var winnerID *string
@@ -735,7 +735,7 @@ func (r *ClubRepo) SubmitTournamentRoundScore(ctx context.Context, clubID, tourn
 	}
 
 	// Upsert round score
-	scoreID := generateID()
+	scoreID := NewID()
 	_, err = r.DB.Exec(ctx,
 		`INSERT INTO tournament_round_scores (id, round_id, participant_id, session_id, score, x_count)
 		 VALUES ($1, $2, $3, $4, $5, $6)
@@ -850,7 +850,7 @@ func (r *ClubRepo) CompleteTournamentRound(ctx context.Context, clubID, tourname
 
 		for _, m := range matchups {
 			if m.partA != nil {
-				scoreID := generateID()
+				scoreID := NewID()
 				advanced := m.winnerID != nil && *m.winnerID == *m.partA
 				_, err = tx.Exec(ctx,
 					`INSERT INTO tournament_round_scores (id, round_id, participant_id, score, x_count, advanced)
@@ -864,7 +864,7 @@ func (r *ClubRepo) CompleteTournamentRound(ctx context.Context, clubID, tourname
 				}
 			}
 			if m.partB != nil {
-				scoreID := generateID()
+				scoreID := NewID()
 				advanced := m.winnerID != nil && *m.winnerID == *m.partB
 				_, err = tx.Exec(ctx,
 					`INSERT INTO tournament_round_scores (id, round_id, participant_id, score, x_count, advanced)
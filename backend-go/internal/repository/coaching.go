@@ -4,7 +4,6 @@ import (
 	"context"
 	"time"
 
-	"github.com/google/uuid"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
 
@@ -71,7 +70,7 @@ func (r *CoachingRepo) Invite(ctx context.Context, coachID, athleteUsername stri
 		return nil, ErrAlreadyMember
 	}
 
-	id := uuid.New().String()
+	id := NewID()
 	now := time.Now().UTC()
 	_, err = r.DB.Exec(ctx,
 		`INSERT INTO coach_athlete_links (id, coach_id, athlete_id, status, created_at) VALUES ($1, $2, $3, 'pending', $4)`,
@@ -200,7 +199,7 @@ func (r *CoachingRepo) CheckSessionAccess(ctx context.Context, userID, sessionID
 }
 
 func (r *CoachingRepo) AddAnnotation(ctx context.Context, sessionID, authorID string, endNumber, arrowNumber *int, text string) (*AnnotationOut, error) {
-	id := uuid.New().String()
+	id := NewID()
 	now := time.Now().UTC()
 
 	_, err := r.DB.Exec(ctx, `
@@ -0,0 +1,11 @@
+package repository
+
+import "github.com/google/uuid"
+
+// NewID returns a new row id. Version 7 UUIDs start with a millisecond
+// timestamp, so rows inserted together sit together at the right edge of the
+// primary-key index instead of on random leaves (see uuid_generate_v7() in
+// the migrations for the database-side default).
+func NewID() string {
+	return uuid.Must(uuid.NewV7()).String()
+}
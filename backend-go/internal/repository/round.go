@@ -5,7 +5,6 @@ import (
 	"encoding/json"
 	"time"
 
-	"github.com/google/uuid"
 	"github.com/jackc/pgx/v5"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
@@ -131,7 +130,7 @@ func (r *RoundRepo) Create(ctx context.Context, name, organization string, descr
 	}
 	defer tx.Rollback(ctx)
 
-	templateID := uuid.New().String()
+	templateID := NewID()
 	var t RoundTemplateOut
 	err = tx.QueryRow(ctx, `
 		INSERT INTO round_templates (id, name, organization, description, is_official, created_by)
@@ -247,7 +246,7 @@ func (r *RoundRepo) ShareWithClub(ctx context.Context, templateID, clubID, userI
 	_, err := r.DB.Exec(ctx,
 		`INSERT INTO club_shared_rounds (id, club_id, template_id, shared_by, shared_at)
 		 VALUES ($1, $2, $3, $4, $5)`,
-		uuid.New().String(), clubID, templateID, userID, time.Now(),
+		NewID(), clubID, templateID, userID, time.Now(),
 	)
 	return err
 }
@@ -269,24 +268,12 @@ func (r *RoundRepo) GetTemplateName(ctx context.Context, templateID string) (str
 	return name, err
 }
 
+// GetTemplateMaxScore reads round_templates.max_score, which a trigger on
+// round_template_stages keeps equal to the sum over the template's stages.
 func (r *RoundRepo) GetTemplateMaxScore(ctx context.Context, templateID string) int {
-	rows, err := r.DB.Query(ctx, `
-		SELECT num_ends, arrows_per_end, max_score_per_arrow
-		FROM round_template_stages WHERE template_id = $1`, templateID)
-	if err != nil {
-		return 0
-	}
-	defer rows.Close()
-
-	total := 0
-	for rows.Next() {
-		var numEnds, arrowsPerEnd, maxScore int
-		if err := rows.Scan(&numEnds, &arrowsPerEnd, &maxScore); err != nil {
-			continue
-		}
-		total += numEnds * arrowsPerEnd * maxScore
-	}
-	return total
+	var maxScore int
+	r.DB.QueryRow(ctx, "SELECT max_score FROM round_templates WHERE id = $1", templateID).Scan(&maxScore)
+	return maxScore
 }
 
 // LoadStages loads stages for a template. Exported for use by other repos.
@@ -331,7 +318,7 @@ func LoadStages(ctx context.Context, db *pgxpool.Pool, templateID string) ([]Sta
 func insertStages(ctx context.Context, tx pgx.Tx, templateID string, stages []StageParams) ([]StageOut, error) {
 	var out []StageOut
 	for i, s := range stages {
-		stageID := uuid.New().String()
+		stageID := NewID()
 		allowedJSON, _ := json.Marshal(s.AllowedValues)
 		scoreMapJSON, _ := json.Marshal(s.ValueScoreMap)
 
@@ -2,12 +2,16 @@ package repository
 
 import (
 	"context"
+	"crypto/md5"
 	"encoding/json"
 	"fmt"
 	"math"
+	"sort"
+	"strconv"
 	"time"
 
 	"github.com/google/uuid"
+	"github.com/jackc/pgx/v5"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
 
@@ -53,6 +57,7 @@ type SessionOut struct {
 	IsPersonalBest   bool              `json:"is_personal_best"`
 	StartedAt        time.Time         `json:"started_at"`
 	CompletedAt      *time.Time        `json:"completed_at"`
+	LastEventSeq     int64             `json:"last_event_seq"`
 	Ends             []EndOut          `json:"ends"`
 }
 
@@ -140,7 +145,7 @@ func (r *ScoringRepo) LoadSessionOut(ctx context.Context, sessionID, userID stri
 		SELECT ss.id, ss.template_id, ss.setup_profile_id, ss.status,
 		       ss.total_score, ss.total_x_count, ss.total_arrows,
 		       ss.notes, ss.location, ss.weather, ss.share_token,
-		       ss.started_at, ss.completed_at,
+		       ss.started_at, ss.completed_at, ss.last_event_seq,
 		       sp.name AS setup_profile_name
 		FROM scoring_sessions ss
 		LEFT JOIN setup_profiles sp ON sp.id = ss.setup_profile_id
@@ -149,7 +154,7 @@ func (r *ScoringRepo) LoadSessionOut(ctx context.Context, sessionID, userID stri
 	).Scan(&s.ID, &templateID, &s.SetupProfileID, &s.Status,
 		&s.TotalScore, &s.TotalXCount, &s.TotalArrows,
 		&s.Notes, &s.Location, &s.Weather, &s.ShareToken,
-		&s.StartedAt, &s.CompletedAt,
+		&s.StartedAt, &s.CompletedAt, &s.LastEventSeq,
 		&s.SetupProfileName)
 	if err != nil {
 		return nil, err
@@ -191,7 +196,7 @@ func (r *ScoringRepo) attachAttachmentIDs(ctx context.Context, sessionID string,
 	rows, err := r.DB.Query(ctx, `
 		SELECT a.id, a.owner_id
 		FROM attachments a
-		JOIN ends e ON e.id = a.owner_id
+		JOIN session_ends e ON e.id = a.owner_id
 		WHERE a.owner_type = 'session_end' AND e.session_id = $1
 		ORDER BY a.created_at`, sessionID)
 	if err != nil {
@@ -328,69 +333,39 @@ type ArrowIn struct {
 }
 
 func (r *ScoringRepo) SubmitEnd(ctx context.Context, sessionID, stageID string, endNumber int, arrows []ArrowIn, scoreMap map[string]int) (*EndOut, error) {
-	tx, err := r.DB.Begin(ctx)
-	if err != nil {
-		return nil, err
-	}
-	defer tx.Rollback(ctx)
-
-	endID := uuid.New().String()
+	endID := NewID()
 	now := time.Now().UTC()
-	_, err = tx.Exec(ctx, `
-		INSERT INTO ends (id, session_id, stage_id, end_number, end_total, created_at)
-		VALUES ($1, $2, $3, $4, 0, $5)`,
-		endID, sessionID, stageID, endNumber, now,
-	)
-	if err != nil {
-		return nil, err
-	}
 
 	endTotal := 0
-	xCount := 0
+	values := make([]string, len(arrows))
+	scores := make([]int16, len(arrows))
+	xs := make([]*float64, len(arrows))
+	ys := make([]*float64, len(arrows))
 	arrowOuts := []ArrowOut{}
 	for i, a := range arrows {
-		arrowID := uuid.New().String()
 		numeric := scoreMap[a.ScoreValue]
-		_, err = tx.Exec(ctx, `
-			INSERT INTO arrows (id, end_id, arrow_number, score_value, score_numeric, x_pos, y_pos)
-			VALUES ($1, $2, $3, $4, $5, $6, $7)`,
-			arrowID, endID, i+1, a.ScoreValue, numeric, a.XPos, a.YPos,
-		)
-		if err != nil {
-			return nil, err
-		}
+		values[i], scores[i], xs[i], ys[i] = a.ScoreValue, int16(numeric), a.XPos, a.YPos
 		endTotal += numeric
-		if a.ScoreValue == "X" {
-			xCount++
-		}
 		arrowOuts = append(arrowOuts, ArrowOut{
-			ID: arrowID, ArrowNumber: i + 1,
+			ID: packedArrowID(endID, i+1), ArrowNumber: i + 1,
 			ScoreValue: a.ScoreValue, ScoreNumeric: numeric,
 			XPos: a.XPos, YPos: a.YPos,
 		})
 	}
 
-	_, err = tx.Exec(ctx, "UPDATE ends SET end_total = $1 WHERE id = $2", endTotal, endID)
-	if err != nil {
-		return nil, err
-	}
-
-	_, err = tx.Exec(ctx, `
-		UPDATE scoring_sessions
-		SET total_score = total_score + $2,
-		    total_x_count = total_x_count + $3,
-		    total_arrows = total_arrows + $4
-		WHERE id = $1`,
-		sessionID, endTotal, xCount, len(arrows),
+	// Logged as an event; its trigger inserts the end, and the trigger on
+	// ends updates the session's totals.
+	_, err := r.DB.Exec(ctx, `
+		INSERT INTO end_events (kind, end_id, session_id, stage_id, end_number, end_total, created_at,
+		                        arrow_codes, arrow_scores, arrow_x, arrow_y)
+		VALUES ('submit', $1, $2, $3, $4, $5, $6, score_codes_for($7), $8, $9, $10)`,
+		endID, sessionID, stageID, endNumber, endTotal, now,
+		values, scores, xs, ys,
 	)
 	if err != nil {
 		return nil, err
 	}
 
-	if err := tx.Commit(ctx); err != nil {
-		return nil, err
-	}
-
 	sid := stageID
 	return &EndOut{
 		ID: endID, EndNumber: endNumber, EndTotal: endTotal,
@@ -401,41 +376,69 @@ func (r *ScoringRepo) SubmitEnd(ctx context.Context, sessionID, stageID string,
 // ── Undo Last End ────────────────────────────────────────────────────
 
 func (r *ScoringRepo) UndoLastEnd(ctx context.Context, sessionID string) error {
-	var endID string
-	var endTotal int
-	err := r.DB.QueryRow(ctx, `
-		SELECT id, end_total FROM ends
-		WHERE session_id = $1
-		ORDER BY end_number DESC LIMIT 1`, sessionID,
-	).Scan(&endID, &endTotal)
-	if err != nil {
-		return err
-	}
+	// The event's trigger deletes the session's last end (and the trigger on
+	// ends takes its totals back off the session). It raises if there is no
+	// end to undo.
+	_, err := r.DB.Exec(ctx,
+		"INSERT INTO end_events (session_id, kind) VALUES ($1, 'undo')", sessionID)
+	return err
+}
 
-	var arrowCount, xCount int
-	r.DB.QueryRow(ctx,
-		"SELECT COUNT(*), COALESCE(SUM(CASE WHEN score_value = 'X' THEN 1 ELSE 0 END), 0) FROM arrows WHERE end_id = $1",
-		endID,
-	).Scan(&arrowCount, &xCount)
+// ── End Events ───────────────────────────────────────────────────────
 
-	tx, err := r.DB.Begin(ctx)
+type EndEventOut struct {
+	Seq       int64     `json:"seq"`
+	Kind      string    `json:"kind"`
+	EndNumber int       `json:"end_number"`
+	EndID     string    `json:"end_id"`
+	End       *EndOut   `json:"end"`
+	CreatedAt time.Time `json:"created_at"`
+}
+
+type EndEventsOut struct {
+	LastSeq int64         `json:"last_seq"`
+	Events  []EndEventOut `json:"events"`
+}
+
+// ListEndEvents returns a session's events after sequence number after, in
+// order. Replaying them on top of a copy of the session as of after (a
+// submit adds End, an undo removes end EndNumber) brings it up to date.
+func (r *ScoringRepo) ListEndEvents(ctx context.Context, sessionID string, after int64) (*EndEventsOut, error) {
+	rows, err := r.DB.Query(ctx, `
+		SELECT seq, kind, end_number, end_id, stage_id, end_total, created_at,
+		       score_values(arrow_codes), arrow_scores, arrow_x, arrow_y
+		FROM end_events WHERE session_id = $1 AND seq > $2
+		ORDER BY seq`, sessionID, after)
 	if err != nil {
-		return err
+		return nil, err
 	}
-	defer tx.Rollback(ctx)
-
-	tx.Exec(ctx, "DELETE FROM arrows WHERE end_id = $1", endID)
-	tx.Exec(ctx, "DELETE FROM ends WHERE id = $1", endID)
-	tx.Exec(ctx, `
-		UPDATE scoring_sessions
-		SET total_score = total_score - $2,
-		    total_x_count = total_x_count - $3,
-		    total_arrows = total_arrows - $4
-		WHERE id = $1`,
-		sessionID, endTotal, xCount, arrowCount,
-	)
+	defer rows.Close()
 
-	return tx.Commit(ctx)
+	out := &EndEventsOut{LastSeq: after, Events: []EndEventOut{}}
+	for rows.Next() {
+		var ev EndEventOut
+		var stageID *string
+		var endTotal *int
+		var values []*string
+		var scores []*int16
+		var xs, ys []*float32
+		if err := rows.Scan(&ev.Seq, &ev.Kind, &ev.EndNumber, &ev.EndID, &stageID, &endTotal, &ev.CreatedAt,
+			&values, &scores, &xs, &ys); err != nil {
+			return nil, err
+		}
+		if ev.Kind == "submit" {
+			ev.End = &EndOut{
+				ID: ev.EndID, EndNumber: ev.EndNumber, StageID: stageID,
+				Arrows: unpackArrows(ev.EndID, values, scores, xs, ys), AttachmentIDs: []string{}, CreatedAt: ev.CreatedAt,
+			}
+			if endTotal != nil {
+				ev.End.EndTotal = *endTotal
+			}
+		}
+		out.Events = append(out.Events, ev)
+		out.LastSeq = ev.Seq
+	}
+	return out, rows.Err()
 }
 
 // ── Complete Session ──────────────────────────────────────────────────
@@ -469,35 +472,8 @@ func (r *ScoringRepo) CompleteSession(ctx context.Context, sessionID string, now
 	return err
 }
 
-func (r *ScoringRepo) UpsertPersonalRecord(ctx context.Context, userID, templateID, sessionID string, totalScore int, now time.Time) (bool, error) {
-	var existingPRID *string
-	var existingScore int
-	err := r.DB.QueryRow(ctx,
-		"SELECT id, score FROM personal_records WHERE user_id = $1 AND template_id = $2",
-		userID, templateID,
-	).Scan(&existingPRID, &existingScore)
-
-	if err != nil {
-		// No existing PR — create one
-		prID := uuid.New().String()
-		r.DB.Exec(ctx, `
-			INSERT INTO personal_records (id, user_id, template_id, session_id, score, achieved_at)
-			VALUES ($1, $2, $3, $4, $5, $6)`,
-			prID, userID, templateID, sessionID, totalScore, now,
-		)
-		return true, nil
-	} else if totalScore > existingScore {
-		r.DB.Exec(ctx, `
-			UPDATE personal_records SET session_id = $1, score = $2, achieved_at = $3 WHERE id = $4`,
-			sessionID, totalScore, now, *existingPRID,
-		)
-		return true, nil
-	}
-	return false, nil
-}
-
 func (r *ScoringRepo) InsertClassification(ctx context.Context, userID, system, classification, roundType string, score int, now time.Time, sessionID string) error {
-	crID := uuid.New().String()
+	crID := NewID()
 	_, err := r.DB.Exec(ctx, `
 		INSERT INTO classification_records (id, user_id, system, classification, round_type, score, achieved_at, session_id)
 		VALUES ($1, $2, $3, $4, $5, $6, $7, $8)`,
@@ -507,7 +483,7 @@ func (r *ScoringRepo) InsertClassification(ctx context.Context, userID, system,
 }
 
 func (r *ScoringRepo) InsertNotification(ctx context.Context, userID, nType, title, message, link string, now time.Time) error {
-	notifID := uuid.New().String()
+	notifID := NewID()
 	_, err := r.DB.Exec(ctx, `
 		INSERT INTO notifications (id, user_id, type, title, message, link, read, created_at)
 		VALUES ($1, $2, $3, $4, $5, $6, false, $7)`,
@@ -517,7 +493,7 @@ func (r *ScoringRepo) InsertNotification(ctx context.Context, userID, nType, tit
 }
 
 func (r *ScoringRepo) InsertFeedItem(ctx context.Context, userID, feedType string, data map[string]any, now time.Time) error {
-	feedID := uuid.New().String()
+	feedID := NewID()
 	feedData, _ := json.Marshal(data)
 	_, err := r.DB.Exec(ctx, `
 		INSERT INTO feed_items (id, user_id, type, data, created_at)
@@ -535,119 +511,127 @@ func (r *ScoringRepo) AbandonSession(ctx context.Context, sessionID string) erro
 }
 
 func (r *ScoringRepo) DeleteSession(ctx context.Context, sessionID string) error {
-	tx, err := r.DB.Begin(ctx)
-	if err != nil {
-		return err
-	}
-	defer tx.Rollback(ctx)
-
-	tx.Exec(ctx, `DELETE FROM arrows WHERE end_id IN (SELECT id FROM ends WHERE session_id = $1)`, sessionID)
-	tx.Exec(ctx, "DELETE FROM ends WHERE session_id = $1", sessionID)
-	tx.Exec(ctx, "DELETE FROM scoring_sessions WHERE id = $1", sessionID)
-
-	return tx.Commit(ctx)
+	// Its ends and end events go with it (ON DELETE CASCADE).
+	_, err := r.DB.Exec(ctx, "DELETE FROM scoring_sessions WHERE id = $1", sessionID)
+	return err
 }
 
 // ── Stats ─────────────────────────────────────────────────────────────
 
 func (r *ScoringRepo) Stats(ctx context.Context, userID string) (*StatsOut, error) {
+	// Completed and abandoned sessions come from the rollups the database
+	// maintains (user_stats, user_template_stats); in-progress ones are
+	// still being scored, so add them here.
+	var totalSessions, completedSessions, totalArrows, totalXCount int
+	err := r.DB.QueryRow(ctx, `
+		SELECT coalesce(u.sessions, 0) + p.sessions, coalesce(u.completed_sessions, 0),
+		       coalesce(u.arrows, 0) + p.arrows, coalesce(u.x_count, 0) + p.x_count
+		FROM (
+			SELECT count(*) AS sessions, coalesce(sum(total_arrows), 0) AS arrows,
+			       coalesce(sum(total_x_count), 0) AS x_count
+			FROM scoring_sessions
+			WHERE user_id = $1 AND status = 'in_progress'
+		) p
+		LEFT JOIN user_stats u ON u.user_id = $1`, userID,
+	).Scan(&totalSessions, &completedSessions, &totalArrows, &totalXCount)
+	if err != nil {
+		return nil, err
+	}
+
 	rows, err := r.DB.Query(ctx, `
-		SELECT ss.id, ss.status, ss.total_score, ss.total_arrows, ss.total_x_count,
-		       ss.completed_at, ss.started_at, rt.name AS template_name, ss.template_id
-		FROM scoring_sessions ss
-		LEFT JOIN round_templates rt ON rt.id = ss.template_id
-		WHERE ss.user_id = $1
-		ORDER BY ss.completed_at DESC NULLS LAST`, userID)
+		SELECT rt.name, t.completed_sessions, t.score_sum, t.best_score, t.best_at
+		FROM user_template_stats t
+		LEFT JOIN round_templates rt ON rt.id = t.template_id
+		WHERE t.user_id = $1 AND t.completed_sessions > 0
+		ORDER BY t.best_at DESC NULLS LAST`, userID)
 	if err != nil {
 		return nil, err
 	}
 	defer rows.Close()
 
-	type sessionInfo struct {
-		id, status, templateID string
-		totalScore, totalArrows, totalXCount int
-		completedAt *time.Time
-		startedAt   time.Time
-		templateName *string
+	// Templates sharing a name are averaged together, as they always were.
+	type roundType struct {
+		name       string
+		count, sum int
 	}
-
-	var sessions []sessionInfo
+	var byType []*roundType
+	typeIndex := map[string]*roundType{}
+	var bestScore *int
+	var bestTemplate *string
 	for rows.Next() {
-		var s sessionInfo
-		if err := rows.Scan(&s.id, &s.status, &s.totalScore, &s.totalArrows, &s.totalXCount,
-			&s.completedAt, &s.startedAt, &s.templateName, &s.templateID); err != nil {
+		var tname *string
+		var count, sum, best int
+		var bestAt *time.Time
+		if err := rows.Scan(&tname, &count, &sum, &best, &bestAt); err != nil {
 			return nil, err
 		}
-		sessions = append(sessions, s)
-	}
-
-	totalArrows := 0
-	totalXCount := 0
-	for _, s := range sessions {
-		totalArrows += s.totalArrows
-		totalXCount += s.totalXCount
-	}
-
-	var completed []sessionInfo
-	for _, s := range sessions {
-		if s.status == "completed" {
-			completed = append(completed, s)
+		name := "Unknown"
+		if tname != nil {
+			name = *tname
 		}
-	}
-
-	var bestScore *int
-	var bestTemplate *string
-	for _, s := range completed {
-		if bestScore == nil || s.totalScore > *bestScore {
-			score := s.totalScore
+		// Rows come most recent best first, so ties keep the latest.
+		if bestScore == nil || best > *bestScore {
+			score := best
 			bestScore = &score
-			name := "Unknown"
-			if s.templateName != nil {
-				name = *s.templateName
-			}
-			bestTemplate = &name
+			bestName := name
+			bestTemplate = &bestName
 		}
-	}
-
-	byType := map[string][]int{}
-	for _, s := range completed {
-		name := "Unknown"
-		if s.templateName != nil {
-			name = *s.templateName
+		rt, ok := typeIndex[name]
+		if !ok {
+			rt = &roundType{name: name}
+			typeIndex[name] = rt
+			byType = append(byType, rt)
 		}
-		byType[name] = append(byType[name], s.totalScore)
+		rt.count += count
+		rt.sum += sum
+	}
+	if err := rows.Err(); err != nil {
+		return nil, err
 	}
 	avgByRound := []RoundTypeAvg{}
-	for name, scores := range byType {
-		sum := 0
-		for _, sc := range scores {
-			sum += sc
-		}
-		avg := math.Round(float64(sum)/float64(len(scores))*10) / 10
+	for _, rt := range byType {
+		avg := math.Round(float64(rt.sum)/float64(rt.count)*10) / 10
 		avgByRound = append(avgByRound, RoundTypeAvg{
-			TemplateName: name, AvgScore: avg, Count: len(scores),
+			TemplateName: rt.name, AvgScore: avg, Count: rt.count,
 		})
 	}
 
-	recentTrend := []RecentTrendItem{}
-	limit := 10
-	if len(completed) < limit {
-		limit = len(completed)
+	trendRows, err := r.DB.Query(ctx, `
+		SELECT ss.total_score, ss.completed_at, ss.started_at, rt.name, coalesce(rt.max_score, 0)
+		FROM scoring_sessions ss
+		LEFT JOIN round_templates rt ON rt.id = ss.template_id
+		WHERE ss.user_id = $1 AND ss.status = 'completed'
+		ORDER BY ss.completed_at DESC NULLS LAST
+		LIMIT 10`, userID)
+	if err != nil {
+		return nil, err
 	}
-	for _, s := range completed[:limit] {
-		maxScore := r.getTemplateMaxScore(ctx, s.templateID)
+	defer trendRows.Close()
+
+	recentTrend := []RecentTrendItem{}
+	for trendRows.Next() {
+		var score, maxScore int
+		var completedAt *time.Time
+		var startedAt time.Time
+		var tname *string
+		if err := trendRows.Scan(&score, &completedAt, &startedAt, &tname, &maxScore); err != nil {
+			return nil, err
+		}
 		name := "Unknown"
-		if s.templateName != nil {
-			name = *s.templateName
+		if tname != nil {
+			name = *tname
 		}
-		date := s.startedAt
-		if s.completedAt != nil {
-			date = *s.completedAt
+		date := startedAt
+		if completedAt != nil {
+			date = *completedAt
 		}
 		recentTrend = append(recentTrend, RecentTrendItem{
-			Score: s.totalScore, MaxScore: maxScore, TemplateName: name, Date: date,
+			Score: score, MaxScore: maxScore, TemplateName: name, Date: date,
 		})
 	}
+	if err := trendRows.Err(); err != nil {
+		return nil, err
+	}
 
 	prList, err := r.loadPersonalRecords(ctx, userID)
 	if err != nil {
@@ -655,8 +639,8 @@ func (r *ScoringRepo) Stats(ctx context.Context, userID string) (*StatsOut, erro
 	}
 
 	return &StatsOut{
-		TotalSessions:     len(sessions),
-		CompletedSessions: len(completed),
+		TotalSessions:     totalSessions,
+		CompletedSessions: completedSessions,
 		TotalArrows:       totalArrows,
 		TotalXCount:       totalXCount,
 		PersonalBestScore: bestScore,
@@ -675,7 +659,7 @@ func (r *ScoringRepo) PersonalRecords(ctx context.Context, userID string) ([]Per
 
 func (r *ScoringRepo) loadPersonalRecords(ctx context.Context, userID string) ([]PersonalRecordOut, error) {
 	rows, err := r.DB.Query(ctx, `
-		SELECT pr.template_id, pr.score, pr.achieved_at, pr.session_id, rt.name
+		SELECT pr.score, pr.achieved_at, pr.session_id, rt.name, coalesce(rt.max_score, 0)
 		FROM personal_records pr
 		LEFT JOIN round_templates rt ON rt.id = pr.template_id
 		WHERE pr.user_id = $1`, userID)
@@ -686,18 +670,17 @@ func (r *ScoringRepo) loadPersonalRecords(ctx context.Context, userID string) ([
 
 	items := []PersonalRecordOut{}
 	for rows.Next() {
-		var templateID, sessionID string
-		var score int
+		var sessionID string
+		var score, maxScore int
 		var achievedAt time.Time
 		var tname *string
-		if err := rows.Scan(&templateID, &score, &achievedAt, &sessionID, &tname); err != nil {
+		if err := rows.Scan(&score, &achievedAt, &sessionID, &tname, &maxScore); err != nil {
 			continue
 		}
 		name := "Unknown"
 		if tname != nil {
 			name = *tname
 		}
-		maxScore := r.getTemplateMaxScore(ctx, templateID)
 		items = append(items, PersonalRecordOut{
 			TemplateName: name, Score: score, MaxScore: maxScore,
 			AchievedAt: achievedAt, SessionID: sessionID,
@@ -711,7 +694,7 @@ func (r *ScoringRepo) loadPersonalRecords(ctx context.Context, userID string) ([
 func (r *ScoringRepo) Trends(ctx context.Context, userID string) ([]TrendDataItem, error) {
 	rows, err := r.DB.Query(ctx, `
 		SELECT ss.id, ss.total_score, ss.completed_at, ss.started_at,
-		       ss.template_id, rt.name
+		       rt.name, coalesce(rt.max_score, 0)
 		FROM scoring_sessions ss
 		LEFT JOIN round_templates rt ON rt.id = ss.template_id
 		WHERE ss.user_id = $1 AND ss.status = 'completed'
@@ -723,19 +706,18 @@ func (r *ScoringRepo) Trends(ctx context.Context, userID string) ([]TrendDataIte
 
 	items := []TrendDataItem{}
 	for rows.Next() {
-		var sid, templateID string
-		var totalScore int
+		var sid string
+		var totalScore, maxScore int
 		var completedAt *time.Time
 		var startedAt time.Time
 		var tname *string
-		if err := rows.Scan(&sid, &totalScore, &completedAt, &startedAt, &templateID, &tname); err != nil {
+		if err := rows.Scan(&sid, &totalScore, &completedAt, &startedAt, &tname, &maxScore); err != nil {
 			continue
 		}
 		name := "Unknown"
 		if tname != nil {
 			name = *tname
 		}
-		maxScore := r.getTemplateMaxScore(ctx, templateID)
 		pct := 0.0
 		if maxScore > 0 {
 			pct = math.Round(float64(totalScore)/float64(maxScore)*1000) / 10
@@ -752,6 +734,281 @@ func (r *ScoringRepo) Trends(ctx context.Context, userID string) ([]TrendDataIte
 	return items, nil
 }
 
+// ── Trend series ──────────────────────────────────────────────────────
+
+// TrendWindow and TrendAlpha must match WINDOW and ALPHA in
+// backend/app/migrations/trend_series.py, which smooths the stored part of a
+// series; the sessions completed since it last ran are smoothed here.
+const (
+	TrendWindow = 5
+	TrendAlpha  = 0.2
+)
+
+// TrendResolutions are the downsampled sizes the job stores (RESOLUTIONS).
+var TrendResolutions = []int{100, 500}
+
+type TrendPoint struct {
+	SessionID   string    `json:"session_id"`
+	CompletedAt time.Time `json:"completed_at"`
+	TotalScore  int       `json:"total_score"`
+	Percentage  float64   `json:"percentage"`
+	MovingAvg   float64   `json:"moving_avg"`
+	EWMA        float64   `json:"ewma"`
+}
+
+type TrendSeriesOut struct {
+	TemplateID   string       `json:"template_id"`
+	TemplateName string       `json:"template_name"`
+	MaxScore     int          `json:"max_score"`
+	TotalPoints  int          `json:"total_points"`
+	Points       []TrendPoint `json:"points"`
+}
+
+// TrendSeries returns the user's completed sessions of a template as a
+// smoothed series, downsampled to about points points if points is one of
+// TrendResolutions and 0 for all of them. Returns ErrNotFound if the
+// template doesn't exist.
+func (r *ScoringRepo) TrendSeries(ctx context.Context, userID, templateID string, points int) (*TrendSeriesOut, error) {
+	out := TrendSeriesOut{TemplateID: templateID, Points: []TrendPoint{}}
+	var fresh bool
+	var lastAt *time.Time
+	var lastID *string
+	var recent []float64
+	var lastEWMA *float64
+	// The stored series plus the sessions completed after its last one
+	// should add up to the user_template_stats rollup; if they don't, a
+	// stored session was deleted, reopened or rescored since the job ran.
+	err := r.DB.QueryRow(ctx, `
+		SELECT rt.name, rt.max_score,
+		       coalesce(t.max_score = rt.max_score
+		                AND (t.sessions + tail.sessions, t.score_sum + tail.score_sum)
+		                    = (s.completed_sessions, s.score_sum), false),
+		       t.completed_ats[cardinality(t.completed_ats)], t.session_ids[cardinality(t.session_ids)],
+		       coalesce(cardinality(t.session_ids), 0),
+		       coalesce(t.percentages[greatest(cardinality(t.percentages) - $3 + 2, 1):], '{}'),
+		       t.ewmas[cardinality(t.ewmas)]
+		FROM round_templates rt
+		LEFT JOIN user_trends t ON t.user_id = $1 AND t.template_id = rt.id
+		LEFT JOIN user_template_stats s ON s.user_id = $1 AND s.template_id = rt.id
+		CROSS JOIN LATERAL (
+			SELECT count(*) AS sessions, coalesce(sum(ss.total_score), 0) AS score_sum
+			FROM scoring_sessions ss
+			WHERE ss.user_id = $1 AND ss.template_id = rt.id AND ss.status = 'completed'
+			  AND (coalesce(ss.completed_at, ss.started_at), ss.id)
+			      > (t.completed_ats[cardinality(t.completed_ats)], t.session_ids[cardinality(t.session_ids)])
+		) tail
+		WHERE rt.id = $2`, userID, templateID, TrendWindow,
+	).Scan(&out.TemplateName, &out.MaxScore, &fresh, &lastAt, &lastID, &out.TotalPoints, &recent, &lastEWMA)
+	if err == pgx.ErrNoRows {
+		return nil, ErrNotFound
+	}
+	if err != nil {
+		return nil, err
+	}
+
+	// A stale series is recomputed here in full until the job catches up.
+	if !fresh {
+		lastAt, lastID, recent, lastEWMA = nil, nil, nil, nil
+		out.TotalPoints = 0
+	} else {
+		rows, err := r.DB.Query(ctx, `
+			SELECT t.session_ids[i], t.completed_ats[i], t.scores[i],
+			       t.percentages[i], t.moving_avgs[i], t.ewmas[i]
+			FROM user_trends t
+			CROSS JOIN LATERAL unnest(coalesce(
+				(SELECT s.positions FROM user_trend_samples s
+				 WHERE s.user_id = t.user_id AND s.template_id = t.template_id AND s.points = $3),
+				ARRAY(SELECT generate_subscripts(t.session_ids, 1))
+			)) AS i
+			WHERE t.user_id = $1 AND t.template_id = $2
+			ORDER BY i`, userID, templateID, points)
+		if err != nil {
+			return nil, err
+		}
+		for rows.Next() {
+			var p TrendPoint
+			if err := rows.Scan(&p.SessionID, &p.CompletedAt, &p.TotalScore, &p.Percentage, &p.MovingAvg, &p.EWMA); err != nil {
+				rows.Close()
+				return nil, err
+			}
+			out.Points = append(out.Points, p)
+		}
+		rows.Close()
+		if err := rows.Err(); err != nil {
+			return nil, err
+		}
+	}
+
+	// The job orders a series by coalesce(completed_at, started_at) and id,
+	// so the tail is everything past its last pair, ties included.
+	query := `
+		SELECT id, total_score, coalesce(completed_at, started_at) AS at
+		FROM scoring_sessions
+		WHERE user_id = $1 AND template_id = $2 AND status = 'completed'`
+	args := []any{userID, templateID}
+	if lastAt != nil && lastID != nil {
+		query += " AND (coalesce(completed_at, started_at), id) > ($3, $4)"
+		args = append(args, *lastAt, *lastID)
+	}
+	rows, err := r.DB.Query(ctx, query+" ORDER BY at, id", args...)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var p TrendPoint
+		if err := rows.Scan(&p.SessionID, &p.TotalScore, &p.CompletedAt); err != nil {
+			return nil, err
+		}
+		if out.MaxScore > 0 {
+			p.Percentage = float64(p.TotalScore) * 100 / float64(out.MaxScore)
+		}
+		recent = append(recent, p.Percentage)
+		if len(recent) > TrendWindow {
+			recent = recent[len(recent)-TrendWindow:]
+		}
+		sum := 0.0
+		for _, v := range recent {
+			sum += v
+		}
+		p.MovingAvg = sum / float64(len(recent))
+		p.EWMA = p.Percentage
+		if lastEWMA != nil {
+			p.EWMA = TrendAlpha*p.Percentage + (1-TrendAlpha)*(*lastEWMA)
+		}
+		ewma := p.EWMA
+		lastEWMA = &ewma
+		out.Points = append(out.Points, p)
+		out.TotalPoints++
+	}
+	if err := rows.Err(); err != nil {
+		return nil, err
+	}
+
+	for i := range out.Points {
+		p := &out.Points[i]
+		p.Percentage = math.Round(p.Percentage*10) / 10
+		p.MovingAvg = math.Round(p.MovingAvg*10) / 10
+		p.EWMA = math.Round(p.EWMA*10) / 10
+	}
+	return &out, nil
+}
+
+// ── Percentile ────────────────────────────────────────────────────────
+
+type PercentileOut struct {
+	SessionID    string     `json:"session_id"`
+	TemplateID   string     `json:"template_id"`
+	TemplateName string     `json:"template_name"`
+	TotalScore   int        `json:"total_score"`
+	Sessions     int64      `json:"sessions"`
+	Percentile   *float64   `json:"percentile"`
+	TopPercent   *float64   `json:"top_percent"`
+	ComputedAt   *time.Time `json:"computed_at"`
+}
+
+// ScorePercentile ranks a session's score among the completed sessions of
+// its template, from the histogram app.migrations.score_histograms builds:
+// Percentile is the share that scored lower, counting ties as half, and
+// TopPercent the share that scored as much or more. Both are nil until the
+// template has a histogram. Returns ErrNotFound if the session doesn't exist.
+func (r *ScoringRepo) ScorePercentile(ctx context.Context, sessionID string) (*PercentileOut, error) {
+	out := PercentileOut{SessionID: sessionID}
+	var width, bin *int
+	var below, through *int64
+	var sessions *int64
+	err := r.DB.QueryRow(ctx, `
+		SELECT ss.template_id, rt.name, ss.total_score, h.sessions, h.bin_width, x.bin,
+		       h.cumulative[x.bin + 1], h.cumulative[x.bin + 2], h.computed_at
+		FROM scoring_sessions ss
+		JOIN round_templates rt ON rt.id = ss.template_id
+		LEFT JOIN template_score_histograms h ON h.template_id = ss.template_id
+		LEFT JOIN LATERAL (
+			SELECT least(greatest(ss.total_score, 0) / h.bin_width, cardinality(h.cumulative) - 2) AS bin
+		) x ON true
+		WHERE ss.id = $1`, sessionID,
+	).Scan(&out.TemplateID, &out.TemplateName, &out.TotalScore, &sessions, &width, &bin, &below, &through, &out.ComputedAt)
+	if err == pgx.ErrNoRows {
+		return nil, ErrNotFound
+	}
+	if err != nil {
+		return nil, err
+	}
+	if sessions == nil || *sessions == 0 {
+		return &out, nil
+	}
+	out.Sessions = *sessions
+
+	// below sessions are in lower bins and the bin's own are spread evenly
+	// over its width; with one-point bins both counts are exact.
+	n := float64(*sessions)
+	inBin := float64(*through - *below)
+	offset := math.Min(float64(max(out.TotalScore, 0)-*bin**width)/float64(*width), 1)
+	lower := float64(*below) + inBin*offset
+	tied := inBin / float64(*width)
+	percentile := math.Round(math.Min((lower+tied/2)/n, 1)*1000) / 10
+	top := math.Round((n-lower)/n*1000) / 10
+	out.Percentile, out.TopPercent = &percentile, &top
+	return &out, nil
+}
+
+// ── Handicap ──────────────────────────────────────────────────────────
+
+type HandicapOut struct {
+	SessionID    string     `json:"session_id"`
+	TemplateID   string     `json:"template_id"`
+	TemplateName string     `json:"template_name"`
+	TotalScore   int        `json:"total_score"`
+	Handicap     *int       `json:"handicap"`
+	ComputedAt   *time.Time `json:"computed_at"`
+}
+
+// SessionHandicap rates a session's score with the Archery GB handicap
+// table app.migrations.handicap_tables computes for its template. Handicap
+// is nil until the template has a table, and while its stages have changed
+// since the table was computed. Returns ErrNotFound if the session doesn't
+// exist.
+func (r *ScoringRepo) SessionHandicap(ctx context.Context, sessionID string) (*HandicapOut, error) {
+	out := HandicapOut{SessionID: sessionID}
+	var scores []int32
+	// The fingerprint is _FINGERPRINT in handicap_tables.py; change them
+	// together.
+	err := r.DB.QueryRow(ctx, `
+		SELECT ss.template_id, rt.name, ss.total_score, h.scores, h.computed_at
+		FROM scoring_sessions ss
+		JOIN round_templates rt ON rt.id = ss.template_id
+		LEFT JOIN template_handicap_tables h ON h.template_id = ss.template_id AND h.stages_hash = (
+			SELECT md5(string_agg(
+				concat_ws('|', coalesce(distance, ''), num_ends, arrows_per_end, max_score_per_arrow, value_score_map::text),
+				';' ORDER BY stage_order
+			))
+			FROM round_template_stages
+			WHERE template_id = ss.template_id
+		)
+		WHERE ss.id = $1`, sessionID,
+	).Scan(&out.TemplateID, &out.TemplateName, &out.TotalScore, &scores, &out.ComputedAt)
+	if err == pgx.ErrNoRows {
+		return nil, ErrNotFound
+	}
+	if err != nil {
+		return nil, err
+	}
+	if len(scores) > 0 {
+		handicap := HandicapForScore(scores, out.TotalScore)
+		out.Handicap = &handicap
+	}
+	return &out, nil
+}
+
+// HandicapForScore finds the handicap a score earns in a table of expected
+// scores by handicap (scores[h] for handicap h, falling as h rises): the
+// lowest handicap whose expected score it reaches, or the table's last for a
+// score below all of them.
+func HandicapForScore(scores []int32, score int) int {
+	h := sort.Search(len(scores), func(i int) bool { return int(scores[i]) <= score })
+	return min(h, len(scores)-1)
+}
+
 // ── Export ─────────────────────────────────────────────────────────────
 
 type BulkExportRow struct {
@@ -885,10 +1142,13 @@ func (r *ScoringRepo) GetSharedSession(ctx context.Context, token string) (*Shar
 
 // ── Helpers ───────────────────────────────────────────────────────────
 
+// LoadEnds reads session_ends, which also unpacks the ends of sessions moved to
+// session_archives.
 func (r *ScoringRepo) LoadEnds(ctx context.Context, sessionID string) ([]EndOut, error) {
 	rows, err := r.DB.Query(ctx, `
-		SELECT id, end_number, end_total, stage_id, created_at
-		FROM ends WHERE session_id = $1
+		SELECT id, end_number, end_total, stage_id, created_at,
+		       score_values(arrow_codes), arrow_scores, arrow_x, arrow_y
+		FROM session_ends WHERE session_id = $1
 		ORDER BY end_number`, sessionID)
 	if err != nil {
 		return []EndOut{}, err
@@ -898,53 +1158,55 @@ func (r *ScoringRepo) LoadEnds(ctx context.Context, sessionID string) ([]EndOut,
 	ends := []EndOut{}
 	for rows.Next() {
 		var e EndOut
-		if err := rows.Scan(&e.ID, &e.EndNumber, &e.EndTotal, &e.StageID, &e.CreatedAt); err != nil {
+		var values []*string
+		var scores []*int16
+		var xs, ys []*float32
+		if err := rows.Scan(&e.ID, &e.EndNumber, &e.EndTotal, &e.StageID, &e.CreatedAt,
+			&values, &scores, &xs, &ys); err != nil {
 			continue
 		}
-		e.Arrows, _ = r.loadArrows(ctx, e.ID)
+		e.Arrows = unpackArrows(e.ID, values, scores, xs, ys)
 		e.AttachmentIDs = []string{}
 		ends = append(ends, e)
 	}
 	return ends, nil
 }
 
-func (r *ScoringRepo) loadArrows(ctx context.Context, endID string) ([]ArrowOut, error) {
-	rows, err := r.DB.Query(ctx, `
-		SELECT id, arrow_number, score_value, score_numeric, x_pos, y_pos
-		FROM arrows WHERE end_id = $1
-		ORDER BY arrow_number`, endID)
-	if err != nil {
-		return []ArrowOut{}, err
-	}
-	defer rows.Close()
-
+// unpackArrows turns an end's parallel arrow arrays back into ArrowOuts.
+// NULL slots are arrows deleted through the arrows view and are skipped.
+func unpackArrows(endID string, values []*string, scores []*int16, xs, ys []*float32) []ArrowOut {
 	arrows := []ArrowOut{}
-	for rows.Next() {
-		var a ArrowOut
-		if err := rows.Scan(&a.ID, &a.ArrowNumber, &a.ScoreValue, &a.ScoreNumeric, &a.XPos, &a.YPos); err != nil {
+	for i, v := range values {
+		if v == nil {
 			continue
 		}
+		a := ArrowOut{ID: packedArrowID(endID, i+1), ArrowNumber: i + 1, ScoreValue: *v}
+		if i < len(scores) && scores[i] != nil {
+			a.ScoreNumeric = int(*scores[i])
+		}
+		if i < len(xs) {
+			a.XPos = widenPosition(xs[i])
+		}
+		if i < len(ys) {
+			a.YPos = widenPosition(ys[i])
+		}
 		arrows = append(arrows, a)
 	}
-	return arrows, nil
+	return arrows
 }
 
-func (r *ScoringRepo) getTemplateMaxScore(ctx context.Context, templateID string) int {
-	rows, err := r.DB.Query(ctx, `
-		SELECT num_ends, arrows_per_end, max_score_per_arrow
-		FROM round_template_stages WHERE template_id = $1`, templateID)
-	if err != nil {
-		return 0
+// widenPosition converts a stored real back to float64, rounded so the JSON
+// shows 0.1 rather than float32 noise like 0.10000000149011612.
+func widenPosition(p *float32) *float64 {
+	if p == nil {
+		return nil
 	}
-	defer rows.Close()
+	v, _ := strconv.ParseFloat(strconv.FormatFloat(float64(*p), 'g', -1, 32), 64)
+	return &v
+}
 
-	total := 0
-	for rows.Next() {
-		var numEnds, arrowsPerEnd, maxScore int
-		if err := rows.Scan(&numEnds, &arrowsPerEnd, &maxScore); err != nil {
-			continue
-		}
-		total += numEnds * arrowsPerEnd * maxScore
-	}
-	return total
+// packedArrowID matches the packed_arrow_id() SQL function: arrows have no row
+// of their own, so their id is derived from the end id and arrow number.
+func packedArrowID(endID string, arrowNumber int) string {
+	return uuid.UUID(md5.Sum([]byte(endID + "/" + strconv.Itoa(arrowNumber)))).String()
 }
@@ -5,7 +5,6 @@ import (
 	"encoding/json"
 	"time"
 
-	"github.com/google/uuid"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
 
@@ -103,7 +102,7 @@ func (r *SetupRepo) List(ctx context.Context, userID string) ([]SetupProfileSumm
 }
 
 func (r *SetupRepo) Create(ctx context.Context, userID, name string, description *string, braceHeight, tiller, drawWeight, drawLength, arrowFOC *float64) (string, error) {
-	id := uuid.New().String()
+	id := NewID()
 	_, err := r.DB.Exec(ctx, `
 		INSERT INTO setup_profiles (id, user_id, name, description, brace_height, tiller, draw_weight, draw_length, arrow_foc)
 		VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)`,
@@ -191,7 +190,7 @@ func (r *SetupRepo) EquipmentLinked(ctx context.Context, setupID, equipmentID st
 }
 
 func (r *SetupRepo) AddEquipment(ctx context.Context, setupID, equipmentID string) error {
-	linkID := uuid.New().String()
+	linkID := NewID()
 	_, err := r.DB.Exec(ctx,
 		"INSERT INTO setup_equipment (id, setup_id, equipment_id) VALUES ($1, $2, $3)",
 		linkID, setupID, equipmentID,
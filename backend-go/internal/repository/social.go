@@ -4,7 +4,6 @@ import (
 	"context"
 	"time"
 
-	"github.com/google/uuid"
 	"github.com/jackc/pgx/v5"
 	"github.com/jackc/pgx/v5/pgxpool"
 )
@@ -56,7 +55,7 @@ func (r *SocialRepo) Follow(ctx context.Context, followerID, followingID string)
 		return nil, ErrAlreadyMember
 	}
 
-	id := uuid.New().String()
+	id := NewID()
 	now := time.Now().UTC()
 	_, err = r.DB.Exec(ctx,
 		`INSERT INTO follows (id, follower_id, following_id, created_at) VALUES ($1, $2, $3, $4)`,
@@ -443,25 +443,11 @@ func (r *UserRepo) DeleteUserData(ctx context.Context, userID string) error {
 }
 
 func deleteUserDataTx(ctx context.Context, tx pgx.Tx, userID string) error {
-	// 1. Scoring data: arrows → ends → sessions
+	// 1. Scoring data: sessions (their ends and end events cascade)
 	sessionIDs, err := collectIDs(ctx, tx, "SELECT id FROM scoring_sessions WHERE user_id = $1", userID)
 	if err != nil {
 		return err
 	}
-	if len(sessionIDs) > 0 {
-		endIDs, err := collectIDs(ctx, tx, "SELECT id FROM ends WHERE session_id = ANY($1)", sessionIDs)
-		if err != nil {
-			return err
-		}
-		if len(endIDs) > 0 {
-			if _, err := tx.Exec(ctx, "DELETE FROM arrows WHERE end_id = ANY($1)", endIDs); err != nil {
-				return err
-			}
-		}
-		if _, err := tx.Exec(ctx, "DELETE FROM ends WHERE session_id = ANY($1)", sessionIDs); err != nil {
-			return err
-		}
-	}
 
 	// Session annotations
 	if len(sessionIDs) > 0 {
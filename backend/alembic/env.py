@@ -11,6 +11,12 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from app.config import settings
 from app.database import Base
 from app.models import *  # noqa: F401,F403
+from app.migrations.backfill import CHECKPOINT_TABLE
+from app.migrations.expand_contract import LEGACY_WRITES_TABLE
+from app.migrations import preflight, squash
+from app.migrations.indexes import DROPPED_INDEXES_TABLE, drop_invalid_indexes
+from app.migrations.partitions import is_partition_name
+from app.migrations.runner import instrument_revisions, run_migrations_with_retry, set_session_timeouts
 
 config = context.config
 if config.config_file_name is not None:
@@ -19,16 +25,42 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    # Bookkeeping tables owned by the migration tooling, and partitions, which
+    # the models only describe through their parent.
+    return not (type_ == "table" and (name in (CHECKPOINT_TABLE, LEGACY_WRITES_TABLE, DROPPED_INDEXES_TABLE) or is_partition_name(name)))
+
+
 def run_migrations_offline():
-    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    context.configure(
+        url=settings.DATABASE_URL, target_metadata=target_metadata, include_name=include_name, literal_binds=True
+    )
     with context.begin_transaction():
         context.run_migrations()
 
 
+def revision_argument():
+    # Unset for commands that don't migrate (check, revision --autogenerate).
+    try:
+        return context.get_revision_argument()
+    except KeyError:
+        return None
+
+
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
-    with context.begin_transaction():
-        context.run_migrations()
+    set_session_timeouts(connection)
+    drop_invalid_indexes(connection)
+    # One transaction per revision so a lock timeout only rolls back (and
+    # retries) the revision that hit it.
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        transaction_per_migration=True,
+    )
+    squash.bootstrap(connection, context.get_context(), context.script, revision_argument())
+    instrument_revisions(context.script)
+    run_migrations_with_retry(context)
 
 
 async def run_async_migrations():
@@ -42,7 +74,21 @@ def run_migrations_online():
     asyncio.run(run_async_migrations())
 
 
+async def run_async_preflight():
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        await connection.run_sync(preflight.run, context.script, context.get_revision_argument())
+    await engine.dispose()
+
+
+def run_preflight():
+    """``alembic -x dry_run=true upgrade head``: estimate, don't migrate."""
+    asyncio.run(run_async_preflight())
+
+
 if context.is_offline_mode():
     run_migrations_offline()
+elif context.get_x_argument(as_dictionary=True).get("dry_run", "").lower() in ("1", "true", "yes"):
+    run_preflight()
 else:
     run_migrations_online()
@@ -0,0 +1,518 @@
+"""squashed baseline at 0c2446f1aa1a
+
+Schema as of revision 0c2446f1aa1a, generated by ``python -m app.migrations.squash``.
+Not part of the revision graph: env.py applies it to empty databases in place
+of replaying every revision up to 0c2446f1aa1a. Regenerate rather than edit.
+
+Create Date: 2026-10-17 03:07:45.406061
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '0c2446f1aa1a'
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('username', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('hashed_password', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('display_name', sa.VARCHAR(length=100), nullable=True),
+    sa.Column('bow_type', sa.VARCHAR(length=50), nullable=True),
+    sa.Column('classification', sa.VARCHAR(length=50), nullable=True),
+    sa.Column('bio', sa.TEXT(), nullable=True),
+    sa.Column('avatar', sa.TEXT(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('email_verified', sa.BOOLEAN(), server_default=sa.text('false'), nullable=False),
+    sa.Column('email_verification_token', sa.VARCHAR(length=255), nullable=True),
+    sa.Column('profile_public', sa.BOOLEAN(), server_default=sa.text('false'), nullable=False),
+    sa.Column('social_links', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id', name='users_pkey')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_table('attachments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('owner_type', sa.VARCHAR(length=32), nullable=False),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('storage_key', sa.TEXT(), nullable=False),
+    sa.Column('thumb_key', sa.TEXT(), nullable=False),
+    sa.Column('content_type', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('full_size', sa.INTEGER(), nullable=False),
+    sa.Column('thumb_size', sa.INTEGER(), nullable=False),
+    sa.Column('width', sa.INTEGER(), nullable=False),
+    sa.Column('height', sa.INTEGER(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("owner_type IN ('session_end', 'equipment', 'setup')", name='ck_attachments_owner_type'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='attachments_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='attachments_pkey')
+    )
+    op.create_index('ix_attachments_owner', 'attachments', ['owner_type', 'owner_id'], unique=False)
+    op.create_index('ix_attachments_user_id', 'attachments', ['user_id'], unique=False)
+    op.create_table('clubs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=True),
+    sa.Column('avatar', sa.TEXT(), nullable=True),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], name='clubs_owner_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='clubs_pkey')
+    )
+    op.create_table('coach_athlete_links',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('coach_id', sa.UUID(), nullable=False),
+    sa.Column('athlete_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.VARCHAR(length=20), server_default=sa.text("'pending'::character varying"), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint("status IN ('pending', 'active', 'revoked')", name='ck_coach_athlete_status'),
+    sa.ForeignKeyConstraint(['athlete_id'], ['users.id'], name='coach_athlete_links_athlete_id_fkey'),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], name='coach_athlete_links_coach_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='coach_athlete_links_pkey'),
+    sa.UniqueConstraint('coach_id', 'athlete_id', name='uq_coach_athlete')
+    )
+    op.create_index('ix_coach_athlete_links_athlete_id', 'coach_athlete_links', ['athlete_id'], unique=False)
+    op.create_index('ix_coach_athlete_links_coach_id', 'coach_athlete_links', ['coach_id'], unique=False)
+    op.create_table('equipment',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('category', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=200), nullable=False),
+    sa.Column('brand', sa.VARCHAR(length=100), nullable=True),
+    sa.Column('model', sa.VARCHAR(length=100), nullable=True),
+    sa.Column('specs', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('notes', sa.TEXT(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='equipment_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='equipment_pkey')
+    )
+    op.create_index('ix_equipment_user_id', 'equipment', ['user_id'], unique=False)
+    op.create_table('feed_items',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('data', postgresql.JSON(astext_type=sa.Text()), server_default=sa.text("'{}'::json"), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='feed_items_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='feed_items_pkey')
+    )
+    op.create_index('ix_feed_items_created_at', 'feed_items', ['created_at'], unique=False)
+    op.create_index('ix_feed_items_user_id', 'feed_items', ['user_id'], unique=False)
+    op.create_table('follows',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('follower_id', sa.UUID(), nullable=False),
+    sa.Column('following_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['follower_id'], ['users.id'], name='follows_follower_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['following_id'], ['users.id'], name='follows_following_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='follows_pkey'),
+    sa.UniqueConstraint('follower_id', 'following_id', name='uq_follower_following')
+    )
+    op.create_index('ix_follows_follower_id', 'follows', ['follower_id'], unique=False)
+    op.create_index('ix_follows_following_id', 'follows', ['following_id'], unique=False)
+    op.create_table('notifications',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('title', sa.VARCHAR(length=200), nullable=False),
+    sa.Column('message', sa.TEXT(), nullable=False),
+    sa.Column('read', sa.BOOLEAN(), server_default=sa.text('false'), nullable=True),
+    sa.Column('link', sa.VARCHAR(length=500), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='notifications_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='notifications_pkey')
+    )
+    op.create_index('ix_notifications_user_id', 'notifications', ['user_id'], unique=False)
+    op.create_table('round_templates',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('organization', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=True),
+    sa.Column('is_official', sa.BOOLEAN(), nullable=False),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], name='round_templates_created_by_fkey'),
+    sa.PrimaryKeyConstraint('id', name='round_templates_pkey')
+    )
+    op.create_table('setup_profiles',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=200), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=True),
+    sa.Column('brace_height', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.Column('tiller', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.Column('draw_weight', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.Column('draw_length', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.Column('arrow_foc', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='setup_profiles_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='setup_profiles_pkey')
+    )
+    op.create_index('ix_setup_profiles_user_id', 'setup_profiles', ['user_id'], unique=False)
+    op.create_table('club_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=200), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=True),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('event_date', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('location', sa.VARCHAR(length=200), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], name='club_events_club_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], name='club_events_created_by_fkey'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='club_events_template_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='club_events_pkey')
+    )
+    op.create_index('ix_club_events_club_id', 'club_events', ['club_id'], unique=False)
+    op.create_index('ix_club_events_created_by', 'club_events', ['created_by'], unique=False)
+    op.create_index('ix_club_events_template_id', 'club_events', ['template_id'], unique=False)
+    op.create_table('club_invites',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('code', sa.VARCHAR(length=32), nullable=False),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('max_uses', sa.INTEGER(), nullable=True),
+    sa.Column('use_count', sa.INTEGER(), server_default=sa.text('0'), nullable=False),
+    sa.Column('expires_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('active', sa.BOOLEAN(), server_default=sa.text('true'), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], name='club_invites_club_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], name='club_invites_created_by_fkey'),
+    sa.PrimaryKeyConstraint('id', name='club_invites_pkey')
+    )
+    op.create_index('ix_club_invites_club_id', 'club_invites', ['club_id'], unique=False)
+    op.create_index('ix_club_invites_code', 'club_invites', ['code'], unique=True)
+    op.create_index('ix_club_invites_created_by', 'club_invites', ['created_by'], unique=False)
+    op.create_table('club_members',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('role', sa.VARCHAR(length=20), server_default=sa.text("'member'::character varying"), nullable=False),
+    sa.Column('joined_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint("role IN ('member', 'admin', 'owner')", name='ck_club_member_role'),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], name='club_members_club_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='club_members_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='club_members_pkey'),
+    sa.UniqueConstraint('club_id', 'user_id', name='uq_club_user')
+    )
+    op.create_index('ix_club_members_club_id', 'club_members', ['club_id'], unique=False)
+    op.create_index('ix_club_members_user_id', 'club_members', ['user_id'], unique=False)
+    op.create_table('club_shared_rounds',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('shared_by', sa.UUID(), nullable=False),
+    sa.Column('shared_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], name='club_shared_rounds_club_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['shared_by'], ['users.id'], name='club_shared_rounds_shared_by_fkey'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='club_shared_rounds_template_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='club_shared_rounds_pkey'),
+    sa.UniqueConstraint('club_id', 'template_id', name='uq_club_template')
+    )
+    op.create_index('ix_club_shared_rounds_club_id', 'club_shared_rounds', ['club_id'], unique=False)
+    op.create_index('ix_club_shared_rounds_template_id', 'club_shared_rounds', ['template_id'], unique=False)
+    op.create_table('club_teams',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('club_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=True),
+    sa.Column('leader_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], name='club_teams_club_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['leader_id'], ['users.id'], name='club_teams_leader_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='club_teams_pkey')
+    )
+    op.create_index('ix_club_teams_club_id', 'club_teams', ['club_id'], unique=False)
+    op.create_index('ix_club_teams_leader_id', 'club_teams', ['leader_id'], unique=False)
+    op.create_table('round_template_stages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('stage_order', sa.INTEGER(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('distance', sa.VARCHAR(length=50), nullable=True),
+    sa.Column('num_ends', sa.INTEGER(), nullable=False),
+    sa.Column('arrows_per_end', sa.INTEGER(), nullable=False),
+    sa.Column('allowed_values', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+    sa.Column('value_score_map', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+    sa.Column('max_score_per_arrow', sa.INTEGER(), nullable=False),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='round_template_stages_template_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='round_template_stages_pkey')
+    )
+    op.create_index('ix_round_template_stages_template_id', 'round_template_stages', ['template_id'], unique=False)
+    op.create_table('scoring_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.VARCHAR(length=20), nullable=False),
+    sa.Column('total_score', sa.INTEGER(), nullable=False),
+    sa.Column('total_x_count', sa.INTEGER(), nullable=False),
+    sa.Column('total_arrows', sa.INTEGER(), nullable=False),
+    sa.Column('setup_profile_id', sa.UUID(), nullable=True),
+    sa.Column('notes', sa.TEXT(), nullable=True),
+    sa.Column('location', sa.VARCHAR(length=200), nullable=True),
+    sa.Column('weather', sa.VARCHAR(length=100), nullable=True),
+    sa.Column('started_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('completed_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('share_token', sa.VARCHAR(length=32), nullable=True),
+    sa.CheckConstraint("status IN ('in_progress', 'completed', 'abandoned')", name='ck_scoring_session_status'),
+    sa.ForeignKeyConstraint(['setup_profile_id'], ['setup_profiles.id'], name='scoring_sessions_setup_profile_id_fkey'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='scoring_sessions_template_id_fkey'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='scoring_sessions_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='scoring_sessions_pkey')
+    )
+    op.create_index('ix_scoring_sessions_setup_profile_id', 'scoring_sessions', ['setup_profile_id'], unique=False)
+    op.create_index('ix_scoring_sessions_share_token', 'scoring_sessions', ['share_token'], unique=True)
+    op.create_index('ix_scoring_sessions_template_id', 'scoring_sessions', ['template_id'], unique=False)
+    op.create_index('ix_scoring_sessions_user_id', 'scoring_sessions', ['user_id'], unique=False)
+    op.create_table('setup_equipment',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('setup_id', sa.UUID(), nullable=False),
+    sa.Column('equipment_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id'], name='setup_equipment_equipment_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['setup_id'], ['setup_profiles.id'], name='setup_equipment_setup_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='setup_equipment_pkey')
+    )
+    op.create_index('ix_setup_equipment_equipment_id', 'setup_equipment', ['equipment_id'], unique=False)
+    op.create_index('ix_setup_equipment_setup_id', 'setup_equipment', ['setup_id'], unique=False)
+    op.create_table('sight_marks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('equipment_id', sa.UUID(), nullable=True),
+    sa.Column('distance', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('setting', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('notes', sa.TEXT(), nullable=True),
+    sa.Column('date_recorded', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('setup_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id'], name='sight_marks_equipment_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['setup_id'], ['setup_profiles.id'], name='fk_sight_marks_setup_id', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='sight_marks_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='sight_marks_pkey')
+    )
+    op.create_index('ix_sight_marks_equipment_id', 'sight_marks', ['equipment_id'], unique=False)
+    op.create_index('ix_sight_marks_setup_id', 'sight_marks', ['setup_id'], unique=False)
+    op.create_index('ix_sight_marks_user_id', 'sight_marks', ['user_id'], unique=False)
+    op.create_table('tournaments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=200), nullable=False),
+    sa.Column('description', sa.TEXT(), nullable=True),
+    sa.Column('organizer_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.VARCHAR(length=20), server_default=sa.text("'draft'::character varying"), nullable=True),
+    sa.Column('max_participants', sa.INTEGER(), nullable=True),
+    sa.Column('registration_deadline', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('start_date', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('end_date', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('club_id', sa.UUID(), nullable=True),
+    sa.CheckConstraint("status IN ('draft', 'registration', 'in_progress', 'completed')", name='ck_tournament_status'),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], name='fk_tournaments_club_id', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['organizer_id'], ['users.id'], name='tournaments_organizer_id_fkey'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='tournaments_template_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='tournaments_pkey')
+    )
+    op.create_index('ix_tournaments_club_id', 'tournaments', ['club_id'], unique=False)
+    op.create_index('ix_tournaments_organizer_id', 'tournaments', ['organizer_id'], unique=False)
+    op.create_index('ix_tournaments_template_id', 'tournaments', ['template_id'], unique=False)
+    op.create_table('challenges',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('challenger_id', sa.UUID(), nullable=False),
+    sa.Column('challengee_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('challenger_session_id', sa.UUID(), nullable=True),
+    sa.Column('challengee_session_id', sa.UUID(), nullable=True),
+    sa.Column('status', sa.VARCHAR(length=50), server_default=sa.text("'pending'::character varying"), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['challengee_id'], ['users.id'], name='challenges_challengee_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['challengee_session_id'], ['scoring_sessions.id'], name='challenges_challengee_session_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['challenger_id'], ['users.id'], name='challenges_challenger_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['challenger_session_id'], ['scoring_sessions.id'], name='challenges_challenger_session_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='challenges_template_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='challenges_pkey')
+    )
+    op.create_index('ix_challenges_challengee_id', 'challenges', ['challengee_id'], unique=False)
+    op.create_index('ix_challenges_challenger_id', 'challenges', ['challenger_id'], unique=False)
+    op.create_index('ix_challenges_status', 'challenges', ['status'], unique=False)
+    op.create_table('classification_records',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('system', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('classification', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('round_type', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('score', sa.INTEGER(), nullable=False),
+    sa.Column('achieved_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['scoring_sessions.id'], name='classification_records_session_id_fkey'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='classification_records_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='classification_records_pkey')
+    )
+    op.create_index('ix_classification_records_user_id', 'classification_records', ['user_id'], unique=False)
+    op.create_table('club_event_participants',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.VARCHAR(length=20), server_default=sa.text("'going'::character varying"), nullable=False),
+    sa.Column('rsvp_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint("status IN ('going', 'maybe', 'not_going')", name='ck_event_participant_status'),
+    sa.ForeignKeyConstraint(['event_id'], ['club_events.id'], name='club_event_participants_event_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='club_event_participants_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='club_event_participants_pkey'),
+    sa.UniqueConstraint('event_id', 'user_id', name='uq_event_user')
+    )
+    op.create_index('ix_club_event_participants_event_id', 'club_event_participants', ['event_id'], unique=False)
+    op.create_index('ix_club_event_participants_user_id', 'club_event_participants', ['user_id'], unique=False)
+    op.create_table('club_team_members',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('team_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('joined_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['team_id'], ['club_teams.id'], name='club_team_members_team_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='club_team_members_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='club_team_members_pkey'),
+    sa.UniqueConstraint('team_id', 'user_id', name='uq_team_user')
+    )
+    op.create_index('ix_club_team_members_team_id', 'club_team_members', ['team_id'], unique=False)
+    op.create_index('ix_club_team_members_user_id', 'club_team_members', ['user_id'], unique=False)
+    op.create_table('ends',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('stage_id', sa.UUID(), nullable=True),
+    sa.Column('end_number', sa.INTEGER(), nullable=False),
+    sa.Column('end_total', sa.INTEGER(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['scoring_sessions.id'], name='ends_session_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['stage_id'], ['round_template_stages.id'], name='ends_stage_id_fkey', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', name='ends_pkey')
+    )
+    op.create_index('ix_ends_session_id', 'ends', ['session_id'], unique=False)
+    op.create_index('ix_ends_stage_id', 'ends', ['stage_id'], unique=False)
+    op.create_table('personal_records',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.INTEGER(), nullable=False),
+    sa.Column('achieved_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['scoring_sessions.id'], name='personal_records_session_id_fkey'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='personal_records_template_id_fkey'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='personal_records_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='personal_records_pkey'),
+    sa.UniqueConstraint('user_id', 'template_id', name='uq_user_template_pr')
+    )
+    op.create_index('ix_personal_records_session_id', 'personal_records', ['session_id'], unique=False)
+    op.create_index('ix_personal_records_template_id', 'personal_records', ['template_id'], unique=False)
+    op.create_index('ix_personal_records_user_id', 'personal_records', ['user_id'], unique=False)
+    op.create_table('session_annotations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('author_id', sa.UUID(), nullable=False),
+    sa.Column('end_number', sa.INTEGER(), nullable=True),
+    sa.Column('arrow_number', sa.INTEGER(), nullable=True),
+    sa.Column('text', sa.TEXT(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], name='session_annotations_author_id_fkey'),
+    sa.ForeignKeyConstraint(['session_id'], ['scoring_sessions.id'], name='session_annotations_session_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='session_annotations_pkey')
+    )
+    op.create_index('ix_session_annotations_author_id', 'session_annotations', ['author_id'], unique=False)
+    op.create_index('ix_session_annotations_session_id', 'session_annotations', ['session_id'], unique=False)
+    op.create_table('tournament_participants',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tournament_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=True),
+    sa.Column('status', sa.VARCHAR(length=20), server_default=sa.text("'registered'::character varying"), nullable=True),
+    sa.Column('final_score', sa.INTEGER(), nullable=True),
+    sa.Column('final_x_count', sa.INTEGER(), nullable=True),
+    sa.Column('rank', sa.INTEGER(), nullable=True),
+    sa.Column('registered_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint("status IN ('registered', 'active', 'completed', 'withdrawn')", name='ck_tournament_participant_status'),
+    sa.ForeignKeyConstraint(['session_id'], ['scoring_sessions.id'], name='tournament_participants_session_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['tournament_id'], ['tournaments.id'], name='tournament_participants_tournament_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='tournament_participants_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='tournament_participants_pkey'),
+    sa.UniqueConstraint('tournament_id', 'user_id', name='uq_tournament_user')
+    )
+    op.create_index('ix_tournament_participants_session_id', 'tournament_participants', ['session_id'], unique=False)
+    op.create_index('ix_tournament_participants_tournament_id', 'tournament_participants', ['tournament_id'], unique=False)
+    op.create_index('ix_tournament_participants_user_id', 'tournament_participants', ['user_id'], unique=False)
+    op.create_table('tournament_rounds',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tournament_id', sa.UUID(), nullable=False),
+    sa.Column('round_number', sa.INTEGER(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=100), nullable=False),
+    sa.Column('template_id', sa.UUID(), nullable=True),
+    sa.Column('advancement', sa.INTEGER(), nullable=True),
+    sa.Column('status', sa.VARCHAR(length=20), server_default=sa.text("'pending'::character varying"), nullable=False),
+    sa.Column('started_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('completed_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('round_type', sa.VARCHAR(length=20), server_default=sa.text("'qualification'::character varying"), nullable=False),
+    sa.CheckConstraint("round_type IN ('qualification', 'elimination')", name='ck_tournament_round_type'),
+    sa.CheckConstraint("status IN ('pending', 'in_progress', 'completed')", name='ck_tournament_round_status'),
+    sa.ForeignKeyConstraint(['template_id'], ['round_templates.id'], name='tournament_rounds_template_id_fkey'),
+    sa.ForeignKeyConstraint(['tournament_id'], ['tournaments.id'], name='tournament_rounds_tournament_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='tournament_rounds_pkey'),
+    sa.UniqueConstraint('tournament_id', 'round_number', name='uq_tournament_round_number')
+    )
+    op.create_index('ix_tournament_rounds_template_id', 'tournament_rounds', ['template_id'], unique=False)
+    op.create_index('ix_tournament_rounds_tournament_id', 'tournament_rounds', ['tournament_id'], unique=False)
+    op.create_table('arrows',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('end_id', sa.UUID(), nullable=False),
+    sa.Column('arrow_number', sa.INTEGER(), nullable=False),
+    sa.Column('score_value', sa.VARCHAR(length=5), nullable=False),
+    sa.Column('score_numeric', sa.INTEGER(), nullable=False),
+    sa.Column('x_pos', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.Column('y_pos', sa.DOUBLE_PRECISION(precision=53), nullable=True),
+    sa.ForeignKeyConstraint(['end_id'], ['ends.id'], name='arrows_end_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='arrows_pkey')
+    )
+    op.create_index('ix_arrows_end_id', 'arrows', ['end_id'], unique=False)
+    op.create_table('tournament_matchups',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('round_id', sa.UUID(), nullable=False),
+    sa.Column('match_number', sa.INTEGER(), nullable=False),
+    sa.Column('participant_a_id', sa.UUID(), nullable=True),
+    sa.Column('participant_b_id', sa.UUID(), nullable=True),
+    sa.Column('score_a', sa.INTEGER(), nullable=True),
+    sa.Column('score_b', sa.INTEGER(), nullable=True),
+    sa.Column('winner_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['participant_a_id'], ['tournament_participants.id'], name='tournament_matchups_participant_a_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['participant_b_id'], ['tournament_participants.id'], name='tournament_matchups_participant_b_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['round_id'], ['tournament_rounds.id'], name='tournament_matchups_round_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['winner_id'], ['tournament_participants.id'], name='tournament_matchups_winner_id_fkey', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', name='tournament_matchups_pkey'),
+    sa.UniqueConstraint('round_id', 'match_number', name='uq_round_match_number')
+    )
+    op.create_index('ix_tournament_matchups_round_id', 'tournament_matchups', ['round_id'], unique=False)
+    op.create_table('tournament_round_scores',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('round_id', sa.UUID(), nullable=False),
+    sa.Column('participant_id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=True),
+    sa.Column('score', sa.INTEGER(), nullable=True),
+    sa.Column('x_count', sa.INTEGER(), nullable=True),
+    sa.Column('rank_in_round', sa.INTEGER(), nullable=True),
+    sa.Column('advanced', sa.BOOLEAN(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['participant_id'], ['tournament_participants.id'], name='tournament_round_scores_participant_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['round_id'], ['tournament_rounds.id'], name='tournament_round_scores_round_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['session_id'], ['scoring_sessions.id'], name='tournament_round_scores_session_id_fkey', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', name='tournament_round_scores_pkey'),
+    sa.UniqueConstraint('round_id', 'participant_id', name='uq_round_participant')
+    )
+    op.create_index('ix_tournament_round_scores_participant_id', 'tournament_round_scores', ['participant_id'], unique=False)
+    op.create_index('ix_tournament_round_scores_round_id', 'tournament_round_scores', ['round_id'], unique=False)
+    op.create_index('ix_tournament_round_scores_session_id', 'tournament_round_scores', ['session_id'], unique=False)
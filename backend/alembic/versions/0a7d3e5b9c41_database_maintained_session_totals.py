@@ -0,0 +1,110 @@
+"""database-maintained session totals
+
+``scoring_sessions.total_score``/``total_x_count``/``total_arrows`` were kept
+up to date by the API: insert the end, then add (or on undo subtract) its
+totals in a second statement. The database now does it. Statement triggers on
+``ends`` aggregate the inserted/deleted/updated rows per session and apply the
+difference in one UPDATE, so a bulk delete costs one statement rather than one
+per end, and writes through the ``arrows`` view (which update ``ends``) are
+covered too.
+
+The totals are owned by the database from here on: a top-level UPDATE of them
+is ignored. That is what makes the rollout safe, since API instances still on
+the previous release keep adding each end's totals themselves. The drift
+verifier (``app.migrations.session_totals --fix``) is the one writer allowed
+through, via ``quiverscore.reconcile_totals``.
+
+Revision ID: 0a7d3e5b9c41
+Revises: f3c9a1d6e274
+Create Date: 2026-10-17 15:20:44.781203
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0a7d3e5b9c41'
+down_revision: Union[str, None] = 'f3c9a1d6e274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Trigger op -> (transition tables, rows with a sign: +1 counts, -1 uncounts).
+CHANGES = {
+    "insert": ("REFERENCING NEW TABLE AS new_ends",
+               "SELECT session_id, end_total, arrow_codes, 1 AS sign FROM new_ends"),
+    "delete": ("REFERENCING OLD TABLE AS old_ends",
+               "SELECT session_id, end_total, arrow_codes, -1 AS sign FROM old_ends"),
+    "update": ("REFERENCING OLD TABLE AS old_ends NEW TABLE AS new_ends",
+               "SELECT session_id, end_total, arrow_codes, 1 AS sign FROM new_ends "
+               "UNION ALL SELECT session_id, end_total, arrow_codes, -1 AS sign FROM old_ends"),
+}
+
+
+def _totals_function(name: str, changed: str) -> str:
+    # Counted on the codes without decoding them: deleting a session with
+    # thousands of ends runs this over all of them (and then finds no session
+    # row to update). NULL slots are arrows deleted through the view.
+    return f"""
+        CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            WITH changed AS (
+                {changed}
+            ), x AS (
+                SELECT coalesce((SELECT code FROM score_codes WHERE value = 'X'), -1) AS code
+            ), delta AS (
+                SELECT c.session_id,
+                       sum(c.sign * c.end_total) AS score,
+                       sum(c.sign * cardinality(array_positions(c.arrow_codes, x.code))) AS xs,
+                       sum(c.sign * (cardinality(c.arrow_codes) - cardinality(array_positions(c.arrow_codes, NULL)))) AS arrows
+                FROM changed c, x
+                GROUP BY c.session_id
+            )
+            UPDATE scoring_sessions s SET
+                total_score = s.total_score + d.score,
+                total_x_count = s.total_x_count + d.xs,
+                total_arrows = s.total_arrows + d.arrows
+            FROM delta d
+            WHERE s.id = d.session_id AND (d.score, d.xs, d.arrows) <> (0, 0, 0);
+            RETURN NULL;
+        END
+        $$
+    """
+
+
+def upgrade() -> None:
+    for change, (transition, changed) in CHANGES.items():
+        function = f"ends_session_totals_on_{change}"
+        op.execute(_totals_function(function, changed))
+        op.execute(
+            f"CREATE OR REPLACE TRIGGER trg_ends_session_totals_on_{change} AFTER {change.upper()} ON ends "
+            f"{transition} FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+    # pg_trigger_depth() is 1 for an UPDATE the application issued and 2 for
+    # the one from the triggers above.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION scoring_sessions_keep_totals() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF pg_trigger_depth() < 2 AND current_setting('quiverscore.reconcile_totals', true) IS DISTINCT FROM 'on' THEN
+                NEW.total_score := OLD.total_score;
+                NEW.total_x_count := OLD.total_x_count;
+                NEW.total_arrows := OLD.total_arrows;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE OR REPLACE TRIGGER trg_scoring_sessions_keep_totals "
+        "BEFORE UPDATE OF total_score, total_x_count, total_arrows ON scoring_sessions "
+        "FOR EACH ROW EXECUTE FUNCTION scoring_sessions_keep_totals()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_scoring_sessions_keep_totals ON scoring_sessions")
+    op.execute("DROP FUNCTION IF EXISTS scoring_sessions_keep_totals()")
+    for change in CHANGES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_ends_session_totals_on_{change} ON ends")
+        op.execute(f"DROP FUNCTION IF EXISTS ends_session_totals_on_{change}()")
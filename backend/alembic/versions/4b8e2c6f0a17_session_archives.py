@@ -0,0 +1,144 @@
+"""session archives
+
+Most ends belong to sessions completed long ago, which are read only when
+someone opens them again. ``session_archives`` holds such a session's ends as
+one row: a column per end field as an array in end order, and the arrows of
+all its ends concatenated (``arrow_counts`` says how many belong to each
+end). ``toast_tuple_target = 128`` has Postgres compress even a short round's
+row; column-wise arrays of small integers compress well.
+
+``app.migrations.session_archive`` moves old completed sessions out of
+``ends`` and ``end_events``. Readers use the ``session_ends`` view, which is
+``ends`` plus the archived ends unpacked into the same shape, so opening an
+archived session works as before. The ``arrows`` view covers ``ends`` only.
+
+Moving ends must not touch the session's totals or log undo events: the
+totals triggers and the event log trigger on ``ends`` are skipped while
+``quiverscore.archiving`` is on, which the job sets for its own transactions.
+
+Revision ID: 4b8e2c6f0a17
+Revises: 9c2f5a7e1d36
+Create Date: 2026-10-17 17:35:50.918264
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '4b8e2c6f0a17'
+down_revision: Union[str, None] = '9c2f5a7e1d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOT_ARCHIVING = "current_setting('quiverscore.archiving', true) IS DISTINCT FROM 'on'"
+
+# The triggers on ends from 0a7d3e5b9c41 (totals) and 9c2f5a7e1d36 (event log).
+TRIGGERS = {
+    "trg_ends_session_totals_on_insert": (
+        "AFTER INSERT ON ends REFERENCING NEW TABLE AS new_ends FOR EACH STATEMENT",
+        None, "ends_session_totals_on_insert",
+    ),
+    "trg_ends_session_totals_on_delete": (
+        "AFTER DELETE ON ends REFERENCING OLD TABLE AS old_ends FOR EACH STATEMENT",
+        None, "ends_session_totals_on_delete",
+    ),
+    "trg_ends_session_totals_on_update": (
+        "AFTER UPDATE ON ends REFERENCING OLD TABLE AS old_ends NEW TABLE AS new_ends FOR EACH STATEMENT",
+        None, "ends_session_totals_on_update",
+    ),
+    "trg_ends_log_event": (
+        "AFTER INSERT OR DELETE ON ends DEFERRABLE INITIALLY DEFERRED FOR EACH ROW",
+        "pg_trigger_depth() < 1", "ends_log_event",
+    ),
+}
+
+# Constraint triggers can't be CREATE OR REPLACEd.
+CONSTRAINT_TRIGGERS = {"trg_ends_log_event"}
+
+ARRAY_COLUMNS = {
+    "end_numbers": "integer[]",
+    "end_ids": "uuid[]",
+    "stage_ids": "uuid[]",
+    "end_totals": "integer[]",
+    "created_ats": "timestamptz[]",
+    "arrow_counts": "smallint[]",
+    "arrow_codes": "smallint[]",
+    "arrow_scores": "smallint[]",
+    "arrow_x": "real[]",
+    "arrow_y": "real[]",
+}
+
+# Each arrow is given its end's position by expanding arrow_counts, and the
+# arrows are regrouped per end. Slicing the arrays per end instead would
+# decompress them once per end.
+_SESSION_ENDS = """
+    CREATE VIEW session_ends AS
+    SELECT session_id, end_number, id, stage_id, end_total, created_at,
+           arrow_codes, arrow_scores, arrow_x, arrow_y
+    FROM ends
+    UNION ALL
+    SELECT a.session_id, e.end_number, e.id, e.stage_id, e.end_total, e.created_at,
+           coalesce(x.arrow_codes, '{}'), coalesce(x.arrow_scores, '{}'),
+           coalesce(x.arrow_x, '{}'), coalesce(x.arrow_y, '{}')
+    FROM session_archives a
+    CROSS JOIN LATERAL unnest(a.end_numbers, a.end_ids, a.stage_ids, a.end_totals, a.created_ats)
+        WITH ORDINALITY AS e(end_number, id, stage_id, end_total, created_at, ord)
+    LEFT JOIN LATERAL (
+        SELECT o.ord,
+               array_agg(u.code ORDER BY u.n) AS arrow_codes,
+               array_agg(u.score ORDER BY u.n) AS arrow_scores,
+               array_agg(u.x ORDER BY u.n) AS arrow_x,
+               array_agg(u.y ORDER BY u.n) AS arrow_y
+        FROM unnest(a.arrow_codes, a.arrow_scores, a.arrow_x, a.arrow_y) WITH ORDINALITY AS u(code, score, x, y, n)
+        JOIN (
+            SELECT c.ord, row_number() OVER (ORDER BY c.ord, g) AS n
+            FROM unnest(a.arrow_counts) WITH ORDINALITY AS c(arrow_count, ord), generate_series(1, c.arrow_count) AS g
+        ) o ON o.n = u.n
+        GROUP BY o.ord
+    ) x ON x.ord = e.ord
+"""
+
+
+def _create_triggers(archiving_aware: bool) -> None:
+    for name, (timing, when, function) in TRIGGERS.items():
+        conditions = [c for c in (when, NOT_ARCHIVING if archiving_aware else None) if c]
+        when_clause = f"WHEN ({' AND '.join(conditions)}) " if conditions else ""
+        if name in CONSTRAINT_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name} ON ends")
+            op.execute(f"CREATE CONSTRAINT TRIGGER {name} {timing} {when_clause}EXECUTE FUNCTION {function}()")
+        else:
+            op.execute(f"CREATE OR REPLACE TRIGGER {name} {timing} {when_clause}EXECUTE FUNCTION {function}()")
+
+
+def upgrade() -> None:
+    columns = ",\n            ".join(f"{name} {type_} NOT NULL DEFAULT '{{}}'" for name, type_ in ARRAY_COLUMNS.items())
+    op.execute(f"""
+        CREATE TABLE session_archives (
+            session_id uuid NOT NULL,
+            {columns},
+            archived_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT session_archives_pkey PRIMARY KEY (session_id),
+            CONSTRAINT session_archives_session_id_fkey FOREIGN KEY (session_id) REFERENCES scoring_sessions (id) ON DELETE CASCADE
+        ) WITH (toast_tuple_target = 128)
+    """)
+
+    op.execute(_SESSION_ENDS)
+    _create_triggers(archiving_aware=True)
+
+
+def downgrade() -> None:
+    # Put the archived ends back without counting them into the totals again.
+    op.execute("SELECT set_config('quiverscore.archiving', 'on', true)")
+    op.execute("""
+        INSERT INTO ends (session_id, end_number, id, stage_id, end_total, created_at,
+                          arrow_codes, arrow_scores, arrow_x, arrow_y)
+        SELECT e.session_id, e.end_number, e.id, e.stage_id, e.end_total, e.created_at,
+               e.arrow_codes, e.arrow_scores, e.arrow_x, e.arrow_y
+        FROM session_ends e
+        JOIN session_archives a ON a.session_id = e.session_id
+    """)
+    op.execute("SELECT set_config('quiverscore.archiving', 'off', true)")
+    _create_triggers(archiving_aware=False)
+    op.execute("DROP VIEW session_ends")
+    op.execute("DROP TABLE session_archives")
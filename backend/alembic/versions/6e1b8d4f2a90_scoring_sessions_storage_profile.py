@@ -0,0 +1,77 @@
+"""scoring_sessions storage profile
+
+Every submitted end updates its session's totals (0a7d3e5b9c41), so a round
+leaves a dozen or more dead versions of the row behind. An update can be HOT
+(no new index entries, dead version pruned in-page) only when no indexed
+column changes and the new version fits on the same page. With the default
+fillfactor of 100 the page is usually full, so each update lands elsewhere and
+adds an entry to every one of the table's five indexes.
+
+- ``fillfactor = 80`` keeps a fifth of each page free for new row versions.
+  It applies to pages written from now on; existing pages fill up as rows on
+  them are updated and pruned.
+- Autovacuum runs after 2% of the rows are dead (plus 500) instead of 20%,
+  and analyze after 5%, so the free space is reclaimed while a tournament is
+  still running.
+- The total columns must stay unindexed: any index that covers them is
+  dropped (concurrently). None of the revisions create one, so these are
+  found at run time; their definitions are kept in
+  ``migration_dropped_indexes`` and the downgrade builds them again.
+
+``app.migrations.hot_updates`` reports the HOT ratio and dead tuples.
+
+Revision ID: 6e1b8d4f2a90
+Revises: 0a7d3e5b9c41
+Create Date: 2026-10-17 16:02:31.447120
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+from app.migrations.indexes import drop_index_concurrently, restore_dropped_indexes
+
+
+revision: str = '6e1b8d4f2a90'
+down_revision: Union[str, None] = '0a7d3e5b9c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STORAGE = {
+    "fillfactor": 80,
+    "autovacuum_vacuum_scale_factor": 0.02,
+    "autovacuum_vacuum_threshold": 500,
+    "autovacuum_analyze_scale_factor": 0.05,
+}
+HOT_COLUMNS = ["total_score", "total_x_count", "total_arrows"]
+
+_INDEXES_ON = text("""
+    SELECT DISTINCT i.relname
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_attribute a ON a.attrelid = x.indrelid
+    WHERE x.indrelid = to_regclass(:table)
+      AND a.attname = ANY(:columns)
+      AND (a.attnum = ANY(x.indkey)
+           OR pg_get_expr(x.indexprs, x.indrelid) LIKE '%' || a.attname || '%'
+           OR pg_get_expr(x.indpred, x.indrelid) LIKE '%' || a.attname || '%')
+""")
+
+
+def upgrade() -> None:
+    # SHARE UPDATE EXCLUSIVE only: doesn't block reads or writes.
+    options = ", ".join(f"{name} = {value}" for name, value in STORAGE.items())
+    op.execute(f"ALTER TABLE scoring_sessions SET ({options})")
+
+    ctx = op.get_context()
+    if not ctx.as_sql:
+        indexes = ctx.connection.execute(
+            _INDEXES_ON, {"table": "scoring_sessions", "columns": HOT_COLUMNS}
+        ).scalars().all()
+        for index in indexes:
+            drop_index_concurrently(index, "scoring_sessions", remember=revision)
+
+
+def downgrade() -> None:
+    op.execute(f"ALTER TABLE scoring_sessions RESET ({', '.join(STORAGE)})")
+    restore_dropped_indexes(revision)
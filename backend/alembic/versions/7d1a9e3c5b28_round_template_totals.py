@@ -0,0 +1,69 @@
+"""round template totals
+
+A template's maximum score (the sum of num_ends * arrows_per_end *
+max_score_per_arrow over its stages) was computed with a query on
+``round_template_stages`` for every session the stats, trends and personal
+records endpoints list. ``round_templates`` now stores it, with the total
+ends and arrows, and a trigger on the stages recomputes them for the
+template whenever a stage is added, removed or has one of those columns
+changed. Templates are few and small, so the backfill is one UPDATE.
+
+Revision ID: 7d1a9e3c5b28
+Revises: 4b8e2c6f0a17
+Create Date: 2026-10-17 18:21:07.640391
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '7d1a9e3c5b28'
+down_revision: Union[str, None] = '4b8e2c6f0a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ["max_score", "total_ends", "total_arrows"]
+
+_RECOMPUTE = """
+    UPDATE round_templates t SET (max_score, total_ends, total_arrows) = (
+        SELECT coalesce(sum(s.num_ends * s.arrows_per_end * s.max_score_per_arrow), 0),
+               coalesce(sum(s.num_ends), 0),
+               coalesce(sum(s.num_ends * s.arrows_per_end), 0)
+        FROM round_template_stages s
+        WHERE s.template_id = t.id
+    )
+"""
+
+
+def upgrade() -> None:
+    for column in COLUMNS:
+        op.add_column("round_templates", sa.Column(column, sa.Integer(), nullable=False, server_default="0"))
+
+    # OLD and NEW can name different templates when a stage moves.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION round_template_stages_totals() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {_RECOMPUTE}
+            WHERE t.id IN (
+                CASE WHEN TG_OP <> 'INSERT' THEN OLD.template_id END,
+                CASE WHEN TG_OP <> 'DELETE' THEN NEW.template_id END
+            );
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE OR REPLACE TRIGGER trg_round_template_stages_totals "
+        "AFTER INSERT OR DELETE OR UPDATE OF template_id, num_ends, arrows_per_end, max_score_per_arrow "
+        "ON round_template_stages FOR EACH ROW EXECUTE FUNCTION round_template_stages_totals()"
+    )
+
+    op.execute(_RECOMPUTE)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_round_template_stages_totals ON round_template_stages")
+    op.execute("DROP FUNCTION IF EXISTS round_template_stages_totals()")
+    for column in COLUMNS:
+        op.drop_column("round_templates", column)
@@ -0,0 +1,182 @@
+"""pack arrows into per-end arrays
+
+One ``arrows`` row per arrow costs a tuple header, two UUIDs and an index entry
+for every score, and loading a session reads one index range per end. Each end
+now carries its arrows as parallel arrays (``arrow_values``, ``arrow_scores``,
+``arrow_x``, ``arrow_y``; element ``n`` is arrow ``n``), and ``arrows`` becomes
+a view with the old row shape so anything still reading or writing it keeps
+working.
+
+1. Add the arrays with a constant default (metadata-only) and a trigger on the
+   ``arrows`` table that re-folds an end whenever its arrows change, so API
+   instances on the previous release keep the arrays current.
+2. Fold existing arrows into their ends in throttled, resumable chunks.
+3. Replace the table with the view. Arrow ids are derived from the end id and
+   arrow number (``packed_arrow_id``), so they stay stable across reads.
+
+Arrows are re-keyed: every existing arrow's stored id is replaced by its
+``packed_arrow_id``, and anything outside the database still holding an old
+arrow id no longer finds it. The downgrade is lossy in the same way: it
+rebuilds ``arrows`` with the derived ids, as the original ones are gone.
+
+Revision ID: 7f3a91c2d5e8
+Revises: bc4bcd684d8e
+Create Date: 2026-10-17 09:12:44.516203
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.backfill import backfill, reset_backfill
+
+
+revision: str = '7f3a91c2d5e8'
+down_revision: Union[str, None] = 'bc4bcd684d8e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PACKED = "(arrow_values, arrow_scores, arrow_x, arrow_y)"
+
+# The packed arrays for end ``{end}``, folded from the arrows table. Element n
+# is arrow n: a missing arrow number leaves a NULL slot rather than shifting
+# the arrows after it down.
+FOLD = """
+    SELECT
+        coalesce(array_agg(a.score_value ORDER BY n), '{{}}'),
+        coalesce(array_agg(a.score_numeric::smallint ORDER BY n), '{{}}'),
+        coalesce(array_agg(a.x_pos ORDER BY n), '{{}}'),
+        coalesce(array_agg(a.y_pos ORDER BY n), '{{}}')
+    FROM generate_series(1, (SELECT max(arrow_number) FROM arrows WHERE end_id = {end})) AS n
+    LEFT JOIN arrows a ON a.end_id = {end} AND a.arrow_number = n
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE ends
+            ADD COLUMN IF NOT EXISTS arrow_values varchar(5)[] NOT NULL DEFAULT '{}',
+            ADD COLUMN IF NOT EXISTS arrow_scores smallint[] NOT NULL DEFAULT '{}',
+            ADD COLUMN IF NOT EXISTS arrow_x double precision[] NOT NULL DEFAULT '{}',
+            ADD COLUMN IF NOT EXISTS arrow_y double precision[] NOT NULL DEFAULT '{}'
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION arrows_fold_into_end() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE ends e SET {PACKED} = ({FOLD.format(end="e.id")})
+            WHERE e.id = coalesce(NEW.end_id, OLD.end_id);
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE OR REPLACE TRIGGER trg_arrows_fold_into_end AFTER INSERT OR UPDATE OR DELETE "
+        "ON arrows FOR EACH ROW EXECUTE FUNCTION arrows_fold_into_end()"
+    )
+
+    # Ends written through the trigger already have their arrays; the
+    # cardinality guard also skips them if they change under a chunk.
+    backfill(
+        "pack_arrows_into_ends",
+        "ends",
+        f"""
+        UPDATE ends e SET {PACKED} = ({FOLD.format(end="e.id")})
+        FROM batch
+        WHERE e.id = batch.key
+          AND cardinality(e.arrow_values) = 0
+          AND EXISTS (SELECT 1 FROM arrows a WHERE a.end_id = e.id)
+        """,
+    )
+
+    op.execute("DROP TRIGGER trg_arrows_fold_into_end ON arrows")
+    op.execute("DROP FUNCTION arrows_fold_into_end()")
+    op.execute("DROP TABLE arrows")
+    op.execute("""
+        CREATE FUNCTION packed_arrow_id(end_id uuid, arrow_number integer) RETURNS uuid
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        RETURN md5(end_id::text || '/' || arrow_number)::uuid
+    """)
+    op.execute("""
+        CREATE VIEW arrows AS
+        SELECT
+            packed_arrow_id(e.id, a.arrow_number::integer) AS id,
+            e.id AS end_id,
+            a.arrow_number::integer AS arrow_number,
+            a.score_value,
+            a.score_numeric::integer AS score_numeric,
+            a.x_pos,
+            a.y_pos
+        FROM ends e
+        CROSS JOIN LATERAL unnest(e.arrow_values, e.arrow_scores, e.arrow_x, e.arrow_y)
+            WITH ORDINALITY AS a(score_value, score_numeric, x_pos, y_pos, arrow_number)
+        WHERE a.score_value IS NOT NULL
+    """)
+    # Writes through the view land in the arrays. A deleted arrow leaves a NULL
+    # slot (hidden by the view) so the numbers of the arrows after it hold.
+    # Assigning element n of an empty array makes an array that starts at n,
+    # which the view would number from 1, so empty arrays are padded from 1.
+    op.execute("""
+        CREATE FUNCTION arrows_view_write() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE ends SET
+                    arrow_values = array_fill(NULL::varchar, ARRAY[NEW.arrow_number - 1]) || NEW.score_value,
+                    arrow_scores = array_fill(NULL::smallint, ARRAY[NEW.arrow_number - 1]) || NEW.score_numeric::smallint,
+                    arrow_x = array_fill(NULL::double precision, ARRAY[NEW.arrow_number - 1]) || NEW.x_pos,
+                    arrow_y = array_fill(NULL::double precision, ARRAY[NEW.arrow_number - 1]) || NEW.y_pos
+                WHERE id = NEW.end_id AND coalesce(cardinality(arrow_values), 0) = 0;
+                IF NOT FOUND THEN
+                    UPDATE ends SET
+                        arrow_values[NEW.arrow_number] = NEW.score_value,
+                        arrow_scores[NEW.arrow_number] = NEW.score_numeric,
+                        arrow_x[NEW.arrow_number] = NEW.x_pos,
+                        arrow_y[NEW.arrow_number] = NEW.y_pos
+                    WHERE id = NEW.end_id;
+                END IF;
+                RETURN NEW;
+            END IF;
+            UPDATE ends SET
+                arrow_values[OLD.arrow_number] = NULL,
+                arrow_scores[OLD.arrow_number] = NULL,
+                arrow_x[OLD.arrow_number] = NULL,
+                arrow_y[OLD.arrow_number] = NULL
+            WHERE id = OLD.end_id;
+            UPDATE ends SET arrow_values = '{}', arrow_scores = '{}', arrow_x = '{}', arrow_y = '{}'
+            WHERE id = OLD.end_id AND array_remove(arrow_values, NULL) = '{}';
+            RETURN OLD;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE TRIGGER trg_arrows_view_write INSTEAD OF INSERT OR DELETE "
+        "ON arrows FOR EACH ROW EXECUTE FUNCTION arrows_view_write()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW arrows")
+    op.execute("DROP FUNCTION arrows_view_write()")
+    op.create_table('arrows',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('end_id', sa.UUID(), nullable=False),
+    sa.Column('arrow_number', sa.Integer(), nullable=False),
+    sa.Column('score_value', sa.String(length=5), nullable=False),
+    sa.Column('score_numeric', sa.Integer(), nullable=False),
+    sa.Column('x_pos', sa.Float(), nullable=True),
+    sa.Column('y_pos', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['end_id'], ['ends.id'], name=op.f('arrows_end_id_fkey'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('arrows_pkey'))
+    )
+    # The original ids weren't kept; the arrows come back with derived ones.
+    op.execute("""
+        INSERT INTO arrows (id, end_id, arrow_number, score_value, score_numeric, x_pos, y_pos)
+        SELECT packed_arrow_id(e.id, a.arrow_number::integer), e.id, a.arrow_number,
+               a.score_value, a.score_numeric, a.x_pos, a.y_pos
+        FROM ends e
+        CROSS JOIN LATERAL unnest(e.arrow_values, e.arrow_scores, e.arrow_x, e.arrow_y)
+            WITH ORDINALITY AS a(score_value, score_numeric, x_pos, y_pos, arrow_number)
+        WHERE a.score_value IS NOT NULL
+    """)
+    op.create_index(op.f('ix_arrows_end_id'), 'arrows', ['end_id'], unique=False)
+    op.execute("DROP FUNCTION packed_arrow_id(uuid, integer)")
+    op.execute("ALTER TABLE ends DROP COLUMN arrow_values, DROP COLUMN arrow_scores, DROP COLUMN arrow_x, DROP COLUMN arrow_y")
+    reset_backfill("pack_arrows_into_ends")
@@ -0,0 +1,146 @@
+"""end event log
+
+``end_events`` is an append-only log of what happened to a session's ends:
+``submit`` (with the end's data) and ``undo`` (which end went). Each event
+gets the session's next sequence number (``scoring_sessions.last_event_seq``),
+so a phone that reconnects asks for the events after the last one it saw
+instead of downloading the whole session again.
+
+The API writes the event, not the end. A BEFORE INSERT trigger allocates the
+sequence number (locking the session row, which also serializes a session's
+submits and undos) and applies the event to ``ends``: a submit inserts the
+end, an undo deletes the session's last end and records which one that was.
+Undo is a single insert and no longer has to find the end first.
+
+API instances still on the previous release write ``ends`` directly during
+the rollout; a trigger on ``ends`` logs those writes as events, so the log
+stays complete. That release inserts an end with a zero total and no arrows
+and fills both in afterwards, in the same transaction, so the trigger is a
+constraint trigger deferred to commit and logs the end as it is then. Writes made from inside a trigger (cascades, the ``arrows``
+view) are not logged. The log starts empty: ``GET /sessions/{id}`` returns
+``last_event_seq`` with the session, and that is the point to sync from.
+
+Like ``ends`` it is hash-partitioned on ``session_id`` (``end_events_p00`` ..
+``end_events_p15``) and goes with its session.
+
+Revision ID: 9c2f5a7e1d36
+Revises: 6e1b8d4f2a90
+Create Date: 2026-10-17 16:48:12.305518
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.partitions import create_hash_partitions
+
+
+revision: str = '9c2f5a7e1d36'
+down_revision: Union[str, None] = '6e1b8d4f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+
+
+def upgrade() -> None:
+    # A constant default: no table rewrite.
+    op.add_column(
+        "scoring_sessions",
+        sa.Column("last_event_seq", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+    op.execute("""
+        CREATE TABLE end_events (
+            session_id uuid NOT NULL,
+            seq bigint NOT NULL,
+            kind varchar(10) NOT NULL,
+            end_number integer NOT NULL,
+            end_id uuid NOT NULL,
+            stage_id uuid,
+            end_total integer,
+            arrow_codes smallint[],
+            arrow_scores smallint[],
+            arrow_x real[],
+            arrow_y real[],
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT end_events_pkey PRIMARY KEY (session_id, seq),
+            CONSTRAINT end_events_session_id_fkey FOREIGN KEY (session_id) REFERENCES scoring_sessions (id) ON DELETE CASCADE,
+            CONSTRAINT ck_end_event_kind CHECK (kind IN ('submit', 'undo'))
+        ) PARTITION BY HASH (session_id)
+    """)
+    create_hash_partitions("end_events", PARTITIONS)
+
+    # pg_trigger_depth() is 1 for an event the API inserted and 2 for one
+    # logged by trg_ends_log_event below, whose change has already happened
+    # (its WHEN is checked when the end is written, not at commit).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION end_events_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE scoring_sessions SET last_event_seq = last_event_seq + 1
+            WHERE id = NEW.session_id
+            RETURNING last_event_seq INTO NEW.seq;
+            IF pg_trigger_depth() > 1 THEN
+                RETURN NEW;
+            END IF;
+
+            IF NEW.kind = 'submit' THEN
+                NEW.end_id := coalesce(NEW.end_id, uuid_generate_v7());
+                INSERT INTO ends (id, session_id, stage_id, end_number, end_total, created_at,
+                                  arrow_codes, arrow_scores, arrow_x, arrow_y)
+                VALUES (NEW.end_id, NEW.session_id, NEW.stage_id, NEW.end_number, NEW.end_total, NEW.created_at,
+                        NEW.arrow_codes, NEW.arrow_scores, NEW.arrow_x, NEW.arrow_y);
+            ELSE
+                DELETE FROM ends
+                WHERE session_id = NEW.session_id
+                  AND end_number = (SELECT max(end_number) FROM ends WHERE session_id = NEW.session_id)
+                RETURNING end_number, id INTO NEW.end_number, NEW.end_id;
+                IF NOT FOUND THEN
+                    RAISE EXCEPTION 'session % has no ends to undo', NEW.session_id USING ERRCODE = 'no_data_found';
+                END IF;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE OR REPLACE TRIGGER trg_end_events_apply BEFORE INSERT ON end_events "
+        "FOR EACH ROW EXECUTE FUNCTION end_events_apply()"
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ends_log_event() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            e record;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                -- The end as the transaction left it; one it also deleted
+                -- is logged as inserted, and its undo follows.
+                SELECT * INTO e FROM ends WHERE session_id = NEW.session_id AND id = NEW.id;
+                IF NOT FOUND THEN
+                    e := NEW;
+                END IF;
+                INSERT INTO end_events (session_id, kind, end_number, end_id, stage_id, end_total, created_at,
+                                        arrow_codes, arrow_scores, arrow_x, arrow_y)
+                VALUES (e.session_id, 'submit', e.end_number, e.id, e.stage_id, e.end_total, e.created_at,
+                        e.arrow_codes, e.arrow_scores, e.arrow_x, e.arrow_y);
+            ELSE
+                INSERT INTO end_events (session_id, kind, end_number, end_id)
+                VALUES (OLD.session_id, 'undo', OLD.end_number, OLD.id);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE CONSTRAINT TRIGGER trg_ends_log_event AFTER INSERT OR DELETE ON ends "
+        "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW WHEN (pg_trigger_depth() < 1) "
+        "EXECUTE FUNCTION ends_log_event()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_ends_log_event ON ends")
+    op.execute("DROP FUNCTION IF EXISTS ends_log_event()")
+    op.execute("DROP TABLE IF EXISTS end_events")
+    op.execute("DROP FUNCTION IF EXISTS end_events_apply()")
+    op.drop_column("scoring_sessions", "last_event_seq")
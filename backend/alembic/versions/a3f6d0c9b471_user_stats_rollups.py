@@ -0,0 +1,183 @@
+"""user stats rollups
+
+``/sessions/stats`` aggregated every one of the user's sessions on each load.
+``user_stats`` keeps the user's session and arrow counts and
+``user_template_stats`` the completed sessions' count, score sum and best per
+round template, so the dashboard reads a row per user and one per template
+shot.
+
+Both cover settled sessions only (completed or abandoned): an in-progress
+session's totals change with every end, and folding them in here would turn
+each end into a write to the user's row. The API adds the user's in-progress
+sessions, found through a partial index, itself.
+
+A trigger on ``scoring_sessions`` subtracts a row's old contribution and adds
+its new one whenever a settled row is inserted, deleted or has its status,
+totals, template or completion time changed. A best score can't be
+subtracted: deleting or demoting a template's best session recomputes it
+from the user's remaining sessions.
+
+The backfill and ``app.migrations.user_stats`` share the rebuild statements.
+
+Revision ID: a3f6d0c9b471
+Revises: 7d1a9e3c5b28
+Create Date: 2026-10-17 19:02:44.183520
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.backfill import backfill, reset_backfill
+from app.migrations.indexes import create_index_concurrently, drop_index_concurrently
+from app.migrations.user_stats import REBUILD_TEMPLATE_STATS, REBUILD_USER_STATS
+
+
+revision: str = 'a3f6d0c9b471'
+down_revision: Union[str, None] = '7d1a9e3c5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGER_COLUMNS = "status, total_score, total_x_count, total_arrows, template_id, user_id, completed_at"
+
+# Ties go to the most recently completed session, as the API always did.
+_BETTER = (
+    "(t.best_score IS NULL OR EXCLUDED.best_score > t.best_score"
+    " OR (EXCLUDED.best_score = t.best_score AND EXCLUDED.best_at > t.best_at) IS TRUE)"
+)
+
+_APPLY = f"""
+    CREATE OR REPLACE FUNCTION user_stats_apply(s scoring_sessions, sign integer) RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO user_stats AS u (user_id, sessions, completed_sessions, arrows, x_count)
+        VALUES (s.user_id, sign, CASE WHEN s.status = 'completed' THEN sign ELSE 0 END,
+                sign * s.total_arrows, sign * s.total_x_count)
+        ON CONFLICT (user_id) DO UPDATE
+        SET sessions = u.sessions + EXCLUDED.sessions,
+            completed_sessions = u.completed_sessions + EXCLUDED.completed_sessions,
+            arrows = u.arrows + EXCLUDED.arrows,
+            x_count = u.x_count + EXCLUDED.x_count;
+
+        IF s.status <> 'completed' THEN
+            RETURN;
+        END IF;
+
+        IF sign > 0 THEN
+            INSERT INTO user_template_stats AS t (user_id, template_id, completed_sessions, score_sum, best_score, best_at)
+            VALUES (s.user_id, s.template_id, 1, s.total_score, s.total_score, s.completed_at)
+            ON CONFLICT (user_id, template_id) DO UPDATE
+            SET completed_sessions = t.completed_sessions + 1,
+                score_sum = t.score_sum + EXCLUDED.score_sum,
+                best_score = CASE WHEN {_BETTER} THEN EXCLUDED.best_score ELSE t.best_score END,
+                best_at = CASE WHEN {_BETTER} THEN EXCLUDED.best_at ELSE t.best_at END;
+        ELSE
+            UPDATE user_template_stats t
+            SET completed_sessions = t.completed_sessions - 1,
+                score_sum = t.score_sum - s.total_score
+            WHERE t.user_id = s.user_id AND t.template_id = s.template_id;
+
+            -- This runs after the row changed, so the session itself is
+            -- either gone or counted with its new values.
+            UPDATE user_template_stats t
+            SET (best_score, best_at) = (
+                SELECT o.total_score, o.completed_at FROM scoring_sessions o
+                WHERE o.user_id = s.user_id AND o.template_id = s.template_id AND o.status = 'completed'
+                ORDER BY o.total_score DESC, o.completed_at DESC NULLS LAST
+                LIMIT 1
+            )
+            WHERE t.user_id = s.user_id AND t.template_id = s.template_id
+              AND s.total_score >= t.best_score;
+        END IF;
+    END
+    $$
+"""
+
+_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION scoring_sessions_user_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.status <> 'in_progress' THEN
+            PERFORM user_stats_apply(OLD, -1);
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.status <> 'in_progress' THEN
+            PERFORM user_stats_apply(NEW, 1);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+# Ends change an in-progress session's totals all the time; those updates
+# must not even enter the function.
+_TRIGGERS = {
+    "trg_scoring_sessions_user_stats_on_insert": ("AFTER INSERT", "NEW.status <> 'in_progress'"),
+    "trg_scoring_sessions_user_stats_on_delete": ("AFTER DELETE", "OLD.status <> 'in_progress'"),
+    "trg_scoring_sessions_user_stats_on_update": (
+        f"AFTER UPDATE OF {TRIGGER_COLUMNS}",
+        "OLD.status <> 'in_progress' OR NEW.status <> 'in_progress'",
+    ),
+}
+
+
+def upgrade() -> None:
+    # Everything before the backfills is idempotent; a resumed run repeats it.
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id uuid NOT NULL,
+            sessions integer NOT NULL DEFAULT 0,
+            completed_sessions integer NOT NULL DEFAULT 0,
+            arrows bigint NOT NULL DEFAULT 0,
+            x_count bigint NOT NULL DEFAULT 0,
+            CONSTRAINT user_stats_pkey PRIMARY KEY (user_id),
+            CONSTRAINT user_stats_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS user_template_stats (
+            user_id uuid NOT NULL,
+            template_id uuid NOT NULL,
+            completed_sessions integer NOT NULL DEFAULT 0,
+            score_sum bigint NOT NULL DEFAULT 0,
+            best_score integer,
+            best_at timestamptz,
+            CONSTRAINT user_template_stats_pkey PRIMARY KEY (user_id, template_id),
+            CONSTRAINT user_template_stats_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            CONSTRAINT user_template_stats_template_id_fkey FOREIGN KEY (template_id) REFERENCES round_templates (id) ON DELETE CASCADE
+        )
+    """)
+
+    op.execute(_APPLY)
+    op.execute(_TRIGGER_FUNCTION)
+    for name, (timing, when) in _TRIGGERS.items():
+        op.execute(
+            f"CREATE OR REPLACE TRIGGER {name} {timing} ON scoring_sessions "
+            f"FOR EACH ROW WHEN ({when}) EXECUTE FUNCTION scoring_sessions_user_stats()"
+        )
+
+    # The trigger is live from here on; the rebuild statements lock the
+    # sessions they read, so a session settling mid-backfill isn't lost.
+    backfill("user_stats", "users", REBUILD_USER_STATS)
+    backfill("user_template_stats", "users", REBUILD_TEMPLATE_STATS)
+
+    # The stats endpoint's remaining per-session reads: in-progress sessions
+    # and the ten most recent completed ones. Neither covers the totals, so
+    # their updates stay HOT (6e1b8d4f2a90).
+    create_index_concurrently(
+        "ix_scoring_sessions_in_progress", "scoring_sessions", ["user_id"],
+        postgresql_where=sa.text("status = 'in_progress'"),
+    )
+    create_index_concurrently(
+        "ix_scoring_sessions_completed", "scoring_sessions", ["user_id", sa.text("completed_at DESC NULLS LAST")],
+        postgresql_where=sa.text("status = 'completed'"),
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_scoring_sessions_completed", "scoring_sessions")
+    drop_index_concurrently("ix_scoring_sessions_in_progress", "scoring_sessions")
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON scoring_sessions")
+    op.execute("DROP FUNCTION IF EXISTS scoring_sessions_user_stats()")
+    op.execute("DROP FUNCTION IF EXISTS user_stats_apply(scoring_sessions, integer)")
+    op.execute("DROP TABLE IF EXISTS user_template_stats")
+    op.execute("DROP TABLE IF EXISTS user_stats")
+    reset_backfill("user_template_stats")
+    reset_backfill("user_stats")
@@ -0,0 +1,99 @@
+"""dictionary-encode arrow values
+
+Expand step for storing arrows as small codes instead of strings and doubles:
+
+- ``score_codes`` maps each score value ("X", "10", ..., "M", and whatever a
+  template adds later) to a smallint code. ``score_codes_for()`` encodes an
+  array of values, adding codes for values it hasn't seen; ``score_values()``
+  decodes.
+- ``ends.arrow_codes smallint[]`` replaces ``arrow_values varchar(5)[]``. The
+  API writes codes from this release on; the trigger keeps ``arrow_values``
+  filled in for instances still on the previous release.
+- ``arrow_x_v2``/``arrow_y_v2 real[]`` shadow ``arrow_x``/``arrow_y``. Target
+  positions don't need double precision.
+
+The contract revision in the next release drops ``arrow_values`` and renames
+the real arrays over the double ones.
+
+Revision ID: a4d2c8e61f37
+Revises: 7f3a91c2d5e8
+Create Date: 2026-10-17 10:41:05.228410
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.expand_contract import expand, undo_expand
+
+
+revision: str = 'a4d2c8e61f37'
+down_revision: Union[str, None] = '7f3a91c2d5e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STANDARD_VALUES = ["X", "10", "9", "8", "7", "6", "5", "4", "3", "2", "1", "M", "11"]
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS score_codes (
+            code smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            value varchar(5) NOT NULL UNIQUE
+        )
+    """)
+    values = ", ".join(f"('{value}')" for value in STANDARD_VALUES)
+    op.execute(f"INSERT INTO score_codes (value) VALUES {values} ON CONFLICT (value) DO NOTHING")
+    op.execute("""
+        INSERT INTO score_codes (value)
+        SELECT DISTINCT v FROM round_template_stages s, json_array_elements_text(s.allowed_values) AS v
+        WHERE length(v) <= 5 AND NOT EXISTS (SELECT 1 FROM score_codes c WHERE c.value = v)
+        ON CONFLICT (value) DO NOTHING
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION score_codes_for(vals varchar[]) RETURNS smallint[]
+        LANGUAGE plpgsql STRICT AS $$
+        BEGIN
+            -- Only genuinely new values reach the INSERT, so the identity
+            -- isn't spent on conflicts.
+            INSERT INTO score_codes (value)
+            SELECT DISTINCT v FROM unnest(vals) AS v
+            WHERE v IS NOT NULL AND NOT EXISTS (SELECT 1 FROM score_codes c WHERE c.value = v)
+            ON CONFLICT (value) DO NOTHING;
+            RETURN ARRAY(
+                SELECT c.code
+                FROM unnest(vals) WITH ORDINALITY AS u(value, n)
+                LEFT JOIN score_codes c ON c.value = u.value
+                ORDER BY u.n
+            );
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION score_values(codes smallint[]) RETURNS varchar[]
+        LANGUAGE sql STABLE STRICT PARALLEL SAFE
+        RETURN ARRAY(
+            SELECT c.value
+            FROM unnest(codes) WITH ORDINALITY AS u(code, n)
+            LEFT JOIN score_codes c ON c.code = u.code
+            ORDER BY u.n
+        )
+    """)
+
+    # The API stops writing arrow_values; without a default the trigger
+    # derives it from arrow_codes for readers on the previous release.
+    op.execute("ALTER TABLE ends ALTER COLUMN arrow_values DROP DEFAULT, ALTER COLUMN arrow_values DROP NOT NULL")
+    expand("ends", "arrow_values", "arrow_codes", "smallint[]",
+           using="score_codes_for({old})", reverse="score_values({new})")
+    expand("ends", "arrow_x", "arrow_x_v2", "real[]")
+    expand("ends", "arrow_y", "arrow_y_v2", "real[]")
+
+
+def downgrade() -> None:
+    undo_expand("ends", "arrow_y", "arrow_y_v2")
+    undo_expand("ends", "arrow_x", "arrow_x_v2")
+    undo_expand("ends", "arrow_values", "arrow_codes")
+    op.execute("UPDATE ends SET arrow_values = '{}' WHERE arrow_values IS NULL")
+    op.execute("ALTER TABLE ends ALTER COLUMN arrow_values SET DEFAULT '{}', ALTER COLUMN arrow_values SET NOT NULL")
+    op.execute("DROP FUNCTION IF EXISTS score_values(smallint[])")
+    op.execute("DROP FUNCTION IF EXISTS score_codes_for(varchar[])")
+    op.execute("DROP TABLE IF EXISTS score_codes")
@@ -0,0 +1,43 @@
+"""add indexes for unindexed foreign keys
+
+Revision ID: bc4bcd684d8e
+Revises: 0c2446f1aa1a
+Create Date: 2026-10-17 03:08:50.873284
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.indexes import create_index_concurrently, drop_index_concurrently
+
+
+revision: str = 'bc4bcd684d8e'
+down_revision: Union[str, None] = '0c2446f1aa1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently('ix_challenges_challengee_session_id', 'challenges', ['challengee_session_id'])
+    create_index_concurrently('ix_challenges_challenger_session_id', 'challenges', ['challenger_session_id'])
+    create_index_concurrently('ix_challenges_template_id', 'challenges', ['template_id'])
+    create_index_concurrently('ix_classification_records_session_id', 'classification_records', ['session_id'])
+    create_index_concurrently('ix_club_shared_rounds_shared_by', 'club_shared_rounds', ['shared_by'])
+    create_index_concurrently('ix_clubs_owner_id', 'clubs', ['owner_id'])
+    create_index_concurrently('ix_round_templates_created_by', 'round_templates', ['created_by'])
+    create_index_concurrently('ix_tournament_matchups_participant_a_id', 'tournament_matchups', ['participant_a_id'])
+    create_index_concurrently('ix_tournament_matchups_participant_b_id', 'tournament_matchups', ['participant_b_id'])
+    create_index_concurrently('ix_tournament_matchups_winner_id', 'tournament_matchups', ['winner_id'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_tournament_matchups_winner_id', 'tournament_matchups')
+    drop_index_concurrently('ix_tournament_matchups_participant_b_id', 'tournament_matchups')
+    drop_index_concurrently('ix_tournament_matchups_participant_a_id', 'tournament_matchups')
+    drop_index_concurrently('ix_round_templates_created_by', 'round_templates')
+    drop_index_concurrently('ix_clubs_owner_id', 'clubs')
+    drop_index_concurrently('ix_club_shared_rounds_shared_by', 'club_shared_rounds')
+    drop_index_concurrently('ix_classification_records_session_id', 'classification_records')
+    drop_index_concurrently('ix_challenges_template_id', 'challenges')
+    drop_index_concurrently('ix_challenges_challenger_session_id', 'challenges')
+    drop_index_concurrently('ix_challenges_challengee_session_id', 'challenges')
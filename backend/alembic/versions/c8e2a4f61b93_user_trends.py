@@ -0,0 +1,73 @@
+"""user trends
+
+``/sessions/trends`` returns one point per completed session and leaves the
+smoothing to the client, which for a long history means downloading all of
+it. ``user_trends`` stores each (user, template) series with its moving
+average and EWMA already computed, as parallel arrays in completion order like
+``session_archives``, and ``user_trend_samples`` the positions in it that a
+downsampled series of ``points`` points keeps.
+
+``app.migrations.trend_series`` fills both with NumPy; this revision only
+creates them, so the migration image doesn't need NumPy. Until the job has
+run, the API computes the series from the sessions.
+
+Revision ID: c8e2a4f61b93
+Revises: a3f6d0c9b471
+Create Date: 2026-10-17 19:47:31.506218
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c8e2a4f61b93'
+down_revision: Union[str, None] = 'a3f6d0c9b471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARRAY_COLUMNS = {
+    "session_ids": "uuid[]",
+    "completed_ats": "timestamptz[]",
+    "scores": "integer[]",
+    "percentages": "real[]",
+    "moving_avgs": "real[]",
+    "ewmas": "real[]",
+}
+
+
+def upgrade() -> None:
+    columns = ",\n            ".join(f"{name} {type_} NOT NULL DEFAULT '{{}}'" for name, type_ in ARRAY_COLUMNS.items())
+    # max_score, sessions and score_sum are what the series was computed
+    # from; the job compares them with user_template_stats to find stale ones.
+    op.execute(f"""
+        CREATE TABLE user_trends (
+            user_id uuid NOT NULL,
+            template_id uuid NOT NULL,
+            max_score integer NOT NULL,
+            sessions integer NOT NULL,
+            score_sum bigint NOT NULL,
+            {columns},
+            computed_through timestamptz NOT NULL,
+            computed_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT user_trends_pkey PRIMARY KEY (user_id, template_id),
+            CONSTRAINT user_trends_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            CONSTRAINT user_trends_template_id_fkey FOREIGN KEY (template_id) REFERENCES round_templates (id) ON DELETE CASCADE
+        )
+    """)
+    op.execute("""
+        CREATE TABLE user_trend_samples (
+            user_id uuid NOT NULL,
+            template_id uuid NOT NULL,
+            points integer NOT NULL,
+            positions integer[] NOT NULL,
+            CONSTRAINT user_trend_samples_pkey PRIMARY KEY (user_id, template_id, points),
+            CONSTRAINT user_trend_samples_user_id_template_id_fkey FOREIGN KEY (user_id, template_id)
+                REFERENCES user_trends (user_id, template_id) ON DELETE CASCADE
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE user_trend_samples")
+    op.execute("DROP TABLE user_trends")
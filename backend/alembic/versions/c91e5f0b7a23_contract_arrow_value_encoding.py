@@ -0,0 +1,142 @@
+"""contract arrow value encoding
+
+Contract step for a4d2c8e61f37, now that every API instance reads and writes
+``arrow_codes``: drop ``arrow_values`` and its sync trigger, and move the real
+position arrays into place as ``arrow_x``/``arrow_y``. The ``arrows`` view is
+pointed at the new columns first (same column types, so CREATE OR REPLACE
+works and nothing that reads it notices).
+
+This ships in the same release as a4d2c8e61f37 and runs before that
+release's API is deployed, so it doesn't wait for writers: the release
+before never writes ``arrow_values`` itself (the column is new in
+7f3a91c2d5e8), only arrows through the ``arrows`` view, which now writes
+``arrow_codes``. Its position writes are double precision and cast to
+``real``.
+
+Revision ID: c91e5f0b7a23
+Revises: a4d2c8e61f37
+Create Date: 2026-10-17 11:58:12.904771
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.expand_contract import contract, expand
+
+
+revision: str = 'c91e5f0b7a23'
+down_revision: Union[str, None] = 'a4d2c8e61f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _arrows_view(values: str, x: str, y: str) -> str:
+    return f"""
+        CREATE OR REPLACE VIEW arrows AS
+        SELECT
+            packed_arrow_id(e.id, a.arrow_number::integer) AS id,
+            e.id AS end_id,
+            a.arrow_number::integer AS arrow_number,
+            a.score_value,
+            a.score_numeric::integer AS score_numeric,
+            a.x_pos::double precision AS x_pos,
+            a.y_pos::double precision AS y_pos
+        FROM ends e
+        CROSS JOIN LATERAL unnest({values}, e.arrow_scores, e.{x}, e.{y})
+            WITH ORDINALITY AS a(score_value, score_numeric, x_pos, y_pos, arrow_number)
+        WHERE a.score_value IS NOT NULL
+    """
+
+
+def _arrows_view_write(values: str, x: str, y: str, position_type: str) -> str:
+    if values == "arrow_codes":
+        value, value_type = "(score_codes_for(ARRAY[NEW.score_value]))[1]", "smallint"
+    else:
+        value, value_type = "NEW.score_value", "varchar"
+    slots = [
+        (values, value, value_type),
+        ("arrow_scores", "NEW.score_numeric", "smallint"),
+        (x, "NEW.x_pos", position_type),
+        (y, "NEW.y_pos", position_type),
+    ]
+    # An empty array is padded from 1: assigning element n alone would make
+    # it start at n, and the view numbers arrows from 1 (see 7f3a91c2d5e8).
+    first = ",\n".join(
+        f"{column} = array_fill(NULL::{type_}, ARRAY[NEW.arrow_number - 1]) || {new}::{type_}"
+        for column, new, type_ in slots
+    )
+    assign = ",\n".join(f"{column}[NEW.arrow_number] = {new}" for column, new, _ in slots)
+    return f"""
+        CREATE OR REPLACE FUNCTION arrows_view_write() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE ends SET {first}
+                WHERE id = NEW.end_id AND coalesce(cardinality({values}), 0) = 0;
+                IF NOT FOUND THEN
+                    UPDATE ends SET {assign}
+                    WHERE id = NEW.end_id;
+                END IF;
+                RETURN NEW;
+            END IF;
+            UPDATE ends SET
+                {values}[OLD.arrow_number] = NULL,
+                arrow_scores[OLD.arrow_number] = NULL,
+                {x}[OLD.arrow_number] = NULL,
+                {y}[OLD.arrow_number] = NULL
+            WHERE id = OLD.end_id;
+            UPDATE ends SET {values} = '{{}}', arrow_scores = '{{}}', {x} = '{{}}', {y} = '{{}}'
+            WHERE id = OLD.end_id AND array_remove({values}, NULL) = '{{}}';
+            RETURN OLD;
+        END
+        $$
+    """
+
+
+def upgrade() -> None:
+    op.execute(_arrows_view("score_values(e.arrow_codes)", "arrow_x_v2", "arrow_y_v2"))
+    op.execute(_arrows_view_write("arrow_codes", "arrow_x_v2", "arrow_y_v2", "real"))
+
+    contract("ends", "arrow_values", "arrow_codes", not_null=True)
+    contract("ends", "arrow_x", "arrow_x_v2", not_null=True, rename=True)
+    contract("ends", "arrow_y", "arrow_y_v2", not_null=True, rename=True)
+    op.execute("""
+        ALTER TABLE ends
+            ALTER COLUMN arrow_codes SET DEFAULT '{}',
+            ALTER COLUMN arrow_x SET DEFAULT '{}',
+            ALTER COLUMN arrow_y SET DEFAULT '{}'
+    """)
+    op.execute(_arrows_view_write("arrow_codes", "arrow_x", "arrow_y", "real"))
+
+
+def downgrade() -> None:
+    # Back to the expanded state: old columns restored and filled, sync
+    # triggers reinstalled (their backfills are already marked complete).
+    op.execute("""
+        ALTER TABLE ends
+            ALTER COLUMN arrow_codes DROP DEFAULT,
+            ALTER COLUMN arrow_codes DROP NOT NULL,
+            ALTER COLUMN arrow_x DROP DEFAULT,
+            ALTER COLUMN arrow_x DROP NOT NULL,
+            ALTER COLUMN arrow_y DROP DEFAULT,
+            ALTER COLUMN arrow_y DROP NOT NULL
+    """)
+    op.execute("ALTER TABLE ends RENAME COLUMN arrow_x TO arrow_x_v2")
+    op.execute("ALTER TABLE ends RENAME COLUMN arrow_y TO arrow_y_v2")
+    op.execute("""
+        ALTER TABLE ends
+            ADD COLUMN arrow_values varchar(5)[],
+            ADD COLUMN arrow_x double precision[] NOT NULL DEFAULT '{}',
+            ADD COLUMN arrow_y double precision[] NOT NULL DEFAULT '{}'
+    """)
+    op.execute("""
+        UPDATE ends SET
+            arrow_values = score_values(arrow_codes),
+            arrow_x = arrow_x_v2::double precision[],
+            arrow_y = arrow_y_v2::double precision[]
+    """)
+    op.execute(_arrows_view("e.arrow_values", "arrow_x", "arrow_y"))
+    op.execute(_arrows_view_write("arrow_values", "arrow_x", "arrow_y", "double precision"))
+    expand("ends", "arrow_values", "arrow_codes", "smallint[]",
+           using="score_codes_for({old})", reverse="score_values({new})")
+    expand("ends", "arrow_x", "arrow_x_v2", "real[]")
+    expand("ends", "arrow_y", "arrow_y_v2", "real[]")
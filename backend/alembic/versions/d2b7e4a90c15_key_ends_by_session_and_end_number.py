@@ -0,0 +1,66 @@
+"""key ends by session and end number
+
+``ends`` was keyed by a random uuid4, so every submitted end landed on a random
+leaf of ``ends_pkey`` and the index split pages all over. The natural key
+(session_id, end_number) is now the primary key: inserts for a session go to
+one spot, and it also serves every ``WHERE session_id = ...`` lookup, so
+``ix_ends_session_id`` goes too.
+
+``ends.id`` stays as the end's public id (API payloads, ``session_end``
+attachment owners, arrow ids), so it keeps a unique index, ``uq_ends_id``:
+writes through the ``arrows`` view and attachment checks still find an end
+by it.
+
+Arrows have no key of their own since 7f3a91c2d5e8; (end_id, arrow_number) is
+their position in the end's arrays.
+
+Revision ID: d2b7e4a90c15
+Revises: c91e5f0b7a23
+Create Date: 2026-10-17 12:40:37.117905
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.indexes import create_index_concurrently, drop_index_concurrently
+
+
+revision: str = 'd2b7e4a90c15'
+down_revision: Union[str, None] = 'c91e5f0b7a23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # End numbers come from a count at submit time, so a double-submit could
+    # have produced duplicates. Renumber those sessions in submission order.
+    op.execute("""
+        WITH duplicated AS (
+            SELECT DISTINCT session_id FROM ends GROUP BY session_id, end_number HAVING count(*) > 1
+        ), renumbered AS (
+            SELECT id, row_number() OVER (PARTITION BY session_id ORDER BY end_number, created_at, id) AS n
+            FROM ends WHERE session_id IN (SELECT session_id FROM duplicated)
+        )
+        UPDATE ends e SET end_number = r.n
+        FROM renumbered r
+        WHERE e.id = r.id AND e.end_number <> r.n
+    """)
+    create_index_concurrently('uq_ends_session_id_end_number', 'ends', ['session_id', 'end_number'], unique=True)
+    create_index_concurrently('uq_ends_id', 'ends', ['id'], unique=True)
+    op.execute("""
+        ALTER TABLE ends
+            DROP CONSTRAINT ends_pkey,
+            ADD CONSTRAINT ends_pkey PRIMARY KEY USING INDEX uq_ends_session_id_end_number
+    """)
+    drop_index_concurrently('ix_ends_session_id', 'ends')
+
+
+def downgrade() -> None:
+    create_index_concurrently('ix_ends_session_id', 'ends', ['session_id'])
+    # Normally still there from upgrade; rebuilt if it isn't.
+    create_index_concurrently('uq_ends_id', 'ends', ['id'], unique=True)
+    op.execute("""
+        ALTER TABLE ends
+            DROP CONSTRAINT ends_pkey,
+            ADD CONSTRAINT ends_pkey PRIMARY KEY USING INDEX uq_ends_id
+    """)
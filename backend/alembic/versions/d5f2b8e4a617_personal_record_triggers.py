@@ -0,0 +1,134 @@
+"""personal record triggers
+
+Completing a session read the user's record for the template and then
+inserted or updated it from the API, two more round trips, racing any other
+completion of the same round, and nothing touched the record when sessions
+changed any other way: deleting the record's session by hand failed on the
+foreign key, and re-scoring or reopening it left a record no session backs.
+
+A trigger on ``scoring_sessions`` now keeps ``personal_records``:
+
+* a session that is completed (or inserted completed) offers its score, which
+  replaces the record only if strictly higher, so on a tie the session
+  completed first keeps it, as before;
+* when the record's session is re-scored, reopened, moved or deleted, the
+  record goes to the user's best remaining completed session of the template,
+  or is dropped if there is none. Deletes are handled BEFORE the row goes, as
+  the foreign key is checked before an AFTER trigger would run.
+
+The backfill and ``app.migrations.personal_records`` share the rebuild
+statement.
+
+Revision ID: d5f2b8e4a617
+Revises: c8e2a4f61b93
+Create Date: 2026-10-17 20:36:12.840519
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.migrations.backfill import backfill, reset_backfill
+from app.migrations.personal_records import REBUILD_PERSONAL_RECORDS
+
+
+revision: str = 'd5f2b8e4a617'
+down_revision: Union[str, None] = 'c8e2a4f61b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGER_COLUMNS = "status, total_score, template_id, user_id, completed_at"
+
+_OFFER = """
+    CREATE OR REPLACE FUNCTION personal_record_offer(s scoring_sessions) RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO personal_records AS pr (id, user_id, template_id, session_id, score, achieved_at)
+        VALUES (uuid_generate_v7(), s.user_id, s.template_id, s.id, s.total_score,
+                coalesce(s.completed_at, s.started_at))
+        ON CONFLICT (user_id, template_id) DO UPDATE
+        SET session_id = EXCLUDED.session_id, score = EXCLUDED.score, achieved_at = EXCLUDED.achieved_at
+        WHERE EXCLUDED.score > pr.score;
+    END
+    $$
+"""
+
+# Picks as REBUILD_PERSONAL_RECORDS does. ``skip`` is the session being
+# deleted, which is still visible to a BEFORE trigger.
+_ELECT = """
+    CREATE OR REPLACE FUNCTION personal_record_elect(p_user uuid, p_template uuid, skip uuid)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE personal_records pr
+        SET session_id = b.id, score = b.total_score, achieved_at = b.at
+        FROM (
+            SELECT id, total_score, coalesce(completed_at, started_at) AS at FROM scoring_sessions
+            WHERE user_id = p_user AND template_id = p_template AND status = 'completed'
+              AND id IS DISTINCT FROM skip
+            ORDER BY total_score DESC, coalesce(completed_at, started_at), id
+            LIMIT 1
+        ) b
+        WHERE pr.user_id = p_user AND pr.template_id = p_template;
+        IF NOT FOUND THEN
+            DELETE FROM personal_records WHERE user_id = p_user AND template_id = p_template;
+        END IF;
+    END
+    $$
+"""
+
+_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION scoring_sessions_personal_record() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND EXISTS (
+            SELECT 1 FROM personal_records
+            WHERE user_id = OLD.user_id AND template_id = OLD.template_id AND session_id = OLD.id
+        ) THEN
+            PERFORM personal_record_elect(OLD.user_id, OLD.template_id,
+                                          CASE WHEN TG_OP = 'DELETE' THEN OLD.id END);
+        END IF;
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        IF NEW.status = 'completed' THEN
+            PERFORM personal_record_offer(NEW);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+# Only completed sessions hold records, so ends scored on an in-progress
+# session never enter the function. Deletes are rare and checked regardless
+# of status, so a record left on a reopened session by hand can't block one.
+_TRIGGERS = {
+    "trg_scoring_sessions_personal_record_on_insert": ("AFTER INSERT", "NEW.status = 'completed'"),
+    "trg_scoring_sessions_personal_record_on_delete": ("BEFORE DELETE", None),
+    "trg_scoring_sessions_personal_record_on_update": (
+        f"AFTER UPDATE OF {TRIGGER_COLUMNS}",
+        "OLD.status = 'completed' OR NEW.status = 'completed'",
+    ),
+}
+
+
+def upgrade() -> None:
+    # Everything before the backfill is idempotent; a resumed run repeats it.
+    op.execute(_OFFER)
+    op.execute(_ELECT)
+    op.execute(_TRIGGER_FUNCTION)
+    for name, (timing, when) in _TRIGGERS.items():
+        condition = f" WHEN ({when})" if when else ""
+        op.execute(
+            f"CREATE OR REPLACE TRIGGER {name} {timing} ON scoring_sessions "
+            f"FOR EACH ROW{condition} EXECUTE FUNCTION scoring_sessions_personal_record()"
+        )
+
+    # Records written by the API before the trigger followed the same rule,
+    # so this mostly confirms them; it fixes the ones edits left behind.
+    backfill("personal_records", "users", REBUILD_PERSONAL_RECORDS)
+
+
+def downgrade() -> None:
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON scoring_sessions")
+    op.execute("DROP FUNCTION IF EXISTS scoring_sessions_personal_record()")
+    op.execute("DROP FUNCTION IF EXISTS personal_record_elect(uuid, uuid, uuid)")
+    op.execute("DROP FUNCTION IF EXISTS personal_record_offer(scoring_sessions)")
+    reset_backfill("personal_records")
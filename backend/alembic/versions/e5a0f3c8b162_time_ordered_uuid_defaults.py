@@ -0,0 +1,53 @@
+"""time-ordered uuid defaults
+
+Install ``uuid_generate_v7()`` (RFC 9562 version 7: millisecond timestamp,
+then random bits; Postgres only ships ``uuidv7()`` from 18) and make it the id
+default on the insert-heavy tables, so ids generated by the database arrive in
+time order and append to the right edge of the primary key. The API and the
+models generate v7 ids themselves; this covers rows inserted without one.
+
+Only the default changes, which is metadata-only. Existing uuid4 keys stay as
+they are: new keys all sort after the current time, so inserts stop splitting
+random leaves as soon as this is deployed.
+
+Revision ID: e5a0f3c8b162
+Revises: d2b7e4a90c15
+Create Date: 2026-10-17 13:25:50.301644
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e5a0f3c8b162'
+down_revision: Union[str, None] = 'd2b7e4a90c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["scoring_sessions", "ends", "feed_items", "notifications", "attachments"]
+
+
+def upgrade() -> None:
+    # Overwrite the first 48 bits of a v4 uuid with the Unix time in ms and
+    # turn its version nibble from 4 (0100) into 7 (0111); the variant bits
+    # are already right.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid
+        LANGUAGE sql VOLATILE PARALLEL SAFE
+        RETURN encode(
+            set_bit(set_bit(
+                overlay(uuid_send(gen_random_uuid())
+                        PLACING substring(int8send((extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                        FROM 1 FOR 6),
+                52, 1), 53, 1),
+            'hex')::uuid
+    """)
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT uuid_generate_v7()")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
+    op.execute("DROP FUNCTION uuid_generate_v7()")
@@ -0,0 +1,49 @@
+"""template score histograms
+
+Ranking a completed session among everyone who shot the round meant sorting
+every completed session of the template. ``template_score_histograms``
+stores, per round template, ``cumulative[k + 1]``: how many completed
+sessions scored in bins below ``k``, each bin ``bin_width`` points wide.
+``cumulative[1]`` is 0 and the last element is ``sessions``.
+
+``app.migrations.score_histograms`` fills it with NumPy; this revision only
+creates it, so the migration image doesn't need NumPy. Until the job has run,
+the API reports no percentile.
+
+Revision ID: e7a3c1d9f528
+Revises: d5f2b8e4a617
+Create Date: 2026-10-17 21:18:45.302716
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e7a3c1d9f528'
+down_revision: Union[str, None] = 'd5f2b8e4a617'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # max_score, sessions and score_sum are what the histogram was built
+    # from; the job compares them with user_template_stats to find stale ones.
+    op.execute("""
+        CREATE TABLE template_score_histograms (
+            template_id uuid NOT NULL,
+            max_score integer NOT NULL,
+            sessions bigint NOT NULL,
+            score_sum bigint NOT NULL,
+            bin_width integer NOT NULL,
+            cumulative bigint[] NOT NULL,
+            computed_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT template_score_histograms_pkey PRIMARY KEY (template_id),
+            CONSTRAINT template_score_histograms_template_id_fkey FOREIGN KEY (template_id)
+                REFERENCES round_templates (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE template_score_histograms")
@@ -0,0 +1,45 @@
+"""template handicap tables
+
+Turning a score into an Archery GB handicap means solving the handicap
+formula for the round, numerically. ``template_handicap_tables`` stores, per
+round template, ``scores[h + 1]``: the score expected at handicap ``h`` for
+``h`` in 0..150, rounded up and falling as ``h`` rises, so a score's
+handicap is a binary search. ``stages_hash`` fingerprints the stages the
+table was computed from.
+
+``app.migrations.handicap_tables`` fills it with NumPy; this revision only
+creates it, so the migration image doesn't need NumPy. Until the job has run,
+the API reports no handicap.
+
+Revision ID: f2c6b8a4d093
+Revises: e7a3c1d9f528
+Create Date: 2026-10-17 22:05:17.649830
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f2c6b8a4d093'
+down_revision: Union[str, None] = 'e7a3c1d9f528'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE template_handicap_tables (
+            template_id uuid NOT NULL,
+            stages_hash text NOT NULL,
+            scores integer[] NOT NULL,
+            computed_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT template_handicap_tables_pkey PRIMARY KEY (template_id),
+            CONSTRAINT template_handicap_tables_template_id_fkey FOREIGN KEY (template_id)
+                REFERENCES round_templates (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE template_handicap_tables")
@@ -0,0 +1,223 @@
+"""hash partition ends
+
+``ends`` grows without bound, and so do the cost of vacuuming it and the depth
+of its indexes. It becomes a table hash-partitioned on ``session_id`` into 16
+children (``ends_p00`` .. ``ends_p15``): every query the API runs names a
+session, so it touches one child, and vacuum, reindex and later maintenance
+work one child at a time. The primary key (session_id, end_number) already
+leads with the partition key, and the foreign keys keep the cascades
+16a26cee6578 set up (session deleted -> its ends go; stage deleted -> NULL).
+
+Arrows live in the ends' arrays since 7f3a91c2d5e8, so they are partitioned
+with their end. The ``arrows`` view now also exposes ``session_id``, and
+writes through it find the end by (session_id, id), in one child.
+
+A unique index on a partitioned table has to include the partition key, so
+``uq_ends_id`` becomes ``ends_session_id_id_key`` on (session_id, id), plus a
+plain ``ix_ends_id`` (one per child) for what still finds an end by id alone:
+writers through the ``arrows`` view that don't send ``session_id``, and
+reads of the view by ``end_id``.
+
+The copy happens without blocking writers:
+
+1. create ``ends_partitioned`` and a trigger on ``ends`` that mirrors every
+   insert, update and delete into it,
+2. backfill it session by session (``app.migrations.backfill``, resumable),
+3. in one short transaction, point the view at it, drop ``ends`` and rename
+   ``ends_partitioned`` (and its constraints) into place.
+
+Everything before the swap is idempotent, so a run that times out or hits
+lock_timeout on the swap resumes where it stopped.
+
+Revision ID: f3c9a1d6e274
+Revises: e5a0f3c8b162
+Create Date: 2026-10-17 14:31:08.552917
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.config import settings
+from app.migrations.backfill import backfill, reset_backfill
+from app.migrations.partitions import create_hash_partitions, partition_name
+
+
+revision: str = 'f3c9a1d6e274'
+down_revision: Union[str, None] = 'e5a0f3c8b162'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+# The backfill walks sessions, so size its batches in sessions (a 72-arrow
+# round is 12 ends).
+ENDS_PER_SESSION = 12
+
+
+def _arrows_view(ends: str, session_id: bool) -> str:
+    extra = ",\n            e.session_id" if session_id else ""
+    return f"""
+        CREATE OR REPLACE VIEW arrows AS
+        SELECT
+            packed_arrow_id(e.id, a.arrow_number::integer) AS id,
+            e.id AS end_id,
+            a.arrow_number::integer AS arrow_number,
+            a.score_value,
+            a.score_numeric::integer AS score_numeric,
+            a.x_pos::double precision AS x_pos,
+            a.y_pos::double precision AS y_pos{extra}
+        FROM {ends} e
+        CROSS JOIN LATERAL unnest(score_values(e.arrow_codes), e.arrow_scores, e.arrow_x, e.arrow_y)
+            WITH ORDINALITY AS a(score_value, score_numeric, x_pos, y_pos, arrow_number)
+        WHERE a.score_value IS NOT NULL
+    """
+
+
+def _arrows_view_write(session_id: bool) -> str:
+    """arrows_view_write() as c91e5f0b7a23 left it, finding the end by (session_id, id) with ``session_id``."""
+    if session_id:
+        # Writers from before this revision don't send session_id.
+        find_new = """
+                end_session := coalesce(NEW.session_id, (SELECT session_id FROM ends WHERE id = NEW.end_id));"""
+        find_old = """
+            end_session := OLD.session_id;"""
+        new_end, old_end = "session_id = end_session AND id = NEW.end_id", "session_id = end_session AND id = OLD.end_id"
+    else:
+        find_new = find_old = ""
+        new_end, old_end = "id = NEW.end_id", "id = OLD.end_id"
+    return f"""
+        CREATE OR REPLACE FUNCTION arrows_view_write() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            end_session uuid;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN{find_new}
+                UPDATE ends SET
+                    arrow_codes = array_fill(NULL::smallint, ARRAY[NEW.arrow_number - 1]) || (score_codes_for(ARRAY[NEW.score_value]))[1],
+                    arrow_scores = array_fill(NULL::smallint, ARRAY[NEW.arrow_number - 1]) || NEW.score_numeric::smallint,
+                    arrow_x = array_fill(NULL::real, ARRAY[NEW.arrow_number - 1]) || NEW.x_pos::real,
+                    arrow_y = array_fill(NULL::real, ARRAY[NEW.arrow_number - 1]) || NEW.y_pos::real
+                WHERE {new_end} AND coalesce(cardinality(arrow_codes), 0) = 0;
+                IF NOT FOUND THEN
+                    UPDATE ends SET
+                        arrow_codes[NEW.arrow_number] = (score_codes_for(ARRAY[NEW.score_value]))[1],
+                        arrow_scores[NEW.arrow_number] = NEW.score_numeric,
+                        arrow_x[NEW.arrow_number] = NEW.x_pos,
+                        arrow_y[NEW.arrow_number] = NEW.y_pos
+                    WHERE {new_end};
+                END IF;
+                RETURN NEW;
+            END IF;{find_old}
+            UPDATE ends SET
+                arrow_codes[OLD.arrow_number] = NULL,
+                arrow_scores[OLD.arrow_number] = NULL,
+                arrow_x[OLD.arrow_number] = NULL,
+                arrow_y[OLD.arrow_number] = NULL
+            WHERE {old_end};
+            UPDATE ends SET arrow_codes = '{{}}', arrow_scores = '{{}}', arrow_x = '{{}}', arrow_y = '{{}}'
+            WHERE {old_end} AND array_remove(arrow_codes, NULL) = '{{}}';
+            RETURN OLD;
+        END
+        $$
+    """
+
+
+def _constraints(table: str) -> list[str]:
+    return [
+        f"CONSTRAINT {table}_pkey PRIMARY KEY (session_id, end_number)",
+        f"CONSTRAINT {table}_session_id_fkey FOREIGN KEY (session_id) REFERENCES scoring_sessions (id) ON DELETE CASCADE",
+        f"CONSTRAINT {table}_stage_id_fkey FOREIGN KEY (stage_id) REFERENCES round_template_stages (id) ON DELETE SET NULL",
+    ]
+
+
+def upgrade() -> None:
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS ends_partitioned (
+            LIKE ends INCLUDING DEFAULTS,
+            {", ".join(_constraints("ends_partitioned"))},
+            CONSTRAINT ends_partitioned_session_id_id_key UNIQUE (session_id, id)
+        ) PARTITION BY HASH (session_id)
+    """)
+    create_hash_partitions("ends_partitioned", PARTITIONS, name="ends")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ends_partitioned_stage_id ON ends_partitioned (stage_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ends_partitioned_id ON ends_partitioned (id)")
+
+    # LIKE copies the column order, so NEW.* lines up with the copy.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ends_sync_partitioned() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                DELETE FROM ends_partitioned WHERE session_id = OLD.session_id AND end_number = OLD.end_number;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO ends_partitioned SELECT NEW.* ON CONFLICT (session_id, end_number) DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE OR REPLACE TRIGGER trg_ends_sync_partitioned AFTER INSERT OR UPDATE OR DELETE "
+        "ON ends FOR EACH ROW EXECUTE FUNCTION ends_sync_partitioned()"
+    )
+
+    # The locks keep a concurrent delete from committing between this chunk
+    # reading a row and copying it, which would leave the copy behind.
+    # Sessions before ends, the same order a cascading delete takes them in.
+    backfill(
+        "partition_ends",
+        "scoring_sessions",
+        """
+        INSERT INTO ends_partitioned
+        SELECT e.* FROM batch
+        JOIN scoring_sessions s ON s.id = batch.key
+        JOIN ends e ON e.session_id = s.id
+        FOR KEY SHARE OF s FOR SHARE OF e
+        ON CONFLICT (session_id, end_number) DO NOTHING
+        """,
+        batch_size=max(1, settings.MIGRATION_BACKFILL_BATCH_SIZE // ENDS_PER_SESSION),
+        rows_per_second=max(1, settings.MIGRATION_BACKFILL_ROWS_PER_SECOND // ENDS_PER_SESSION),
+    )
+
+    # The swap. The view is bound to the table, not the name, so repoint it
+    # before dropping ends; arrows_view_write() looks ends up by name and
+    # finds the new table once it's renamed.
+    op.execute(_arrows_view("ends_partitioned", session_id=True))
+    op.execute("DROP TABLE ends")
+    op.execute("DROP FUNCTION ends_sync_partitioned()")
+    op.execute("ALTER TABLE ends_partitioned RENAME TO ends")
+    for suffix in ("pkey", "session_id_fkey", "stage_id_fkey", "session_id_id_key"):
+        op.execute(f"ALTER TABLE ends RENAME CONSTRAINT ends_partitioned_{suffix} TO ends_{suffix}")
+    # Each child carries its own copy of the foreign keys under the parent's
+    # original name.
+    for remainder in range(PARTITIONS):
+        for suffix in ("session_id_fkey", "stage_id_fkey"):
+            op.execute(
+                f"ALTER TABLE {partition_name('ends', remainder)} "
+                f"RENAME CONSTRAINT ends_partitioned_{suffix} TO ends_{suffix}"
+            )
+    op.execute("ALTER INDEX ix_ends_partitioned_stage_id RENAME TO ix_ends_stage_id")
+    op.execute("ALTER INDEX ix_ends_partitioned_id RENAME TO ix_ends_id")
+    op.execute(_arrows_view_write(session_id=True))
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE ends_unpartitioned (LIKE ends INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO ends_unpartitioned SELECT * FROM ends")
+    op.execute(f"ALTER TABLE ends_unpartitioned {', '.join('ADD ' + c for c in _constraints('ends_unpartitioned'))}")
+    op.execute("CREATE INDEX ix_ends_unpartitioned_stage_id ON ends_unpartitioned (stage_id)")
+    op.execute("CREATE UNIQUE INDEX uq_ends_unpartitioned_id ON ends_unpartitioned (id)")
+
+    # The view loses a column, which CREATE OR REPLACE can't do.
+    op.execute("DROP VIEW arrows")
+    op.execute("DROP TABLE ends")
+    op.execute("ALTER TABLE ends_unpartitioned RENAME TO ends")
+    for suffix in ("pkey", "session_id_fkey", "stage_id_fkey"):
+        op.execute(f"ALTER TABLE ends RENAME CONSTRAINT ends_unpartitioned_{suffix} TO ends_{suffix}")
+    op.execute("ALTER INDEX ix_ends_unpartitioned_stage_id RENAME TO ix_ends_stage_id")
+    op.execute("ALTER INDEX uq_ends_unpartitioned_id RENAME TO uq_ends_id")
+    op.execute(_arrows_view("ends", session_id=False))
+    op.execute(_arrows_view_write(session_id=False))
+    op.execute(
+        "CREATE TRIGGER trg_arrows_view_write INSTEAD OF INSERT OR DELETE "
+        "ON arrows FOR EACH ROW EXECUTE FUNCTION arrows_view_write()"
+    )
+    reset_backfill("partition_ends")
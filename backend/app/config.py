@@ -14,6 +14,20 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 60
     EMAIL_VERIFICATION_TOKEN_EXPIRE_HOURS: int = 24
+    MIGRATION_LOCK_TIMEOUT_MS: int = 300
+    MIGRATION_STATEMENT_TIMEOUT_MS: int = 0
+    MIGRATION_LOCK_RETRIES: int = 10
+    MIGRATION_RETRY_BASE_DELAY_MS: int = 500
+    MIGRATION_RETRY_MAX_DELAY_MS: int = 30000
+    MIGRATION_REPORT_PATH: str = ""
+    MIGRATION_BACKFILL_BATCH_SIZE: int = 5000
+    MIGRATION_BACKFILL_ROWS_PER_SECOND: int = 20000
+    MIGRATION_CONTRACT_QUIET_SECONDS: int = 900
+    MIGRATION_PREFLIGHT_SCAN_MB_PER_SECOND: float = 150
+    MIGRATION_PREFLIGHT_REWRITE_MB_PER_SECOND: float = 40
+    MIGRATION_PREFLIGHT_INDEX_MB_PER_SECOND: float = 50
+    MIGRATION_PREFLIGHT_DML_ROWS_PER_SECOND: float = 20000
+    MIGRATION_SQUASHED_BOOTSTRAP: bool = True
 
     model_config = {"env_file": ".env"}
 
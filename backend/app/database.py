@@ -1,3 +1,7 @@
+import os
+import time
+import uuid
+
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
@@ -16,6 +20,15 @@ class Base(DeclarativeBase):
     pass
 
 
+def uuid7() -> uuid.UUID:
+    """RFC 9562 version 7: a millisecond timestamp then random bits, so new keys
+    append to the right edge of the primary-key B-tree. See ``uuid_generate_v7()``."""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10))
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
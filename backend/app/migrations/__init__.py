@@ -0,0 +1,5 @@
+"""Helpers for running Alembic migrations against the live database.
+
+Kept import-light on purpose: revisions and env.py import the submodules they
+need directly.
+"""
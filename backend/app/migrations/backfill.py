@@ -0,0 +1,190 @@
+"""Resumable, throttled batched backfills for data migrations.
+
+A single ``UPDATE arrows SET ...`` rewrites every row in one transaction: one
+huge WAL burst, row locks held until the end, and all progress lost if the
+Cloud Run job times out. ``backfill`` instead walks the table in primary-key
+order, ``batch_size`` rows at a time, committing each chunk on its own and
+sleeping between chunks to stay under ``rows_per_second``.
+
+Each chunk is a single statement that also advances a checkpoint row in
+``migration_backfill_checkpoints``, so the work and the checkpoint commit
+together. Re-running the revision resumes after the last committed key, and a
+backfill that already finished is skipped.
+
+Usage in a revision::
+
+    from app.migrations.backfill import backfill
+
+    def upgrade():
+        op.add_column("ends", sa.Column("arrow_count", sa.SmallInteger()))
+        backfill(
+            "ends_arrow_count",
+            "ends",
+            \"\"\"
+            UPDATE ends e SET arrow_count = (SELECT count(*) FROM arrows a WHERE a.end_id = e.id)
+            FROM batch WHERE e.id = batch.key
+            \"\"\",
+        )
+
+``chunk_sql`` runs as a data-modifying CTE and sees the chunk as ``batch``, a
+relation with a single ``key`` column.
+
+Everything in the revision before the ``backfill`` call has already committed
+by the time the first chunk does, so a resumed run executes it again: keep it
+idempotent (``ADD COLUMN IF NOT EXISTS``) or give the backfill its own revision.
+"""
+import logging
+import time
+
+from alembic import op
+from sqlalchemy import text
+
+from app.config import settings
+from app.migrations.runner import backoff_delay, is_lock_timeout
+
+log = logging.getLogger("alembic.runner")
+
+CHECKPOINT_TABLE = "migration_backfill_checkpoints"
+
+_CREATE_CHECKPOINTS = f"""
+    CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+        name text PRIMARY KEY,
+        last_key text,
+        rows_done bigint NOT NULL DEFAULT 0,
+        started_at timestamptz NOT NULL DEFAULT now(),
+        updated_at timestamptz NOT NULL DEFAULT now(),
+        completed_at timestamptz
+    )
+"""
+
+_KEY_TYPE = text("""
+    SELECT format_type(a.atttypid, a.atttypmod)
+    FROM pg_attribute a
+    WHERE a.attrelid = to_regclass(:table) AND a.attname = :key AND NOT a.attisdropped
+""")
+
+
+def _chunk_statement(table: str, key: str, key_type: str, chunk_sql: str, where: str | None, resume: bool) -> str:
+    predicates = []
+    if resume:
+        predicates.append(f"{key} > CAST(:last_key AS {key_type})")
+    if where:
+        predicates.append(f"({where})")
+    where_clause = f"WHERE {' AND '.join(predicates)}" if predicates else ""
+    return f"""
+        WITH batch AS MATERIALIZED (
+            SELECT {key} AS key FROM {table}
+            {where_clause}
+            ORDER BY {key}
+            LIMIT :batch_size
+        ),
+        last AS (
+            SELECT key FROM batch ORDER BY key DESC LIMIT 1
+        ),
+        work AS (
+            {chunk_sql}
+        ),
+        checkpoint AS (
+            INSERT INTO {CHECKPOINT_TABLE} (name, last_key, rows_done)
+            SELECT :name, (SELECT key::text FROM last), count(*) FROM batch HAVING count(*) > 0
+            ON CONFLICT (name) DO UPDATE
+            SET last_key = EXCLUDED.last_key,
+                rows_done = {CHECKPOINT_TABLE}.rows_done + EXCLUDED.rows_done,
+                updated_at = now()
+        )
+        SELECT (SELECT key::text FROM last), (SELECT count(*) FROM batch)
+    """
+
+
+def backfill(
+    name: str,
+    table: str,
+    chunk_sql: str,
+    *,
+    key: str = "id",
+    where: str | None = None,
+    batch_size: int | None = None,
+    rows_per_second: int | None = None,
+) -> None:
+    """Apply ``chunk_sql`` to ``table`` in committed, throttled keyset chunks.
+
+    ``name`` identifies the checkpoint and must be unique across revisions.
+    ``where`` restricts which rows are visited. ``key`` must be unique and
+    indexed (the primary key unless you have a reason otherwise).
+    """
+    batch_size = batch_size or settings.MIGRATION_BACKFILL_BATCH_SIZE
+    rows_per_second = rows_per_second or settings.MIGRATION_BACKFILL_ROWS_PER_SECOND
+    ctx = op.get_context()
+
+    with ctx.autocommit_block():
+        if ctx.as_sql:
+            # Offline / dry-run output: show the first chunk only.
+            op.execute(text(_chunk_statement(table, key, "text", chunk_sql, where, resume=False))
+                       .bindparams(name=name, batch_size=batch_size))
+            return
+
+        connection = ctx.connection
+        connection.exec_driver_sql(_CREATE_CHECKPOINTS)
+        state = connection.execute(
+            text(f"SELECT last_key, rows_done, completed_at FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+            {"name": name},
+        ).first()
+        if state and state.completed_at is not None:
+            log.info("Backfill %s already completed (%d rows), skipping", name, state.rows_done)
+            return
+
+        last_key = state.last_key if state else None
+        rows_done = state.rows_done if state else 0
+        if last_key is not None:
+            log.info("Backfill %s resuming after key %s (%d rows done)", name, last_key, rows_done)
+
+        key_type = connection.execute(_KEY_TYPE, {"table": table, "key": key}).scalar_one()
+        first_chunk = text(_chunk_statement(table, key, key_type, chunk_sql, where, resume=False))
+        next_chunk = text(_chunk_statement(table, key, key_type, chunk_sql, where, resume=True))
+
+        retries = 0
+        while True:
+            started = time.monotonic()
+            params = {"name": name, "batch_size": batch_size}
+            if last_key is not None:
+                params["last_key"] = last_key
+            try:
+                chunk_last, count = connection.execute(
+                    next_chunk if last_key is not None else first_chunk, params
+                ).one()
+            except Exception as exc:
+                connection.rollback()
+                if not is_lock_timeout(exc) or retries >= settings.MIGRATION_LOCK_RETRIES:
+                    raise
+                retries += 1
+                delay = backoff_delay(retries)
+                log.warning("Backfill %s chunk hit lock_timeout, retrying in %.2fs", name, delay)
+                time.sleep(delay)
+                continue
+            retries = 0
+            if not count:
+                break
+
+            last_key = chunk_last
+            rows_done += count
+            log.info("Backfill %s: %d rows (last key %s)", name, rows_done, last_key)
+
+            # Hold the average rate at or below rows_per_second.
+            pause = count / rows_per_second - (time.monotonic() - started)
+            if pause > 0:
+                time.sleep(pause)
+
+        connection.execute(
+            text(f"""
+                INSERT INTO {CHECKPOINT_TABLE} (name, rows_done, completed_at) VALUES (:name, 0, now())
+                ON CONFLICT (name) DO UPDATE SET completed_at = now(), updated_at = now()
+            """),
+            {"name": name},
+        )
+        log.info("Backfill %s completed: %d rows", name, rows_done)
+
+
+def reset_backfill(name: str) -> None:
+    """Forget a backfill's checkpoint, e.g. in the revision's downgrade."""
+    op.execute(_CREATE_CHECKPOINTS)
+    op.execute(text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE name = :name").bindparams(name=name))
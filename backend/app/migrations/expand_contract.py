@@ -0,0 +1,221 @@
+"""Expand/contract helpers for changing a column on a hot table without downtime.
+
+``ALTER COLUMN ... TYPE`` on ``arrows``/``ends``/``scoring_sessions`` rewrites
+the table under an ACCESS EXCLUSIVE lock while the Go API is writing to it.
+Instead, ship the change as two revisions with an API deploy in between:
+
+1. **expand** (revision A): add the new column, install a trigger that keeps it
+   in sync with the old one on every insert/update, and backfill existing rows
+   in throttled chunks (``app.migrations.backfill``)::
+
+       expand("ends", "end_total", "end_total_v2", "bigint")
+
+2. **switch** (API deploy): read and write ``end_total_v2``. With ``reverse``
+   given, writes to the new column are copied back to the old one, so API
+   instances still on the previous release keep seeing correct data during the
+   rolling deploy.
+
+3. **contract** (revision B, a later release): drop the trigger and the old
+   column, optionally enforcing NOT NULL and renaming the new column into
+   place::
+
+       contract("ends", "end_total", "end_total_v2", not_null=True, rename=True)
+
+   Being in a later revision doesn't mean it runs in a later release: a
+   database that is two releases behind gets both from one ``upgrade head``.
+   So the sync trigger also notes, per minute, when something still writes
+   the old column itself, in ``migration_legacy_writes``, and with
+   ``wait_for_writers`` the contract refuses to run until none has for
+   ``MIGRATION_CONTRACT_QUIET_SECONDS``. Only ask for that when the contract
+   ships in a later release than its expand: the deploy runs migrations
+   before the API, so in the same release the old API is still serving and
+   the deploy would stop at the contract every time.
+
+``using`` is the SQL expression that computes the new value, with ``{old}``
+standing in for the old column (default: a plain cast). ``reverse`` is the
+inverse, with ``{new}`` for the new column. Every step is idempotent, so a
+revision retried after a lock timeout or a resumed backfill picks up where it
+stopped.
+"""
+from alembic import op
+from sqlalchemy import text
+
+from app.config import settings
+from app.migrations.backfill import CHECKPOINT_TABLE, backfill, reset_backfill
+
+LEGACY_WRITES_TABLE = "migration_legacy_writes"
+
+_CREATE_LEGACY_WRITES = f"""
+    CREATE TABLE IF NOT EXISTS {LEGACY_WRITES_TABLE} (
+        name text NOT NULL,
+        minute timestamptz NOT NULL,
+        PRIMARY KEY (name, minute)
+    )
+"""
+
+
+def _names(table: str, new_column: str) -> tuple[str, str, str]:
+    function = f"{table}_sync_{new_column}"[:63]
+    trigger = f"trg_{table}_sync_{new_column}"[:63]
+    backfill_name = f"expand_{table}_{new_column}"
+    return function, trigger, backfill_name
+
+
+def _sync_function(function: str, column: str, new_column: str, using: str, reverse: str | None, name: str) -> str:
+    forward = using.format(old=f"NEW.{column}")
+    # A write that sets the old column itself comes from a writer that hasn't
+    # switched yet. One row per minute, so the note costs an index probe.
+    note = f"""
+                INSERT INTO {LEGACY_WRITES_TABLE} (name, minute) VALUES ('{name}', date_trunc('minute', now()))
+                ON CONFLICT DO NOTHING;"""
+    backward_insert = backward_update = ""
+    if reverse is not None:
+        backward = reverse.format(new=f"NEW.{new_column}")
+        backward_insert = f"""
+                ELSIF NEW.{column} IS NULL THEN
+                    NEW.{column} := {backward};"""
+        # A write to the new column alone, unless it is just the forward value
+        # (which is what the backfill writes).
+        backward_update = f"""
+            ELSIF NEW.{new_column} IS DISTINCT FROM OLD.{new_column}
+                  AND NEW.{new_column} IS DISTINCT FROM {forward} THEN
+                NEW.{column} := {backward};"""
+    return f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                IF NEW.{new_column} IS NULL THEN
+                    NEW.{new_column} := {forward};
+                    IF NEW.{column} IS NOT NULL THEN{note}
+                    END IF;{backward_insert}
+                END IF;
+            ELSIF NEW.{column} IS DISTINCT FROM OLD.{column} THEN
+                NEW.{new_column} := {forward};{note}{backward_update}
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """
+
+
+def expand(
+    table: str,
+    column: str,
+    new_column: str,
+    new_type: str,
+    *,
+    using: str | None = None,
+    reverse: str | None = None,
+    key: str = "id",
+    batch_size: int | None = None,
+    rows_per_second: int | None = None,
+) -> None:
+    """Add ``new_column``, dual-write it from ``column`` and backfill existing rows."""
+    using = using or f"{{old}}::{new_type}"
+    function, trigger, backfill_name = _names(table, new_column)
+
+    # Nullable and without a default, so adding the column is metadata-only.
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {new_column} {new_type}")
+    op.execute(_CREATE_LEGACY_WRITES)
+    op.execute(_sync_function(function, column, new_column, using, reverse, backfill_name))
+    op.execute(
+        f"CREATE OR REPLACE TRIGGER {trigger} BEFORE INSERT OR UPDATE OF {column}, {new_column} "
+        f"ON {table} FOR EACH ROW EXECUTE FUNCTION {function}()"
+    )
+
+    # backfill() commits the revision's transaction first, so the trigger is
+    # live for concurrent writers before the first chunk is copied.
+    forward = using.format(old=f"t.{column}")
+    backfill(
+        backfill_name,
+        table,
+        f"""
+        UPDATE {table} t SET {new_column} = {forward}
+        FROM batch
+        WHERE t.{key} = batch.key AND t.{new_column} IS DISTINCT FROM {forward}
+        """,
+        key=key,
+        batch_size=batch_size,
+        rows_per_second=rows_per_second,
+    )
+
+
+def undo_expand(table: str, column: str, new_column: str) -> None:
+    """Downgrade for ``expand``: remove the trigger, the new column and the checkpoint."""
+    function, trigger, backfill_name = _names(table, new_column)
+    op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {new_column}")
+    op.execute(_CREATE_LEGACY_WRITES)
+    op.execute(f"DELETE FROM {LEGACY_WRITES_TABLE} WHERE name = '{backfill_name}'")
+    reset_backfill(backfill_name)
+
+
+def contract(
+    table: str,
+    column: str,
+    new_column: str,
+    *,
+    not_null: bool = False,
+    rename: bool = False,
+    wait_for_writers: bool = False,
+) -> None:
+    """Finish an ``expand``: drop the trigger and ``column``, then tidy ``new_column``.
+
+    Refuses to run until the expand backfill has completed, and with
+    ``wait_for_writers`` while anything (an API instance still on the release
+    before the expand) wrote ``column`` itself in the last
+    ``MIGRATION_CONTRACT_QUIET_SECONDS``. Leave it off when writers of the old
+    column keep working afterwards, as with ``rename`` onto a castable type,
+    and whenever the expand is in the same release (see the module docstring).
+    ``not_null`` validates a NOT VALID check constraint outside the revision's transaction
+    (a scan that does not block writes) so SET NOT NULL needs no scan of its
+    own. ``rename`` gives ``new_column`` the old column's name. Indexes on
+    ``column`` go with it: build their replacements on ``new_column``
+    (``create_index_concurrently``) before contracting.
+    """
+    function, trigger, backfill_name = _names(table, new_column)
+    ctx = op.get_context()
+
+    if not ctx.as_sql:
+        connection = ctx.connection
+        completed = connection.execute(text("SELECT to_regclass(:table)"), {"table": CHECKPOINT_TABLE}).scalar() and (
+            connection.execute(
+                text(f"SELECT completed_at IS NOT NULL FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+                {"name": backfill_name},
+            ).scalar()
+        )
+        if not completed:
+            raise RuntimeError(f"Backfill {backfill_name} has not completed; run the expand revision first")
+        if wait_for_writers and connection.execute(text("SELECT to_regclass(:table)"), {"table": LEGACY_WRITES_TABLE}).scalar():
+            last = connection.execute(
+                text(f"""
+                    SELECT max(minute) + interval '1 minute' FROM {LEGACY_WRITES_TABLE}
+                    WHERE name = :name AND minute >= now() - make_interval(secs => :quiet) - interval '1 minute'
+                """),
+                {"name": backfill_name, "quiet": settings.MIGRATION_CONTRACT_QUIET_SECONDS},
+            ).scalar()
+            if last is not None:
+                raise RuntimeError(
+                    f"{table}.{column} was still written directly until {last:%Y-%m-%d %H:%M %Z}, so an API "
+                    f"instance from before the expand is still running; finish that rollout and retry once "
+                    f"nothing has written it for {settings.MIGRATION_CONTRACT_QUIET_SECONDS}s"
+                )
+
+    check = f"ck_{table}_{new_column}_not_null"[:63]
+    if not_null:
+        with ctx.autocommit_block():
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}")
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({new_column} IS NOT NULL) NOT VALID")
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")
+
+    op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    if not_null:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {new_column} SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {check}")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    op.execute(_CREATE_LEGACY_WRITES)
+    op.execute(f"DELETE FROM {LEGACY_WRITES_TABLE} WHERE name = '{backfill_name}'")
+    if rename:
+        op.execute(f"ALTER TABLE {table} RENAME COLUMN {new_column} TO {column}")
@@ -0,0 +1,80 @@
+"""Entry point for the migration job that skips all the work when nothing is pending.
+
+Most deploys ship no new revision, yet ``alembic upgrade head`` still imports
+pydantic-settings, SQLAlchemy, every model and Alembic's script machinery before
+finding out. This module finds the head by parsing ``alembic/versions`` with
+``ast``, compares it to ``alembic_version`` with one bare asyncpg query, and
+exits if they match. Otherwise (pending revisions, an empty database, more than
+one head, no ``DATABASE_URL`` in the environment) it execs the real
+``alembic upgrade head``.
+
+    uv run python -m app.migrations.fastpath
+
+Keep the imports here to the standard library and asyncpg.
+"""
+import ast
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+
+def _assigned_strings(tree: ast.Module, name: str) -> list[str]:
+    for node in tree.body:
+        target = node.target if isinstance(node, ast.AnnAssign) else None
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id == name and node.value is not None:
+            value = ast.literal_eval(node.value)
+            if value is None:
+                return []
+            return [value] if isinstance(value, str) else list(value)
+    return []
+
+
+def script_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """Revisions no other revision builds on, read without importing any script."""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+        revisions.update(_assigned_strings(tree, "revision"))
+        parents.update(_assigned_strings(tree, "down_revision"))
+    return revisions - parents
+
+
+async def database_heads(url: str) -> set[str] | None:
+    """Rows of ``alembic_version``, or None when the table doesn't exist yet."""
+    import asyncpg
+
+    connection = await asyncpg.connect(url.replace("postgresql+asyncpg://", "postgresql://", 1))
+    try:
+        if await connection.fetchval("SELECT to_regclass('alembic_version')") is None:
+            return None
+        return {row["version_num"] for row in await connection.fetch("SELECT version_num FROM alembic_version")}
+    finally:
+        await connection.close()
+
+
+def at_head() -> bool:
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        return False
+    heads = script_heads()
+    if len(heads) != 1:
+        return False
+    return asyncio.run(database_heads(url)) == heads
+
+
+def main() -> None:
+    if at_head():
+        print("Database is already at head; nothing to migrate.")
+        return
+    os.chdir(VERSIONS_DIR.parents[1])
+    os.execv(sys.executable, [sys.executable, "-m", "alembic", "upgrade", "head"])
+
+
+if __name__ == "__main__":
+    main()
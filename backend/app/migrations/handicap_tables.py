@@ -0,0 +1,256 @@
+"""Build the per-template handicap tables behind ``/sessions/{id}/handicap``.
+
+The Archery GB (2023) handicap scheme models an archer of handicap ``h`` as
+a radial spread around the centre that grows with the handicap and the
+distance; a round's expected score at ``h`` sums, over its stages, the
+expected score per arrow on the stage's target face times its arrows.
+Turning a score back into a handicap means solving that for ``h``, so
+``template_handicap_tables`` (revision f2c6b8a4d093) stores each template's
+expected score for every handicap in ``HANDICAPS`` and the API binary-searches
+it. Scores are rounded up, as in the published tables.
+
+The whole batch is evaluated at once with NumPy: handicaps x stages x scoring
+zones, then summed per template. A template is recomputed when its stages
+change. Stages don't record a target face, so the usual one for the distance
+and scoring is assumed (``face_diameter``); a template with a stage whose
+distance can't be read, or that scores nothing, gets no table.
+
+    DATABASE_URL=... uv run python -m app.migrations.handicap_tables
+    DATABASE_URL=... uv run python -m app.migrations.handicap_tables --all
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import text
+
+HANDICAPS = np.arange(0, 151)
+
+# Archery GB 2023 scheme constants.
+DATUM = 6.0
+STEP = 3.5  # % growth in angular spread per handicap point
+ANG_0 = 5.0e-4  # rad
+KD = 0.00365  # 1/m
+ARROW_DIAMETER_OUTDOOR = 5.5e-3  # m
+ARROW_DIAMETER_INDOOR = 9.3e-3  # m
+
+YARD = 0.9144
+INCH = 0.0254
+_DISTANCE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(m|metres?|meters?|yd|yds|yards?)\s*$", re.IGNORECASE)
+
+# Changes whenever anything the table is computed from does. The API
+# recomputes it to ignore a stale table; change it there too.
+_FINGERPRINT = """
+    md5(string_agg(
+        concat_ws('|', coalesce(distance, ''), num_ends, arrows_per_end, max_score_per_arrow, value_score_map::text),
+        ';' ORDER BY stage_order
+    ))
+"""
+
+_NEXT_BATCH = text(f"""
+    WITH fp AS (
+        SELECT template_id, {_FINGERPRINT} AS stages_hash
+        FROM round_template_stages
+        GROUP BY template_id
+    )
+    SELECT fp.template_id, fp.stages_hash
+    FROM fp
+    LEFT JOIN template_handicap_tables t ON t.template_id = fp.template_id
+    WHERE fp.template_id > :after
+      AND (:all OR t.stages_hash IS DISTINCT FROM fp.stages_hash)
+    ORDER BY fp.template_id
+    LIMIT :batch_size
+""")
+_STAGES = text("""
+    SELECT template_id, distance, num_ends, arrows_per_end, max_score_per_arrow, value_score_map
+    FROM round_template_stages
+    WHERE template_id = ANY(:ids)
+    ORDER BY template_id, stage_order
+""")
+_UPSERT = text("""
+    INSERT INTO template_handicap_tables (template_id, stages_hash, scores, computed_at)
+    VALUES (:template_id, :stages_hash, CAST(:scores AS integer[]), now())
+    ON CONFLICT (template_id) DO UPDATE
+    SET stages_hash = EXCLUDED.stages_hash, scores = EXCLUDED.scores, computed_at = EXCLUDED.computed_at
+""")
+_DELETE = text("DELETE FROM template_handicap_tables WHERE template_id = ANY(:ids)")
+# Templates whose stages were all removed since.
+_DELETE_GONE = text("""
+    DELETE FROM template_handicap_tables t
+    WHERE NOT EXISTS (SELECT 1 FROM round_template_stages s WHERE s.template_id = t.template_id)
+""")
+
+
+def parse_distance(distance: str | None) -> tuple[float, bool] | None:
+    """``"70m"`` -> (70.0, False), ``"20yd"`` -> (18.288, True); None if unreadable."""
+    match = _DISTANCE.match(distance or "")
+    if not match:
+        return None
+    value = float(match.group(1))
+    yards = match.group(2).lower().startswith("y")
+    return (value * YARD if yards else value), yards
+
+
+def face_diameter(distance_m: float, yards: bool, top_score: int) -> float:
+    """Diameter [m] of the face WA and Archery GB rounds shoot at this distance."""
+    if distance_m <= 25:
+        if yards:
+            # Portsmouth (60cm) and Worcester (16in, 5-zone) at 20yd.
+            return 16 * INCH if top_score == 5 and distance_m < 20 else 0.60
+        return 0.40 if distance_m <= 18 else 0.60
+    if yards:
+        return 1.22
+    return 0.80 if distance_m < 60 else 1.22
+
+
+def zones(scores: list[int], face: float) -> tuple[np.ndarray, np.ndarray]:
+    """Outer radii [m] of a face's scoring zones, innermost first, and the score lost crossing each.
+
+    The zones are equal-width rings of a face with one ring per score step
+    from the top score down: 10..1 is the WA 10-zone face, 9, 7, .., 1 the
+    imperial 5-zone and 10..6 the inner rings of a 10-zone face, as on a
+    triple spot.
+    """
+    distinct = sorted({s for s in scores if s > 0}, reverse=True)
+    step = min((a - b for a, b in zip(distinct, distinct[1:])), default=1)
+    top = distinct[0]
+    rings = math.ceil(top / step)
+    radii = np.array([((top - s) // step + 1) * face / (2 * rings) for s in distinct])
+    drops = np.array(distinct, dtype=np.float64) - np.append(distinct[1:], 0)
+    return radii, drops
+
+
+def expected_scores(
+    distances: np.ndarray, arrow_radii: np.ndarray, radii: np.ndarray, drops: np.ndarray, arrows: np.ndarray,
+) -> np.ndarray:
+    """Expected score of each stage at each of ``HANDICAPS``, shape (handicaps, stages).
+
+    ``radii`` and ``drops`` are (stages, zones), padded with zero drops.
+    An arrow scores a zone when its centre lands within the zone's radius
+    plus its own; with spread ``sigma`` that misses with probability
+    exp(-((radius + arrow radius) / sigma)^2).
+    """
+    spread = ANG_0 * (1 + STEP / 100) ** (HANDICAPS[:, None] + DATUM) * np.exp(KD * distances)
+    sigma = distances * spread
+    miss = np.exp(-(((radii + arrow_radii[:, None])[None, :, :] / sigma[:, :, None]) ** 2))
+    per_arrow = drops.sum(axis=1) - (drops[None, :, :] * miss).sum(axis=2)
+    return per_arrow * arrows
+
+
+@dataclass
+class HandicapResult:
+    templates: int = 0
+    skipped: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+def _stage_spec(stage) -> tuple[float, float, tuple[np.ndarray, np.ndarray], int] | None:
+    """(distance, arrow radius, zones, arrows) of a stage; None if it can't be rated."""
+    parsed = parse_distance(stage.distance)
+    value_map = stage.value_score_map
+    if isinstance(value_map, str):
+        value_map = json.loads(value_map)
+    scores = [int(v) for v in (value_map or {}).values()] or list(range(1, stage.max_score_per_arrow + 1))
+    if parsed is None or max(scores, default=0) <= 0:
+        return None
+    distance, yards = parsed
+    face = face_diameter(distance, yards, max(scores))
+    arrow_radius = (ARROW_DIAMETER_INDOOR if distance <= 25 else ARROW_DIAMETER_OUTDOOR) / 2
+    return distance, arrow_radius, zones(scores, face), stage.num_ends * stage.arrows_per_end
+
+
+def _write_batch(connection, templates, stage_rows) -> int:
+    """Compute and store the tables of ``templates``; returns how many couldn't be rated."""
+    by_template: dict[uuid.UUID, list] = {}
+    for row in stage_rows:
+        by_template.setdefault(row.template_id, []).append(_stage_spec(row))
+
+    rated, owners, specs = [], [], []
+    for template in templates:
+        stages = by_template.get(template.template_id, [])
+        if not stages or None in stages:
+            continue
+        owners.extend([len(rated)] * len(stages))
+        specs.extend(stages)
+        rated.append(template)
+
+    if rated:
+        width = max(len(spec[2][0]) for spec in specs)
+        radii = np.zeros((len(specs), width))
+        drops = np.zeros((len(specs), width))
+        for k, (_, _, (r, d), _) in enumerate(specs):
+            radii[k, : len(r)], drops[k, : len(d)] = r, d
+        per_stage = expected_scores(
+            np.array([spec[0] for spec in specs]), np.array([spec[1] for spec in specs]), radii, drops,
+            np.array([spec[3] for spec in specs], dtype=np.float64),
+        )
+        # Stages come grouped by template, so each template is one run of columns.
+        starts = np.flatnonzero(np.diff(owners, prepend=-1))
+        totals = np.ceil(np.add.reduceat(per_stage, starts, axis=1)).astype(np.int64)
+        connection.execute(_UPSERT, [
+            {"template_id": t.template_id, "stages_hash": t.stages_hash, "scores": totals[:, k].tolist()}
+            for k, t in enumerate(rated)
+        ])
+
+    rated_ids = {t.template_id for t in rated}
+    unrated = [t.template_id for t in templates if t.template_id not in rated_ids]
+    if unrated:
+        connection.execute(_DELETE, {"ids": unrated})
+    return len(unrated)
+
+
+def refresh(connection, batch_size: int, rebuild_all: bool) -> HandicapResult:
+    """Recompute the stale tables (every table with ``rebuild_all``)."""
+    started = time.monotonic()
+    result = HandicapResult()
+    after = uuid.UUID(int=0)
+    while True:
+        templates = connection.execute(
+            _NEXT_BATCH, {"after": after, "all": rebuild_all, "batch_size": batch_size},
+        ).all()
+        if not templates:
+            break
+        after = templates[-1].template_id
+        stage_rows = connection.execute(_STAGES, {"ids": [t.template_id for t in templates]}).all()
+        skipped = _write_batch(connection, templates, stage_rows)
+        result.templates += len(templates) - skipped
+        result.skipped += skipped
+        connection.commit()
+    result.removed = connection.execute(_DELETE_GONE).rowcount
+    connection.commit()
+    result.seconds = time.monotonic() - started
+    return result
+
+
+async def _run(batch_size: int, rebuild_all: bool) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        result = await connection.run_sync(refresh, batch_size, rebuild_all)
+    await engine.dispose()
+    print(
+        f"Computed {result.templates:,} handicap tables, skipped {result.skipped:,} that can't be rated, "
+        f"removed {result.removed:,}, in {result.seconds:.1f}s."
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute per-template handicap tables into template_handicap_tables.")
+    parser.add_argument("--all", action="store_true", help="recompute every table, not just stale ones")
+    parser.add_argument("--batch-size", type=int, default=200, help="templates per batch (default: 200)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size, args.all))
+
+
+if __name__ == "__main__":
+    main()
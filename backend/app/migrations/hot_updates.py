@@ -0,0 +1,110 @@
+"""Report HOT-update ratio and dead tuples from ``pg_stat_user_tables``.
+
+An update is HOT when the new row version fits on the same page and no indexed
+column changed: no index entries are added and the old version is pruned
+without a vacuum. A low HOT ratio on a table that is updated all the time
+(``scoring_sessions``) means its indexes grow with every update, and a high
+dead-tuple count means autovacuum is falling behind.
+
+    DATABASE_URL=... uv run python -m app.migrations.hot_updates                    # scoring_sessions
+    DATABASE_URL=... uv run python -m app.migrations.hot_updates ends_p00 feed_items
+    DATABASE_URL=... uv run python -m app.migrations.hot_updates --all
+
+The counters are cumulative since the last statistics reset; compare two runs
+(e.g. before and after a tournament day) to see the effect of a change.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import text
+
+_STATS = text("""
+    SELECT s.relname,
+           s.n_tup_upd,
+           s.n_tup_hot_upd,
+           s.n_live_tup,
+           s.n_dead_tup,
+           greatest(s.last_vacuum, s.last_autovacuum) AS last_vacuum,
+           s.autovacuum_count,
+           coalesce(
+               (SELECT split_part(o, '=', 2)::int FROM unnest(c.reloptions) AS o WHERE o LIKE 'fillfactor=%'),
+               100
+           ) AS fillfactor
+    FROM pg_stat_user_tables s
+    JOIN pg_class c ON c.oid = s.relid
+    WHERE (CAST(:tables AS text[]) IS NULL AND s.n_tup_upd > 0) OR s.relname = ANY(CAST(:tables AS text[]))
+    ORDER BY s.n_tup_upd DESC, s.relname
+""")
+
+
+@dataclass
+class TableStats:
+    table: str
+    updates: int
+    hot_updates: int
+    live: int
+    dead: int
+    last_vacuum: datetime | None
+    autovacuums: int
+    fillfactor: int
+
+    @property
+    def hot_ratio(self) -> float | None:
+        return self.hot_updates / self.updates if self.updates else None
+
+    @property
+    def dead_ratio(self) -> float | None:
+        total = self.live + self.dead
+        return self.dead / total if total else None
+
+
+def collect(connection, tables: list[str] | None) -> list[TableStats]:
+    return [TableStats(*row) for row in connection.execute(_STATS, {"tables": tables})]
+
+
+def _percent(ratio: float | None) -> str:
+    return f"{ratio:.1%}" if ratio is not None else "-"
+
+
+def print_report(stats: list[TableStats]) -> None:
+    if not stats:
+        print("No matching tables with statistics.")
+        return
+    header = (
+        f"{'table':<32}{'ff':>4}{'updates':>12}{'HOT':>8}{'live':>12}{'dead':>10}{'dead %':>8}"
+        f"{'autovac':>9}  last vacuum"
+    )
+    print(header)
+    print("-" * len(header))
+    for s in stats:
+        last = s.last_vacuum.strftime("%Y-%m-%d %H:%M") if s.last_vacuum else "never"
+        print(
+            f"{s.table:<32}{s.fillfactor:>4}{s.updates:>12,}{_percent(s.hot_ratio):>8}{s.live:>12,}{s.dead:>10,}"
+            f"{_percent(s.dead_ratio):>8}{s.autovacuums:>9,}  {last}"
+        )
+
+
+async def _run(tables: list[str] | None) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        stats = await connection.run_sync(collect, tables)
+    await engine.dispose()
+    print_report(stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report HOT-update ratio and dead tuples per table.")
+    parser.add_argument("tables", nargs="*", default=["scoring_sessions"], help="tables to report (default: scoring_sessions)")
+    parser.add_argument("--all", action="store_true", help="every table that has had updates")
+    args = parser.parse_args()
+    asyncio.run(_run(None if args.all else args.tables))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Find foreign keys with no supporting index and generate a revision for them.
+
+Postgres does not index the referencing side of a foreign key. Without an
+index whose leading columns are the FK columns, every ON DELETE CASCADE /
+SET NULL and every RESTRICT check on the parent does a sequential scan of the
+child table, and the parent DELETE holds its locks for the length of it.
+
+Foreign keys come from the live catalog (which covers tables that only exist in
+migrations, such as ``challenges`` and ``tournament_matchups``) plus any that
+``Base.metadata`` declares and the database does not have yet. An FK counts as
+covered when a valid, non-partial index starts with exactly its columns, in any
+order.
+
+    DATABASE_URL=... uv run python -m app.migrations.index_advisor           # report
+    DATABASE_URL=... uv run python -m app.migrations.index_advisor --write   # + revision
+
+The generated revision uses ``create_index_concurrently``; add ``index=True`` to
+the matching model columns so autogenerate doesn't propose dropping them.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.util import rev_id
+from sqlalchemy import text
+
+_FOREIGN_KEYS = text("""
+    SELECT
+        cl.relname AS table_name,
+        c.conname AS name,
+        ref.relname AS referred_table,
+        c.confdeltype::text AS on_delete,
+        array_agg(a.attname ORDER BY k.ord) AS columns,
+        cl.reltuples::bigint AS row_estimate
+    FROM pg_constraint c
+    JOIN pg_class cl ON cl.oid = c.conrelid
+    JOIN pg_class ref ON ref.oid = c.confrelid
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+    WHERE c.contype = 'f' AND n.nspname = current_schema()
+    GROUP BY cl.relname, c.conname, ref.relname, c.confdeltype, cl.reltuples
+""")
+
+# Leading key columns of every index usable for an FK lookup.
+_INDEX_PREFIXES = text("""
+    SELECT
+        cl.relname AS table_name,
+        array_agg(a.attname ORDER BY k.ord) AS columns
+    FROM pg_index i
+    JOIN pg_class cl ON cl.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+    WHERE n.nspname = current_schema()
+      AND i.indisvalid
+      AND i.indpred IS NULL
+      AND k.ord <= i.indnkeyatts
+    GROUP BY cl.relname, i.indexrelid
+""")
+
+_ON_DELETE = {"a": "NO ACTION", "r": "RESTRICT", "c": "CASCADE", "n": "SET NULL", "d": "SET DEFAULT"}
+
+
+@dataclass
+class UnindexedForeignKey:
+    table: str
+    columns: list[str]
+    referred_table: str
+    on_delete: str
+    rows: int
+    source: str  # "database" or "models" (declared but not migrated yet)
+
+    @property
+    def index_name(self) -> str:
+        return f"ix_{self.table}_{'_'.join(self.columns)}"[:63]
+
+
+def _covered(columns: list[str], prefixes: list[list[str]]) -> bool:
+    wanted = set(columns)
+    return any(set(prefix[: len(columns)]) == wanted for prefix in prefixes)
+
+
+def _metadata_foreign_keys(metadata) -> list[tuple[str, list[str], str, str]]:
+    keys = []
+    for table in metadata.tables.values():
+        for fk in table.foreign_key_constraints:
+            keys.append((table.name, [col.name for col in fk.columns], fk.referred_table.name, fk.ondelete or "NO ACTION"))
+    return keys
+
+
+def _metadata_index_prefixes(metadata) -> dict[str, list[list[str]]]:
+    prefixes: dict[str, list[list[str]]] = {}
+    for table in metadata.tables.values():
+        found = prefixes.setdefault(table.name, [])
+        if table.primary_key.columns:
+            found.append([col.name for col in table.primary_key.columns])
+        found.extend([col.name for col in index.columns] for index in table.indexes)
+        found.extend(
+            [col.name for col in constraint.columns]
+            for constraint in table.constraints
+            if constraint.__visit_name__ == "unique_constraint"
+        )
+    return prefixes
+
+
+def find_unindexed_foreign_keys(connection, metadata) -> list[UnindexedForeignKey]:
+    """FKs in the database or the models with no index leading on their columns."""
+    foreign_keys = [dict(row) for row in connection.execute(_FOREIGN_KEYS).mappings()]
+    live_prefixes: dict[str, list[list[str]]] = {}
+    for row in connection.execute(_INDEX_PREFIXES).mappings():
+        live_prefixes.setdefault(row["table_name"], []).append(list(row["columns"]))
+    connection.rollback()
+
+    missing: list[UnindexedForeignKey] = []
+    live = {(fk["table_name"], tuple(fk["columns"])) for fk in foreign_keys}
+    row_estimates = {fk["table_name"]: max(fk["row_estimate"], 0) for fk in foreign_keys}
+    for fk in foreign_keys:
+        if not _covered(fk["columns"], live_prefixes.get(fk["table_name"], [])):
+            missing.append(UnindexedForeignKey(
+                fk["table_name"], list(fk["columns"]), fk["referred_table"],
+                _ON_DELETE.get(fk["on_delete"], fk["on_delete"]), max(fk["row_estimate"], 0), "database",
+            ))
+
+    model_prefixes = _metadata_index_prefixes(metadata)
+    for table, columns, referred, on_delete in _metadata_foreign_keys(metadata):
+        if (table, tuple(columns)) in live:
+            continue
+        prefixes = live_prefixes.get(table, []) + model_prefixes.get(table, [])
+        if not _covered(columns, prefixes):
+            missing.append(UnindexedForeignKey(table, columns, referred, on_delete, row_estimates.get(table, 0), "models"))
+
+    missing.sort(key=lambda fk: (fk.table, fk.columns))
+    return missing
+
+
+def render_revision_body(missing: list[UnindexedForeignKey]) -> tuple[str, str]:
+    upgrades = "\n    ".join(
+        f"create_index_concurrently({fk.index_name!r}, {fk.table!r}, {fk.columns!r})" for fk in missing
+    )
+    downgrades = "\n    ".join(
+        f"drop_index_concurrently({fk.index_name!r}, {fk.table!r})" for fk in reversed(missing)
+    )
+    return upgrades, downgrades
+
+
+def write_revision(missing: list[UnindexedForeignKey], message: str) -> Path:
+    """Generate an Alembic revision on top of the current head."""
+    config = Config(str(Path(__file__).resolve().parents[2] / "alembic.ini"))
+    script_directory = ScriptDirectory.from_config(config)
+    upgrades, downgrades = render_revision_body(missing)
+    script = script_directory.generate_revision(
+        rev_id(),
+        message,
+        head="head",
+        upgrades=upgrades,
+        downgrades=downgrades,
+        imports="from app.migrations.indexes import create_index_concurrently, drop_index_concurrently\n",
+    )
+    return Path(script.path)
+
+
+def print_report(missing: list[UnindexedForeignKey]) -> None:
+    if not missing:
+        print("Every foreign key has a supporting index.")
+        return
+    header = f"{'table':<26}{'columns':<26}{'references':<25}{'on delete':<12}{'rows':>10}  source"
+    print(header)
+    print("-" * len(header))
+    for fk in missing:
+        print(
+            f"{fk.table:<26}{', '.join(fk.columns):<26}{fk.referred_table:<25}"
+            f"{fk.on_delete:<12}{fk.rows:>10,}  {fk.source}"
+        )
+    print(f"\n{len(missing)} foreign key(s) without a supporting index.")
+
+
+async def _run(write: bool, message: str) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+    from app.database import Base
+    import app.models  # noqa: F401  (registers every model on Base.metadata)
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        missing = await connection.run_sync(find_unindexed_foreign_keys, Base.metadata)
+    await engine.dispose()
+
+    print_report(missing)
+    if write and missing:
+        print(f"Wrote {write_revision(missing, message)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report foreign keys without a supporting index.")
+    parser.add_argument("--write", action="store_true", help="generate a concurrent index revision for them")
+    parser.add_argument("-m", "--message", default="add indexes for unindexed foreign keys")
+    args = parser.parse_args()
+    asyncio.run(_run(args.write, args.message))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""CREATE / DROP INDEX CONCURRENTLY for revisions that touch hot tables.
+
+A plain ``op.create_index`` holds a SHARE lock on the table for the whole
+build, blocking every insert into ``arrows``/``ends``/``scoring_sessions``.
+These helpers build (or drop) the index concurrently inside an autocommit
+block, so the revision's own transaction is committed before the build and a
+new one is opened afterwards. Mix them freely with ordinary ``op`` calls.
+
+A concurrent build that fails (deadlock, cancelled job, unique violation)
+leaves an INVALID index behind that is still maintained on every write.
+``create_index_concurrently`` drops such a leftover before retrying, and the
+runner sweeps any others before applying revisions.
+
+A revision that drops indexes it finds at run time, rather than ones it
+names, can't rebuild them from its own source on downgrade. Pass
+``remember`` to ``drop_index_concurrently`` and it saves the definition in
+``migration_dropped_indexes`` first; ``restore_dropped_indexes`` builds them
+again.
+"""
+import logging
+import re
+from contextlib import contextmanager
+
+from alembic import op
+from sqlalchemy import text
+
+log = logging.getLogger("alembic.runner")
+
+DROPPED_INDEXES_TABLE = "migration_dropped_indexes"
+
+_CREATE_DROPPED_INDEXES = f"""
+    CREATE TABLE IF NOT EXISTS {DROPPED_INDEXES_TABLE} (
+        name text NOT NULL,
+        index_name text NOT NULL,
+        definition text NOT NULL,
+        dropped_at timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (name, index_name)
+    )
+"""
+
+# pg_get_indexdef() gives "CREATE [UNIQUE] INDEX name ON ..."; rebuilt
+# concurrently and skipped if it's already there.
+_CREATE_PREFIX = re.compile(r"^CREATE (UNIQUE )?INDEX ")
+
+_INDEX_STATE = text("""
+    SELECT i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND c.relname = :name
+""")
+
+_INVALID_INDEXES = text("""
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+      AND NOT i.indisvalid
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_stat_progress_create_index p WHERE p.index_relid = i.indexrelid
+      )
+    ORDER BY c.relname
+""")
+
+
+@contextmanager
+def _without_lock_timeout(connection):
+    # A concurrent build only takes SHARE UPDATE EXCLUSIVE, which doesn't block
+    # writes, but it does wait for older transactions to finish. Letting
+    # lock_timeout cut that wait short would just leave an INVALID index.
+    previous = connection.execute(text("SELECT current_setting('lock_timeout')")).scalar()
+    connection.exec_driver_sql("SET lock_timeout = 0")
+    try:
+        yield
+    finally:
+        connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": previous})
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: list[str], **kw) -> None:
+    """Build an index without blocking writes. Safe to re-run after a failure."""
+    ctx = op.get_context()
+    with ctx.autocommit_block():
+        if ctx.as_sql:
+            op.create_index(index_name, table_name, columns, postgresql_concurrently=True, **kw)
+            return
+
+        connection = ctx.connection
+        valid = connection.execute(_INDEX_STATE, {"name": index_name}).scalar()
+        if valid is False:
+            log.warning("Dropping INVALID index %s left by an earlier failed build", index_name)
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        elif valid is True:
+            log.info("Index %s already exists, skipping", index_name)
+            return
+
+        with _without_lock_timeout(connection):
+            op.create_index(index_name, table_name, columns, postgresql_concurrently=True, **kw)
+
+
+def drop_index_concurrently(index_name: str, table_name: str, remember: str | None = None) -> None:
+    """Drop an index without taking an ACCESS EXCLUSIVE lock on its table.
+
+    With ``remember``, the index's definition is saved under that name first
+    (committed before the drop), for ``restore_dropped_indexes``.
+    """
+    ctx = op.get_context()
+    with ctx.autocommit_block():
+        if ctx.as_sql:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+            return
+        if remember is not None:
+            ctx.connection.exec_driver_sql(_CREATE_DROPPED_INDEXES)
+            ctx.connection.execute(
+                text(f"""
+                    INSERT INTO {DROPPED_INDEXES_TABLE} (name, index_name, definition)
+                    SELECT :name, :index_name, pg_get_indexdef(to_regclass(:index_name))
+                    WHERE to_regclass(:index_name) IS NOT NULL
+                    ON CONFLICT (name, index_name) DO NOTHING
+                """),
+                {"name": remember, "index_name": index_name},
+            )
+        with _without_lock_timeout(ctx.connection):
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def restore_dropped_indexes(remember: str) -> None:
+    """Rebuild, concurrently, the indexes dropped with ``remember``. Safe to re-run after a failure."""
+    ctx = op.get_context()
+    if ctx.as_sql:
+        # What was dropped is only known to the database.
+        return
+    with ctx.autocommit_block():
+        connection = ctx.connection
+        if not connection.execute(text("SELECT to_regclass(:table)"), {"table": DROPPED_INDEXES_TABLE}).scalar():
+            return
+        dropped = connection.execute(
+            text(f"SELECT index_name, definition FROM {DROPPED_INDEXES_TABLE} WHERE name = :name ORDER BY index_name"),
+            {"name": remember},
+        ).all()
+        for index_name, definition in dropped:
+            if connection.execute(_INDEX_STATE, {"name": index_name}).scalar() is False:
+                log.warning("Dropping INVALID index %s left by an earlier failed build", index_name)
+                connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+            log.info("Rebuilding index %s", index_name)
+            with _without_lock_timeout(connection):
+                connection.exec_driver_sql(_CREATE_PREFIX.sub(r"CREATE \1INDEX CONCURRENTLY IF NOT EXISTS ", definition))
+            connection.execute(
+                text(f"DELETE FROM {DROPPED_INDEXES_TABLE} WHERE name = :name AND index_name = :index_name"),
+                {"name": remember, "index_name": index_name},
+            )
+
+
+def drop_invalid_indexes(connection) -> list[str]:
+    """Drop every INVALID index in the schema that isn't currently being built.
+
+    Runs in autocommit on the migration connection before any revision, so a
+    build that failed on the previous deploy is retried cleanly.
+    """
+    names = list(connection.execute(_INVALID_INDEXES).scalars())
+    connection.commit()
+    if not names:
+        return names
+
+    isolation_level = connection.get_isolation_level()
+    connection.execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        for name in names:
+            log.warning("Dropping INVALID index %s left by a failed concurrent build", name)
+            connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    finally:
+        connection.commit()
+        connection.execution_options(isolation_level=isolation_level)
+    return names
@@ -0,0 +1,137 @@
+"""Benchmark random (v4) against time-ordered (v7) UUID primary keys.
+
+For each key kind this creates a scratch table shaped like ``feed_items`` with
+the id defaulting to ``gen_random_uuid()`` or ``uuid_generate_v7()``, seeds it,
+then times a stream of small committed inserts on top, the way the API writes.
+It reports insert throughput, the WAL those inserts generated, and the primary
+key's size (plus leaf density when ``pgstattuple`` is available).
+
+    DATABASE_URL=... uv run python -m app.migrations.key_benchmark
+    DATABASE_URL=... uv run python -m app.migrations.key_benchmark --seed 2000000 --rows 200000
+
+Point it at a development database: the scratch tables are dropped afterwards
+(unless ``--keep``), but seeding them writes a lot of WAL.
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+
+KINDS = {"uuid4": "gen_random_uuid()", "uuid7": "uuid_generate_v7()"}
+
+
+@dataclass
+class Result:
+    kind: str
+    rows_per_second: float
+    wal_bytes: int
+    index_bytes: int
+    table_bytes: int
+    leaf_density: float | None
+
+
+def _table(kind: str) -> str:
+    return f"key_benchmark_{kind}"
+
+
+async def _leaf_density(connection, index: str) -> float | None:
+    try:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pgstattuple"))
+        return await connection.scalar(text(f"SELECT avg_leaf_density FROM pgstatindex('{index}')"))
+    except Exception:
+        return None
+
+
+async def run_kind(connection, kind: str, seed: int, rows: int, batch: int) -> Result:
+    table = _table(kind)
+    await connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await connection.execute(text(f"""
+        CREATE TABLE {table} (
+            id uuid PRIMARY KEY DEFAULT {KINDS[kind]},
+            user_id uuid NOT NULL,
+            type varchar(30) NOT NULL,
+            data text,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+    """))
+    await connection.execute(text(f"""
+        INSERT INTO {table} (user_id, type, data)
+        SELECT gen_random_uuid(), 'session_completed', md5(g::text)
+        FROM generate_series(1, {seed}) AS g
+    """))
+    await connection.execute(text(f"VACUUM ANALYZE {table}"))
+    await connection.execute(text("CHECKPOINT"))
+
+    insert = text(f"""
+        INSERT INTO {table} (user_id, type, data)
+        SELECT gen_random_uuid(), 'session_completed', md5(g::text)
+        FROM generate_series(1, {batch}) AS g
+    """)
+    wal_before = await connection.scalar(text("SELECT pg_current_wal_lsn()"))
+    started = time.monotonic()
+    for _ in range(rows // batch):
+        await connection.execute(insert)
+    elapsed = time.monotonic() - started
+    wal_bytes = await connection.scalar(
+        text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:before AS pg_lsn))"), {"before": wal_before}
+    )
+
+    index = f"{table}_pkey"
+    return Result(
+        kind,
+        rows // batch * batch / elapsed,
+        int(wal_bytes),
+        await connection.scalar(text(f"SELECT pg_relation_size('{index}')")),
+        await connection.scalar(text(f"SELECT pg_relation_size('{table}')")),
+        await _leaf_density(connection, index),
+    )
+
+
+def print_results(results: list[Result], seed: int, rows: int, batch: int) -> None:
+    print(f"{seed:,} seeded rows, then {rows:,} rows inserted {batch} per commit\n")
+    header = f"{'key':<8}{'rows/s':>10}{'WAL':>12}{'pkey size':>12}{'leaf density':>14}{'heap size':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        density = f"{r.leaf_density:.1f}%" if r.leaf_density is not None else "-"
+        print(
+            f"{r.kind:<8}{r.rows_per_second:>10,.0f}{r.wal_bytes / 2**20:>10.1f}MB"
+            f"{r.index_bytes / 2**20:>10.1f}MB{density:>14}{r.table_bytes / 2**20:>10.1f}MB"
+        )
+
+
+async def benchmark(seed: int, rows: int, batch: int, keep: bool) -> list[Result]:
+    engine = create_async_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    results = []
+    async with engine.connect() as connection:
+        if not await connection.scalar(text("SELECT to_regproc('uuid_generate_v7')")):
+            raise SystemExit("uuid_generate_v7() is missing; run the migrations first")
+        try:
+            for kind in KINDS:
+                results.append(await run_kind(connection, kind, seed, rows, batch))
+        finally:
+            if not keep:
+                for kind in KINDS:
+                    await connection.execute(text(f"DROP TABLE IF EXISTS {_table(kind)}"))
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare uuid4 and uuid7 primary keys under inserts.")
+    parser.add_argument("--seed", type=int, default=1_000_000, help="rows to seed each table with (default: 1,000,000)")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows to insert and time (default: 100,000)")
+    parser.add_argument("--batch", type=int, default=10, help="rows per committed insert (default: 10)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch tables")
+    args = parser.parse_args()
+    results = asyncio.run(benchmark(args.seed, args.rows, args.batch, args.keep))
+    print_results(results, args.seed, args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Hash partitions for tables that grow without bound.
+
+A partitioned table's children are named ``<table>_p00``, ``<table>_p01``, ...
+so tooling that compares the catalog with the models (autogenerate, the
+rehearsal seeder) can recognise them. The children are not in the models; only
+the parent is, with ``postgresql_partition_by``.
+
+Usage in a revision::
+
+    from app.migrations.partitions import create_hash_partitions
+
+    op.execute("CREATE TABLE IF NOT EXISTS ends_partitioned (...) PARTITION BY HASH (session_id)")
+    create_hash_partitions("ends_partitioned", 16, name="ends")
+"""
+import re
+
+from alembic import op
+
+_PARTITION_NAME = re.compile(r"\w+_p\d{2}")
+
+
+def partition_name(table: str, remainder: int) -> str:
+    return f"{table}_p{remainder:02d}"
+
+
+def is_partition_name(name: str) -> bool:
+    return _PARTITION_NAME.fullmatch(name) is not None
+
+
+def create_hash_partitions(table: str, modulus: int, *, name: str | None = None) -> None:
+    """Create the ``modulus`` children of hash-partitioned ``table``. Idempotent.
+
+    ``name`` is the stem for the children when ``table`` is a shadow that will
+    be renamed into place (children keep their names through the rename).
+    """
+    for remainder in range(modulus):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(name or table, remainder)} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+        )
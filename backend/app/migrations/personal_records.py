@@ -0,0 +1,101 @@
+"""Rebuild ``personal_records`` from ``scoring_sessions``.
+
+Since revision d5f2b8e4a617 a trigger on ``scoring_sessions`` keeps each
+user's record per round template: completing a session offers its score, and
+deleting, reopening or re-scoring the record's session hands the record to
+the next best completed session (or drops it). This recomputes the records
+from the sessions, walking users in id order a batch at a time, one short
+transaction per batch, the same way ``app.migrations.user_stats`` does.
+
+    DATABASE_URL=... uv run python -m app.migrations.personal_records
+
+The revision runs the same statement as its backfill; run this after
+repairing data by hand or bulk-importing sessions with the trigger disabled.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+
+# Sees the users to rebuild as ``batch`` (a ``key`` column), as
+# app.migrations.backfill provides it. The sessions are read FOR SHARE and the
+# status filtered after locking, as in app.migrations.user_stats.
+#
+# The record is the highest completed score; on a tie the session completed
+# first keeps it, as only a strictly higher score ever replaced it. Sessions
+# without a completed_at predate it being set and are dated by started_at.
+# The trigger in d5f2b8e4a617 picks the same way. A record that stays on the
+# same session keeps its achieved_at and isn't rewritten.
+REBUILD_PERSONAL_RECORDS = """
+    INSERT INTO personal_records AS pr (id, user_id, template_id, session_id, score, achieved_at)
+    SELECT DISTINCT ON (s.user_id, s.template_id)
+           uuid_generate_v7(), s.user_id, s.template_id, s.id, s.total_score, coalesce(s.completed_at, s.started_at)
+    FROM batch
+    JOIN LATERAL (
+        SELECT id, user_id, template_id, status, total_score, completed_at, started_at FROM scoring_sessions
+        WHERE user_id = batch.key
+        FOR SHARE
+    ) s ON s.status = 'completed'
+    ORDER BY s.user_id, s.template_id, s.total_score DESC, coalesce(s.completed_at, s.started_at), s.id
+    ON CONFLICT (user_id, template_id) DO UPDATE
+    SET session_id = EXCLUDED.session_id, score = EXCLUDED.score,
+        achieved_at = CASE WHEN pr.session_id = EXCLUDED.session_id THEN pr.achieved_at ELSE EXCLUDED.achieved_at END
+    WHERE (pr.session_id, pr.score) IS DISTINCT FROM (EXCLUDED.session_id, EXCLUDED.score)
+"""
+
+_BATCH = "WITH batch AS (SELECT unnest(CAST(:ids AS uuid[])) AS key) "
+
+_NEXT_BATCH = text("SELECT id FROM users WHERE id > :after ORDER BY id LIMIT :batch_size")
+
+# Templates the user no longer has a completed session of.
+_DELETE_STALE = text("""
+    DELETE FROM personal_records pr
+    WHERE pr.user_id = ANY(:ids)
+      AND NOT EXISTS (
+          SELECT 1 FROM scoring_sessions s
+          WHERE s.user_id = pr.user_id AND s.template_id = pr.template_id AND s.status = 'completed'
+      )
+""")
+_REBUILD = text(_BATCH + REBUILD_PERSONAL_RECORDS)
+
+
+def rebuild(connection, batch_size: int) -> tuple[int, int, float]:
+    """Recompute every user's records. Returns (users, records changed, seconds)."""
+    started = time.monotonic()
+    after = uuid.UUID(int=0)
+    users = changed = 0
+    while True:
+        ids = connection.execute(_NEXT_BATCH, {"after": after, "batch_size": batch_size}).scalars().all()
+        if not ids:
+            break
+        users += len(ids)
+        after = ids[-1]
+        changed += connection.execute(_DELETE_STALE, {"ids": ids}).rowcount
+        changed += connection.execute(_REBUILD, {"ids": ids}).rowcount
+        connection.commit()
+    return users, changed, time.monotonic() - started
+
+
+async def _run(batch_size: int) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        users, changed, seconds = await connection.run_sync(rebuild, batch_size)
+    await engine.dispose()
+    print(f"Rebuilt personal records for {users:,} users ({changed:,} changed) in {seconds:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild personal_records from the sessions.")
+    parser.add_argument("--batch-size", type=int, default=200, help="users per batch (default: 200)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Pre-flight cost estimate for pending revisions (``alembic -x dry_run=true upgrade head``).
+
+Nothing is executed. Each pending revision is rendered to SQL the same way
+``--sql`` does, every statement is classified, and the class is joined with the
+live size and row estimate of the table it touches:
+
+``metadata``   catalog-only change; needs its lock only for an instant
+``rewrite``    the table and all its indexes are rewritten (ALTER TYPE, volatile DEFAULT, ...)
+``scan``       a full scan to validate (SET NOT NULL, FK/CHECK without NOT VALID)
+``index``      an index build, concurrent or not
+``data``       an UPDATE/INSERT/DELETE (or backfill chunk) over the table
+
+The duration forecast is a rough throughput model, not a benchmark: it tells
+you whether a revision is milliseconds, seconds or minutes, and which lock it
+holds on which table for that long. Tune the ``MIGRATION_PREFLIGHT_*`` rates if it is
+consistently off for our instance size.
+"""
+import io
+import logging
+import re
+from dataclasses import asdict, dataclass
+
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import text
+
+from app.config import settings
+from app.migrations import report
+
+# What each lock mode stops other sessions from doing while it is held.
+LOCK_IMPACT = {
+    "AccessExclusiveLock": "blocks reads and writes",
+    "ExclusiveLock": "blocks writes",
+    "ShareRowExclusiveLock": "blocks writes",
+    "ShareLock": "blocks writes",
+    "ShareUpdateExclusiveLock": "blocks DDL/vacuum only",
+    "RowExclusiveLock": "row locks only",
+    None: "none",
+}
+
+_TABLE_STATS = text("""
+    SELECT c.relname,
+           GREATEST(c.reltuples, 0)::bigint AS row_estimate,
+           pg_relation_size(c.oid) AS heap_bytes,
+           pg_total_relation_size(c.oid) AS total_bytes
+    FROM pg_class c
+    WHERE c.relnamespace = to_regnamespace(current_schema())::oid
+      AND c.relkind IN ('r', 'p')
+""")
+
+_COLUMN_TYPES = text("""
+    SELECT table_name, column_name, data_type, character_maximum_length
+    FROM information_schema.columns
+    WHERE table_schema = current_schema()
+""")
+
+_NAME = r'(?:ONLY\s+)?(?:IF\s+(?:NOT\s+)?EXISTS\s+)?"?([\w.]+)"?'
+_VOLATILE_DEFAULT = re.compile(r"DEFAULT\s+\(?\s*(gen_random_uuid|uuid_generate_v4|random|clock_timestamp|nextval)\b", re.I)
+
+_MB = 1024 * 1024
+
+
+@dataclass
+class Operation:
+    revision: str
+    statement: str
+    kind: str
+    table: str | None
+    lock: str | None
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def impact(self) -> str:
+        return LOCK_IMPACT.get(self.lock, self.lock or "none")
+
+
+class _StatementCollector(io.StringIO):
+    """Output buffer that keeps each statement Alembic emits separately."""
+
+    def __init__(self):
+        super().__init__()
+        self.statements: list[str] = []
+
+    def write(self, s: str) -> int:
+        statement = s.strip().rstrip(";").strip()
+        if statement and statement.upper() not in ("BEGIN", "COMMIT"):
+            self.statements.append(statement)
+        return len(s)
+
+
+def _first(pattern: str, sql: str) -> str | None:
+    match = re.search(pattern, sql, re.I | re.S)
+    return match.group(1).split(".")[-1] if match else None
+
+
+def _binary_coercible(current: dict | None, new_type: str) -> bool:
+    """Type changes Postgres applies without rewriting the table."""
+    if current is None:
+        return False
+    new_type = new_type.upper()
+    if current["data_type"] == "character varying":
+        if new_type.startswith("TEXT"):
+            return True
+        length = re.match(r"VARCHAR\((\d+)\)", new_type)
+        old_length = current["character_maximum_length"]
+        return bool(length and old_length and int(length.group(1)) >= old_length)
+    if current["data_type"] == "text":
+        return new_type.startswith("TEXT")
+    return False
+
+
+def classify(sql: str, columns: dict[tuple[str, str], dict]) -> tuple[str, str | None, str | None]:
+    """Return (kind, table, lock mode) for one rendered statement."""
+    flat = " ".join(sql.split())
+    upper = flat.upper()
+
+    if upper.startswith("CREATE TABLE"):
+        return "metadata", _first(r"CREATE TABLE\s+" + _NAME, flat), None
+    if re.match(r"CREATE (UNIQUE )?INDEX", upper):
+        table = _first(r"\sON\s+" + _NAME, flat)
+        return "index", table, "ShareUpdateExclusiveLock" if " CONCURRENTLY " in upper else "ShareLock"
+    if upper.startswith("DROP INDEX"):
+        return "metadata", None, None if " CONCURRENTLY " in upper else "AccessExclusiveLock"
+    if upper.startswith(("DROP TABLE", "DROP VIEW")):
+        return "metadata", _first(r"DROP (?:TABLE|VIEW)\s+" + _NAME, flat), "AccessExclusiveLock"
+    if upper.startswith(("CREATE TRIGGER", "CREATE OR REPLACE TRIGGER", "DROP TRIGGER")):
+        return "metadata", _first(r"\sON\s+" + _NAME, flat), "ShareRowExclusiveLock"
+    if upper.startswith(("CREATE", "DROP", "COMMENT", "GRANT", "REVOKE", "SET ", "RESET ", "DO ")):
+        return "metadata", None, None
+
+    if upper.startswith("ALTER TABLE"):
+        table = _first(r"ALTER TABLE\s+" + _NAME, flat)
+        if " VALIDATE CONSTRAINT " in upper:
+            return "scan", table, "ShareUpdateExclusiveLock"
+        type_change = re.search(r"ALTER COLUMN\s+\"?(\w+)\"?\s+(?:SET DATA )?TYPE\s+([\w ]+(?:\(\d+\))?)", flat, re.I)
+        if type_change:
+            column, new_type = type_change.groups()
+            if _binary_coercible(columns.get((table, column)), new_type.strip()):
+                return "metadata", table, "AccessExclusiveLock"
+            return "rewrite", table, "AccessExclusiveLock"
+        if " ADD COLUMN " in upper and (
+            _VOLATILE_DEFAULT.search(flat) or " GENERATED " in upper and " STORED" in upper
+        ):
+            return "rewrite", table, "AccessExclusiveLock"
+        if re.search(r"SET TABLESPACE|SET (UN)?LOGGED", upper):
+            return "rewrite", table, "AccessExclusiveLock"
+        if " SET NOT NULL" in upper:
+            return "scan", table, "AccessExclusiveLock"
+        if " ADD CONSTRAINT " in upper or " ADD PRIMARY KEY" in upper or " ADD UNIQUE" in upper:
+            if " NOT VALID" in upper:
+                return "metadata", table, "ShareRowExclusiveLock"
+            if re.search(r"\sFOREIGN KEY\s*\(", upper):
+                return "scan", table, "ShareRowExclusiveLock"
+            if re.search(r"\sCHECK\s*\(", upper):
+                return "scan", table, "AccessExclusiveLock"
+            if " USING INDEX " in upper:
+                return "metadata", table, "AccessExclusiveLock"
+            return "index", table, "AccessExclusiveLock"
+        if re.search(r"ATTACH PARTITION|DETACH PARTITION", upper):
+            return "scan", table, "ShareUpdateExclusiveLock"
+        if re.search(r"\sSET\s*\(", upper) or " ENABLE " in upper or " DISABLE " in upper:
+            return "metadata", table, "ShareUpdateExclusiveLock"
+        return "metadata", table, "AccessExclusiveLock"
+
+    # DML — including backfill chunks, which are CTEs wrapping an UPDATE.
+    dml = re.search(r"\b(?:UPDATE|INSERT INTO|DELETE FROM)\s+" + _NAME, flat, re.I)
+    if dml:
+        target = dml.group(1).split(".")[-1]
+        if target == "alembic_version":
+            return "metadata", None, None
+        return "data", target, "RowExclusiveLock"
+    if upper.startswith(("VACUUM", "ANALYZE", "REINDEX", "CLUSTER")):
+        table = _first(r"(?:VACUUM|ANALYZE|REINDEX TABLE|CLUSTER)\s+(?:\([^)]*\)\s+)?(?:FULL\s+)?" + _NAME, flat)
+        lock = "AccessExclusiveLock" if re.match(r"(VACUUM\s+FULL|CLUSTER)", upper) else "ShareUpdateExclusiveLock"
+        return ("rewrite" if lock == "AccessExclusiveLock" else "scan"), table, lock
+    return "unknown", None, None
+
+
+def estimate_seconds(kind: str, stats: dict | None) -> float:
+    if stats is None or kind == "metadata":
+        return 0.0
+    rows, heap, total = stats["row_estimate"], stats["heap_bytes"], stats["total_bytes"]
+    if kind == "scan":
+        return heap / _MB / settings.MIGRATION_PREFLIGHT_SCAN_MB_PER_SECOND
+    if kind == "rewrite":
+        return total / _MB / settings.MIGRATION_PREFLIGHT_REWRITE_MB_PER_SECOND
+    if kind == "index":
+        return heap / _MB / settings.MIGRATION_PREFLIGHT_INDEX_MB_PER_SECOND
+    if kind == "data":
+        return rows / settings.MIGRATION_PREFLIGHT_DML_ROWS_PER_SECOND
+    return 0.0
+
+
+def render_revision(connection, script) -> list[str]:
+    """Render one revision's upgrade() to the statements it would run."""
+    collector = _StatementCollector()
+    ctx = MigrationContext.configure(
+        dialect=connection.dialect,
+        opts={"as_sql": True, "output_buffer": collector, "literal_binds": True, "transactional_ddl": True},
+    )
+    with Operations.context(ctx):
+        script.module.upgrade()
+    return collector.statements
+
+
+def pending_revisions(connection, script_directory, destination: str):
+    heads = MigrationContext.configure(connection).get_current_heads()
+    lower = heads if heads else "base"
+    # iterate_revisions walks newest-first; apply order is the reverse.
+    revisions = list(script_directory.iterate_revisions(destination, lower))
+    revisions.reverse()
+    return heads, revisions
+
+
+def run(connection, script_directory, destination: str = "heads") -> list[Operation]:
+    """Classify and cost every statement of every pending revision, and print a summary."""
+    # Rendering builds a MigrationContext per revision; skip its INFO chatter.
+    logging.getLogger("alembic.runtime.migration").setLevel(logging.WARNING)
+    heads, revisions = pending_revisions(connection, script_directory, destination)
+    tables = {row["relname"]: dict(row) for row in connection.execute(_TABLE_STATS).mappings()}
+    columns = {
+        (row["table_name"], row["column_name"]): dict(row)
+        for row in connection.execute(_COLUMN_TYPES).mappings()
+    }
+    connection.rollback()
+
+    operations: list[Operation] = []
+    for script in revisions:
+        try:
+            statements = render_revision(connection, script)
+        except Exception as exc:  # a revision that reads the database while upgrading
+            operations.append(Operation(script.revision, f"<could not render: {exc}>", "unknown", None, None))
+            continue
+        for statement in statements:
+            kind, table, lock = classify(statement, columns)
+            stats = tables.get(table)
+            operations.append(Operation(
+                revision=script.revision,
+                statement=" ".join(statement.split())[:120],
+                kind=kind,
+                table=table,
+                lock=lock,
+                rows=stats["row_estimate"] if stats else 0,
+                bytes=stats["total_bytes"] if stats else 0,
+                seconds=round(estimate_seconds(kind, stats), 3),
+            ))
+
+    _print_summary(heads, revisions, operations)
+    if report.enabled():
+        for item in operations:
+            report.write_record({"event": "migration_preflight", **asdict(item), "impact": item.impact})
+    return operations
+
+
+def _human_bytes(n: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TB"
+
+
+def _print_summary(heads, revisions, operations: list[Operation]) -> None:
+    current = ", ".join(heads) or "<empty database>"
+    print(f"Current revision: {current}")
+    if not revisions:
+        print("Nothing to migrate.")
+        return
+
+    print(f"{len(revisions)} pending revision(s):\n")
+    header = f"{'revision':<14}{'kind':<10}{'table':<26}{'rows':>12}{'size':>9}{'est':>10}  lock"
+    print(header)
+    print("-" * len(header))
+    for item in operations:
+        if item.kind == "metadata" and item.lock is None:
+            continue
+        lock = f"{item.lock} ({item.impact})" if item.lock else "-"
+        print(
+            f"{item.revision:<14}{item.kind:<10}{(item.table or '-'):<26}{item.rows:>12,}"
+            f"{_human_bytes(item.bytes):>9}{item.seconds:>9.1f}s  {lock}"
+        )
+
+    blocking = [item for item in operations if LOCK_IMPACT.get(item.lock, "").startswith("blocks") and "DDL" not in item.impact]
+    worst = max(blocking, key=lambda item: item.seconds, default=None)
+    total = sum(item.seconds for item in operations)
+    print(f"\nEstimated total: {total:.1f}s")
+    if worst and worst.seconds >= 1:
+        print(
+            f"Longest blocking step: {worst.revision} {worst.kind} on {worst.table} "
+            f"~{worst.seconds:.1f}s holding {worst.lock} ({worst.impact})"
+        )
+    unknown = [item for item in operations if item.kind == "unknown"]
+    if unknown:
+        print(f"{len(unknown)} statement(s) could not be classified:")
+        for item in unknown:
+            print(f"  {item.revision}: {item.statement}")
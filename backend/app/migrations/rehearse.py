@@ -0,0 +1,305 @@
+"""Rehearse pending migrations against a production-sized scratch database.
+
+Migrations are otherwise only exercised against near-empty databases, so a
+revision that rewrites ``arrows`` or scans ``feed_items`` looks free until it
+runs in production. This command:
+
+1. creates a scratch database on the server in ``DATABASE_URL``,
+2. runs ``alembic upgrade <from>`` on it,
+3. fills every table with synthetic rows (millions of ``arrows``, hundreds of
+   thousands of ``scoring_sessions``, large ``feed_items``/``notifications``),
+   then VACUUM ANALYZE,
+4. runs ``alembic upgrade <to>`` with the migration report enabled and prints
+   each revision's wall time, the locks it held and the tables it rewrote,
+5. drops the scratch database (unless ``--keep``).
+
+Rows are generated from the schema as it stands at ``<from>``: the models
+describe head, and the revisions being rehearsed are exactly the difference.
+Primary keys, foreign keys, ``IN (...)`` checks and unique constraints are
+respected. Foreign keys spread children evenly over their parents, and nullable
+ones are left NULL on every other row.
+
+    DATABASE_URL=... uv run python -m app.migrations.rehearse --from 0c2446f1aa1a
+    DATABASE_URL=... uv run python -m app.migrations.rehearse --from 0c2446f1aa1a --scale 0.1 --keep
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import MetaData, UniqueConstraint, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.migrations.backfill import CHECKPOINT_TABLE
+from app.migrations.expand_contract import LEGACY_WRITES_TABLE
+from app.migrations.indexes import DROPPED_INDEXES_TABLE
+from app.migrations.partitions import is_partition_name
+from app.migrations.squash import in_list
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Rows per table at --scale 1. Tables not listed get DEFAULT_ROWS.
+VOLUMES = {
+    "users": 50_000,
+    "round_templates": 500,
+    "round_template_stages": 1_500,
+    "scoring_sessions": 300_000,
+    "ends": 1_000_000,
+    "arrows": 6_000_000,
+    "personal_records": 100_000,
+    "feed_items": 2_000_000,
+    "notifications": 2_000_000,
+    "follows": 200_000,
+}
+DEFAULT_ROWS = 5_000
+CHUNK_ROWS = 500_000
+
+# Hand-tuned values where the generic per-type ones would be unrealistic. ``g``
+# is the row's 0-based position in the series.
+OVERRIDES = {
+    ("users", "email"): "'archer' || g || '@example.com'",
+    ("users", "username"): "'archer' || g",
+    ("arrows", "arrow_number"): "1 + g % 6",
+    ("arrows", "score_value"): "(ARRAY['X', '10', '9', '8', '7', '6', '5', 'M'])[1 + g % 8]",
+    ("arrows", "score_numeric"): "(ARRAY[10, 10, 9, 8, 7, 6, 5, 0])[1 + g % 8]",
+    ("arrows", "x_pos"): "random() * 2 - 1",
+    ("arrows", "y_pos"): "random() * 2 - 1",
+    # Numbered within the session picked for the row (see _column_value).
+    ("ends", "end_number"): "1 + g / cardinality(p_session_id.ids)",
+    ("ends", "end_total"): "(g * 7) % 61",
+    ("ends", "arrow_values"): "ARRAY['X', '10', '9', '9', '8', '7']",
+    ("ends", "arrow_codes"): "ARRAY[1, 2, 3, 3, 4, 5]",
+    ("ends", "arrow_scores"): "ARRAY[10, 10, 9, 9, 8, 7]",
+    ("ends", "arrow_x"): "ARRAY[random() * 2 - 1, random() * 2 - 1, random() * 2 - 1, NULL, NULL, NULL]",
+    ("ends", "arrow_y"): "ARRAY[random() * 2 - 1, random() * 2 - 1, random() * 2 - 1, NULL, NULL, NULL]",
+    ("end_events", "seq"): "1 + g / cardinality(p_session_id.ids)",
+    ("end_events", "end_number"): "1 + g / cardinality(p_session_id.ids)",
+    ("scoring_sessions", "total_score"): "(g * 13) % 721",
+    ("scoring_sessions", "total_arrows"): "72",
+    ("scoring_sessions", "total_x_count"): "g % 25",
+    ("user_trend_samples", "positions"): "ARRAY[1, 2, 3]",
+    ("template_score_histograms", "bin_width"): "1",
+    ("template_score_histograms", "cumulative"): "ARRAY[0, 1, 2]",
+    ("template_handicap_tables", "scores"): "ARRAY[600, 599, 598]",
+    ("round_template_stages", "allowed_values"): """'["X","10","9","8","7","6","5","4","3","2","1","M"]'::json""",
+    ("round_template_stages", "value_score_map"): "json_build_object('X', 10, '10', 10, '9', 9, 'M', 0)",
+}
+
+# pg_locks modes from weakest to strongest; ShareLock and up block writes.
+LOCK_MODES = [
+    "AccessShareLock", "RowShareLock", "RowExclusiveLock", "ShareUpdateExclusiveLock",
+    "ShareLock", "ShareRowExclusiveLock", "ExclusiveLock", "AccessExclusiveLock",
+]
+
+
+def _column_value(table, column, parents: dict[str, str], checks: dict[str, list[str]], unique: set[str]) -> str | None:
+    override = OVERRIDES.get((table.name, column.name))
+    if override:
+        return override
+    type_name = type(column.type).__name__.upper()
+    length = getattr(column.type, "length", None)
+    # Foreign keys first: a key column can also be a reference (ends.session_id).
+    if column.name in parents:
+        pick = f"{parents[column.name]}[1 + g % cardinality({parents[column.name]})]"
+        return f"CASE WHEN g % 2 = 0 THEN {pick} END" if column.nullable else pick
+    if column.primary_key and type_name == "UUID":
+        return "gen_random_uuid()"
+    if column.name in checks:
+        values = checks[column.name]
+        return f"(ARRAY[{', '.join(values)}])[1 + g % {len(values)}]"
+    if type_name == "UUID":
+        return "gen_random_uuid()"
+    if type_name in ("VARCHAR", "TEXT", "CHAR"):
+        value = f"'{column.name}-' || g" if column.name in unique else f"'{column.name}-' || md5(g::text)"
+        return f"left({value}, {length})" if length else value
+    if type_name in ("INTEGER", "BIGINT", "SMALLINT"):
+        return "g" if column.name in unique else "g % 100"
+    if type_name in ("DOUBLE_PRECISION", "FLOAT", "REAL", "NUMERIC"):
+        return "random() * 100"
+    if type_name == "BOOLEAN":
+        return "g % 2 = 0"
+    if type_name in ("TIMESTAMP", "DATETIME"):
+        return "now() - (g % 525600) * interval '1 minute'"
+    if type_name == "DATE":
+        return "current_date - (g % 365)"
+    if type_name in ("JSON", "JSONB"):
+        return f"'{{}}'::{type_name.lower()}"
+    # Unknown type: leave it to the column default (or NULL).
+    return None
+
+
+def _insert_statement(table, rows: int, offset: int) -> str:
+    parents: dict[str, str] = {}
+    ctes = []
+    aliases = []
+    for fk in table.foreign_key_constraints:
+        columns = [column.name for column in fk.columns]
+        referred = [element.column for element in fk.elements]
+        alias = f"p_{'_'.join(columns)}"
+        aliases.append(alias)
+        if len(columns) == 1:
+            parents.setdefault(columns[0], f"{alias}.ids")
+            ctes.append(f"{alias} AS (SELECT array_agg({referred[0].name}) AS ids FROM {referred[0].table.name})")
+            continue
+        # A composite key picks all its columns from the same parent row, even
+        # those that also reference a table of their own.
+        order = ", ".join(r.name for r in referred)
+        ctes.append(
+            f"{alias} AS (SELECT "
+            + ", ".join(f"array_agg({r.name} ORDER BY {order}) AS {c}" for c, r in zip(columns, referred))
+            + f" FROM {referred[0].table.name})"
+        )
+        for column in columns:
+            parents[column] = f"{alias}.{column}"
+
+    checks = {}
+    for constraint in table.constraints:
+        parsed = in_list(str(getattr(constraint, "sqltext", "")))
+        if parsed:
+            checks[parsed[0]] = parsed[1]
+    unique = {
+        col.name
+        for constraint in table.constraints if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1
+        for col in constraint.columns
+    } | {col.name for index in table.indexes if index.unique and len(index.columns) == 1 for col in index.columns}
+
+    names, values = [], []
+    for column in table.columns:
+        value = _column_value(table, column, parents, checks, unique)
+        if value is not None:
+            names.append(column.name)
+            values.append(value)
+
+    with_clause = f"WITH {', '.join(ctes)}" if ctes else ""
+    joins = "".join(f" CROSS JOIN {alias}" for alias in aliases)
+    return f"""
+        INSERT INTO {table.name} ({', '.join(names)})
+        {with_clause}
+        SELECT {', '.join(values)}
+        FROM generate_series({offset}, {offset + rows - 1}) AS g{joins}
+        ON CONFLICT DO NOTHING
+    """
+
+
+def _reflect(sync_connection) -> MetaData:
+    metadata = MetaData()
+    metadata.reflect(sync_connection)
+    return metadata
+
+
+async def seed(url: str, scale: float) -> None:
+    engine = create_async_engine(url, isolation_level="AUTOCOMMIT")
+    async with engine.connect() as connection:
+        metadata = await connection.run_sync(_reflect)
+        for table in metadata.sorted_tables:
+            # Rows for a partition go in through its parent.
+            if table.name in ("alembic_version", CHECKPOINT_TABLE, LEGACY_WRITES_TABLE, DROPPED_INDEXES_TABLE) or is_partition_name(table.name):
+                continue
+            total = max(1, int(VOLUMES.get(table.name, DEFAULT_ROWS) * scale))
+            started = time.monotonic()
+            inserted = 0
+            # Each table gets its own synthetic rows: triggers that write other
+            # tables (session totals, the end event log) stay off meanwhile.
+            await connection.execute(text(f"ALTER TABLE {table.name} DISABLE TRIGGER USER"))
+            for offset in range(0, total, CHUNK_ROWS):
+                result = await connection.execute(text(_insert_statement(table, min(CHUNK_ROWS, total - offset), offset)))
+                inserted += result.rowcount
+            await connection.execute(text(f"ALTER TABLE {table.name} ENABLE TRIGGER USER"))
+            print(f"  {table.name:<28}{inserted:>12,} rows  {time.monotonic() - started:6.1f}s", flush=True)
+        await connection.execute(text("VACUUM ANALYZE"))
+    await engine.dispose()
+
+
+def alembic_upgrade(url: str, revision: str, report_path: str = "") -> None:
+    env = {**os.environ, "DATABASE_URL": url, "MIGRATION_REPORT_PATH": report_path}
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", revision], cwd=BACKEND_DIR, env=env, check=True)
+
+
+def _strongest(modes: list[str]) -> str:
+    return max(modes, key=LOCK_MODES.index) if modes else "-"
+
+
+def print_summary(records: list[dict]) -> None:
+    header = f"{'revision':<14}{'wall':>10}  {'strongest lock':<22}{'tables':<40}rewritten"
+    print(header)
+    print("-" * len(header))
+    total = 0.0
+    for record in records:
+        total += record["wall_time_ms"]
+        indexes = {r["relation"] for r in record["relations"] if "index" in r["kind"]}
+        by_mode: dict[str, list[str]] = {}
+        for lock in record["locks"]:
+            if lock["relation"] in indexes:
+                continue
+            by_mode.setdefault(_strongest(lock["modes"]), []).append(lock["relation"])
+        strongest = _strongest(list(by_mode))
+        tables = ", ".join(sorted(by_mode.get(strongest, [])))
+        print(
+            f"{record['revision']:<14}{record['wall_time_ms'] / 1000:>9.2f}s  {strongest:<22}{tables[:39]:<40}"
+            f"{', '.join(record['rewritten_tables']) or '-'}"
+        )
+    print(f"\nTotal: {total / 1000:.2f}s across {len(records)} revision(s).")
+    print("Locks are held until each revision commits, so wall time bounds how long they block.")
+
+
+async def _create_database(admin_url: str, name: str, drop: bool = False) -> None:
+    engine = create_async_engine(admin_url, isolation_level="AUTOCOMMIT")
+    async with engine.connect() as connection:
+        if drop:
+            await connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        else:
+            await connection.execute(text(f'CREATE DATABASE "{name}"'))
+    await engine.dispose()
+
+
+def rehearse(from_revision: str, to_revision: str, scale: float, keep: bool) -> list[dict]:
+    base = make_url(settings.DATABASE_URL)
+    name = f"{base.database}_rehearsal_{datetime.now():%Y%m%d%H%M%S}"
+    admin_url = base.set(database="postgres").render_as_string(hide_password=False)
+    scratch_url = base.set(database=name).render_as_string(hide_password=False)
+
+    print(f"Creating scratch database {name}")
+    asyncio.run(_create_database(admin_url, name))
+    try:
+        alembic_upgrade(scratch_url, from_revision)
+        print(f"Seeding at scale {scale}:")
+        asyncio.run(seed(scratch_url, scale))
+
+        with tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False) as report_file:
+            report_path = report_file.name
+        print(f"Upgrading {from_revision} -> {to_revision}")
+        alembic_upgrade(scratch_url, to_revision, report_path)
+        with open(report_path) as fh:
+            records = [json.loads(line) for line in fh if line.strip()]
+        os.unlink(report_path)
+        records = [r for r in records if r.get("event") == "migration_revision"]
+        print()
+        print_summary(records)
+        return records
+    finally:
+        if keep:
+            print(f"Kept scratch database {name}")
+        else:
+            asyncio.run(_create_database(admin_url, name, drop=True))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rehearse migrations against a production-sized scratch database.")
+    parser.add_argument("--from", dest="from_revision", required=True, help="revision to seed the data at")
+    parser.add_argument("--to", dest="to_revision", default="head", help="revision to upgrade to (default: head)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the row volumes (default: 1)")
+    parser.add_argument("--keep", action="store_true", help="don't drop the scratch database afterwards")
+    args = parser.parse_args()
+    rehearse(args.from_revision, args.to_revision, args.scale, args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Per-revision timing, lock and rewrite report for the migration job.
+
+For every revision the runner emits one JSON object (one line) with the wall
+time, the relation locks the revision's transaction held when it finished, and
+the size of every relation it touched before and after. A relation whose
+``relfilenode`` changed was rewritten (ALTER TYPE, SET TABLESPACE, CLUSTER,
+VACUUM FULL, TRUNCATE ...).
+
+Lines go to ``MIGRATION_REPORT_PATH`` (appended), or to stdout when the path
+is ``-`` — Cloud Run turns JSON lines on stdout into structured log entries,
+so the job's history stays queryable in Cloud Logging.
+
+Locks are sampled once, just before the revision commits. Locks taken inside
+an ``autocommit_block`` (concurrent index builds) have been released by then
+and are not listed.
+"""
+import json
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.config import settings
+
+_RELATIONS = text("""
+    SELECT c.oid, c.relname, c.relkind::text AS relkind, c.relfilenode, pg_total_relation_size(c.oid) AS size
+    FROM pg_class c
+    WHERE c.relnamespace = to_regnamespace(current_schema())::oid
+      AND c.relkind IN ('r', 'p', 'm', 'i', 'I')
+""")
+
+_HELD_LOCKS = text("""
+    SELECT c.relname, l.mode
+    FROM pg_locks l
+    JOIN pg_class c ON c.oid = l.relation
+    WHERE l.pid = pg_backend_pid()
+      AND l.locktype = 'relation'
+      AND l.granted
+      AND c.relnamespace = to_regnamespace(current_schema())::oid
+      AND c.relname NOT LIKE 'alembic_version%'
+    ORDER BY c.relname, l.mode
+""")
+
+_KINDS = {"r": "table", "p": "partitioned table", "m": "materialized view", "i": "index", "I": "partitioned index"}
+
+
+def enabled() -> bool:
+    return bool(settings.MIGRATION_REPORT_PATH)
+
+
+def snapshot_relations(connection) -> dict[int, dict]:
+    """Sizes and filenodes of every relation in the schema.
+
+    Runs inside a savepoint that is rolled back, so the ACCESS SHARE locks
+    ``pg_total_relation_size`` takes are released and don't show up as locks
+    the revision acquired.
+    """
+    savepoint = connection.begin_nested()
+    try:
+        rows = connection.execute(_RELATIONS).mappings().all()
+    finally:
+        savepoint.rollback()
+    return {row["oid"]: dict(row) for row in rows}
+
+
+def held_locks(connection) -> dict[str, list[str]]:
+    """Lock modes held by this transaction, keyed by relation name."""
+    locks: dict[str, list[str]] = {}
+    for relname, mode in connection.execute(_HELD_LOCKS):
+        locks.setdefault(relname, []).append(mode)
+    return locks
+
+
+def relation_changes(before: dict[int, dict], after: dict[int, dict], locked: set[str]) -> list[dict]:
+    """Relations that were created, dropped, rewritten, resized or locked."""
+    changes = []
+    for oid in sorted(before.keys() | after.keys(), key=lambda o: (before.get(o) or after[o])["relname"]):
+        old, new = before.get(oid), after.get(oid)
+        rel = old or new
+        rewritten = old is not None and new is not None and old["relfilenode"] != new["relfilenode"]
+        size_before = old["size"] if old else None
+        size_after = new["size"] if new else None
+        if not (rewritten or size_before != size_after or rel["relname"] in locked):
+            continue
+        changes.append({
+            "relation": (new or old)["relname"],
+            "kind": _KINDS.get(rel["relkind"], rel["relkind"]),
+            "created": old is None,
+            "dropped": new is None,
+            "rewritten": rewritten,
+            "size_before": size_before,
+            "size_after": size_after,
+        })
+    return changes
+
+
+def build_record(script, direction: str, started_at: datetime, wall_time_s: float, attempt: int,
+                 locks: dict[str, list[str]], before: dict[int, dict], after: dict[int, dict]) -> dict:
+    relations = relation_changes(before, after, set(locks))
+    return {
+        "event": "migration_revision",
+        "revision": script.revision,
+        "down_revision": script.down_revision,
+        "doc": script.doc,
+        "direction": direction,
+        "attempt": attempt,
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "wall_time_ms": round(wall_time_s * 1000, 1),
+        "locks": [{"relation": name, "modes": modes} for name, modes in locks.items()],
+        "relations": relations,
+        "rewritten_tables": [r["relation"] for r in relations if r["rewritten"] and "table" in r["kind"]],
+    }
+
+
+def write_record(record: dict) -> None:
+    line = json.dumps(record, default=str)
+    if settings.MIGRATION_REPORT_PATH == "-":
+        print(line, file=sys.stdout, flush=True)
+    else:
+        with open(settings.MIGRATION_REPORT_PATH, "a") as fh:
+            fh.write(line + "\n")
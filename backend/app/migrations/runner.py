@@ -0,0 +1,132 @@
+"""Lock-timeout and retry handling for online migrations.
+
+Every statement a migration runs is bounded by ``lock_timeout`` so an ACCESS
+EXCLUSIVE lock that queues behind a long API transaction gives up quickly
+instead of stalling all scoring traffic queued behind it. A revision that
+times out is rolled back on its own (``transaction_per_migration``) and retried
+after a jittered exponential backoff; revisions already applied stay applied.
+
+A revision can override the default by defining a module-level
+``lock_timeout_ms`` (e.g. a one-off table rewrite that is scheduled off-hours).
+"""
+import functools
+import logging
+import random
+import time
+from datetime import datetime, timezone
+
+from alembic import op
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.migrations import report
+
+log = logging.getLogger("alembic.runner")
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class _RunState:
+    """Tracks the revision currently executing so a failure can be attributed."""
+
+    def __init__(self):
+        self.current_revision: str | None = None
+        self.attempts: dict[str | None, int] = {}
+
+
+_state = _RunState()
+
+
+def is_lock_timeout(exc: BaseException) -> bool:
+    orig = getattr(exc, "orig", None)
+    return getattr(orig, "sqlstate", None) == LOCK_NOT_AVAILABLE
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) retry attempt."""
+    ceiling = min(
+        settings.MIGRATION_RETRY_MAX_DELAY_MS,
+        settings.MIGRATION_RETRY_BASE_DELAY_MS * 2 ** (attempt - 1),
+    )
+    return random.uniform(ceiling / 2, ceiling) / 1000
+
+
+def set_session_timeouts(connection) -> None:
+    """Apply the default timeouts for the whole migration connection.
+
+    Committed immediately so a later rollback of a failed revision cannot
+    undo the SET.
+    """
+    connection.exec_driver_sql(f"SET lock_timeout = {settings.MIGRATION_LOCK_TIMEOUT_MS}")
+    connection.exec_driver_sql(f"SET statement_timeout = {settings.MIGRATION_STATEMENT_TIMEOUT_MS}")
+    connection.commit()
+
+
+def _wrap(fn, script, direction: str, lock_timeout_ms: int | None):
+    if getattr(fn, "_quiverscore_wrapped", False):
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        _state.current_revision = script.revision
+        if lock_timeout_ms is not None:
+            op.execute(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}")
+
+        ctx = op.get_context()
+        if ctx.as_sql or not report.enabled():
+            return fn(*args, **kwargs)
+
+        started_at = datetime.now(timezone.utc)
+        before = report.snapshot_relations(ctx.connection)
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        wall_time = time.perf_counter() - t0
+        locks = report.held_locks(ctx.connection)
+        after = report.snapshot_relations(ctx.connection)
+        report.write_record(report.build_record(
+            script, direction, started_at, wall_time,
+            _state.attempts.get(script.revision, 0) + 1, locks, before, after,
+        ))
+        return result
+
+    wrapper._quiverscore_wrapped = True
+    return wrapper
+
+
+def instrument_revisions(script_directory) -> None:
+    """Wrap each revision's upgrade/downgrade with its per-revision settings and reporting."""
+    for script in script_directory.walk_revisions():
+        module = script.module
+        lock_timeout_ms = getattr(module, "lock_timeout_ms", None)
+        module.upgrade = _wrap(module.upgrade, script, "upgrade", lock_timeout_ms)
+        module.downgrade = _wrap(module.downgrade, script, "downgrade", lock_timeout_ms)
+
+
+def run_migrations_with_retry(context) -> None:
+    """Run pending revisions, retrying any revision that hits ``lock_timeout``.
+
+    Retries are counted per revision; once a revision has failed more than
+    ``MIGRATION_LOCK_RETRIES`` times the error is re-raised and the job fails
+    with every earlier revision committed.
+    """
+    attempts = _state.attempts
+    attempts.clear()
+    while True:
+        try:
+            with context.begin_transaction():
+                context.run_migrations()
+            return
+        except DBAPIError as exc:
+            if not is_lock_timeout(exc):
+                raise
+            revision = _state.current_revision
+            attempt = attempts[revision] = attempts.get(revision, 0) + 1
+            if attempt > settings.MIGRATION_LOCK_RETRIES:
+                log.error("Revision %s still blocked after %d retries, giving up", revision, attempt - 1)
+                raise
+            delay = backoff_delay(attempt)
+            log.warning(
+                "Revision %s hit lock_timeout (attempt %d/%d), retrying in %.2fs",
+                revision, attempt, settings.MIGRATION_LOCK_RETRIES, delay,
+            )
+            time.sleep(delay)
@@ -0,0 +1,196 @@
+"""Build the per-template score histograms behind ``/sessions/{id}/percentile``.
+
+Ranking a completed session against everyone who shot the same round took
+sorting every completed session of the template. ``template_score_histograms``
+(revision e7a3c1d9f528) holds, per round template, the cumulative count of
+completed sessions below each score bin, so the API finds how many scored
+lower with two array reads. Bins are one point wide up to ``MAX_BINS`` scores
+and widen beyond; within a wider bin the API interpolates.
+
+A template's histogram is rebuilt when its max score changed, or when its
+completed sessions (summed from ``user_template_stats``, a3f6d0c9b471)
+changed by at least ``--min-change`` of the count it was built from, 1% by
+default: a handful of new sessions doesn't move a percentile of thousands.
+A batch of templates' scores is streamed from ``scoring_sessions`` and
+counted with NumPy across all of them together, so memory stays at
+``--chunk-size`` scores however many sessions a template has. Run it nightly
+from cron, and with ``--all`` after deploying e7a3c1d9f528.
+
+    DATABASE_URL=... uv run python -m app.migrations.score_histograms
+    DATABASE_URL=... uv run python -m app.migrations.score_histograms --all
+"""
+import argparse
+import asyncio
+import itertools
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import text
+
+MAX_BINS = 2048
+
+_NEXT_BATCH = text("""
+    WITH totals AS (
+        SELECT template_id, sum(completed_sessions) AS sessions, sum(score_sum) AS score_sum
+        FROM user_template_stats
+        GROUP BY template_id
+        HAVING sum(completed_sessions) > 0
+    )
+    SELECT rt.id, rt.max_score
+    FROM totals s
+    JOIN round_templates rt ON rt.id = s.template_id
+    LEFT JOIN template_score_histograms h ON h.template_id = s.template_id
+    WHERE s.template_id > :after
+      AND (:all OR h.template_id IS NULL OR h.max_score <> rt.max_score
+           OR ((s.sessions, s.score_sum) IS DISTINCT FROM (h.sessions, h.score_sum)
+               AND abs(s.sessions - h.sessions) >= CAST(:min_change AS double precision) * h.sessions))
+    ORDER BY s.template_id
+    LIMIT :batch_size
+""")
+
+# ``i`` is the template's 0-based position in the batch, so the rows come
+# back as plain integers NumPy can take in one go.
+_SCORES = text("""
+    SELECT p.i - 1, ss.total_score
+    FROM unnest(CAST(:ids AS uuid[])) WITH ORDINALITY AS p(template_id, i)
+    JOIN scoring_sessions ss ON ss.template_id = p.template_id
+    WHERE ss.status = 'completed'
+""")
+
+_UPSERT = text("""
+    INSERT INTO template_score_histograms (template_id, max_score, sessions, score_sum, bin_width, cumulative, computed_at)
+    VALUES (:template_id, :max_score, :sessions, :score_sum, :bin_width, CAST(:cumulative AS bigint[]), now())
+    ON CONFLICT (template_id) DO UPDATE
+    SET max_score = EXCLUDED.max_score, sessions = EXCLUDED.sessions, score_sum = EXCLUDED.score_sum,
+        bin_width = EXCLUDED.bin_width, cumulative = EXCLUDED.cumulative, computed_at = EXCLUDED.computed_at
+""")
+_DELETE = text("DELETE FROM template_score_histograms WHERE template_id = ANY(:ids)")
+# Templates whose last completed session was deleted or abandoned since.
+_DELETE_GONE = text("""
+    DELETE FROM template_score_histograms h
+    WHERE NOT EXISTS (
+        SELECT 1 FROM user_template_stats s
+        WHERE s.template_id = h.template_id AND s.completed_sessions > 0
+    )
+""")
+
+
+def bin_widths(max_scores: np.ndarray) -> np.ndarray:
+    """The narrowest bin width that fits scores 0..max_score into ``MAX_BINS`` bins."""
+    return np.maximum(-(-(max_scores + 1) // MAX_BINS), 1)
+
+
+def histogram(positions: np.ndarray, scores: np.ndarray, widths: np.ndarray, bins: np.ndarray) -> np.ndarray:
+    """Count ``scores`` into a (templates, MAX_BINS) matrix of bins.
+
+    ``positions`` says which template each score belongs to. Scores above a
+    template's max score (shot before its stages changed) go in its last bin.
+    """
+    columns = np.minimum(scores // widths[positions], bins[positions] - 1)
+    flat = np.bincount(positions * MAX_BINS + columns, minlength=len(widths) * MAX_BINS)
+    return flat.reshape(len(widths), MAX_BINS)
+
+
+@dataclass
+class HistogramResult:
+    templates: int = 0
+    sessions: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+def _write_batch(connection, templates, chunk_size: int) -> int:
+    """Count the completed sessions of ``templates`` and store their histograms."""
+    ids = [t.id for t in templates]
+    max_scores = np.array([max(t.max_score, 0) for t in templates], dtype=np.int64)
+    widths = bin_widths(max_scores)
+    bins = max_scores // widths + 1
+    counts = np.zeros((len(templates), MAX_BINS), dtype=np.int64)
+    score_sums = np.zeros(len(templates), dtype=np.int64)
+
+    result = connection.execute(_SCORES, {"ids": ids}, execution_options={"stream_results": True})
+    for rows in result.partitions(chunk_size):
+        # np.array() over Row objects converts element by element; flattening
+        # the pairs first is two orders of magnitude faster.
+        flat = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows))
+        chunk = flat.reshape(-1, 2)
+        positions, scores = chunk[:, 0], np.maximum(chunk[:, 1], 0)
+        counts += histogram(positions, scores, widths, bins)
+        score_sums += np.bincount(positions, weights=chunk[:, 1], minlength=len(templates)).astype(np.int64)
+
+    cumulative = np.zeros((len(templates), MAX_BINS + 1), dtype=np.int64)
+    np.cumsum(counts, axis=1, out=cumulative[:, 1:])
+    sessions = cumulative[:, -1]
+
+    rows = [
+        {
+            "template_id": ids[k],
+            "max_score": int(max_scores[k]),
+            "sessions": int(sessions[k]),
+            "score_sum": int(score_sums[k]),
+            "bin_width": int(widths[k]),
+            "cumulative": cumulative[k, : bins[k] + 1].tolist(),
+        }
+        for k in range(len(templates)) if sessions[k] > 0
+    ]
+    gone = [ids[k] for k in range(len(templates)) if sessions[k] == 0]
+    if rows:
+        connection.execute(_UPSERT, rows)
+    if gone:
+        connection.execute(_DELETE, {"ids": gone})
+    return int(sessions.sum())
+
+
+def refresh(connection, batch_size: int, chunk_size: int, min_change: float, rebuild_all: bool) -> HistogramResult:
+    """Rebuild the stale histograms (every histogram with ``rebuild_all``)."""
+    started = time.monotonic()
+    result = HistogramResult()
+    after = uuid.UUID(int=0)
+    while True:
+        templates = connection.execute(_NEXT_BATCH, {
+            "after": after, "all": rebuild_all, "min_change": min_change, "batch_size": batch_size,
+        }).all()
+        if not templates:
+            break
+        after = templates[-1].id
+        result.sessions += _write_batch(connection, templates, chunk_size)
+        result.templates += len(templates)
+        connection.commit()
+    result.removed = connection.execute(_DELETE_GONE).rowcount
+    connection.commit()
+    result.seconds = time.monotonic() - started
+    return result
+
+
+async def _run(batch_size: int, chunk_size: int, min_change: float, rebuild_all: bool) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        result = await connection.run_sync(refresh, batch_size, chunk_size, min_change, rebuild_all)
+    await engine.dispose()
+    print(
+        f"Rebuilt {result.templates:,} score histograms ({result.sessions:,} sessions), "
+        f"removed {result.removed:,}, in {result.seconds:.1f}s."
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build per-template score histograms into template_score_histograms.")
+    parser.add_argument("--all", action="store_true", help="rebuild every histogram, not just stale ones")
+    parser.add_argument(
+        "--min-change", type=float, default=0.01,
+        help="rebuild once the completed session count moved by this fraction (default: 0.01)",
+    )
+    parser.add_argument("--batch-size", type=int, default=50, help="templates per batch (default: 50)")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="scores counted at a time (default: 1000000)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size, args.chunk_size, args.min_change, args.all))
+
+
+if __name__ == "__main__":
+    main()
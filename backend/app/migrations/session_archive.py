@@ -0,0 +1,150 @@
+"""Move old completed sessions' ends into ``session_archives``.
+
+A completed session's ends are read only when someone opens it, yet they sit
+in ``ends`` (and its end events in ``end_events``) next to the ones being
+scored today. This packs each old session's ends into one compressed
+``session_archives`` row (revision 4b8e2c6f0a17) and deletes them, and its
+events, from the hot tables. The ``session_ends`` view reads both, so the API
+shows an archived session as before. Totals on ``scoring_sessions`` are
+unchanged.
+
+Sessions are walked in id order a batch at a time; each batch is packed and
+deleted in one short transaction, so the job can be stopped and rerun at any
+point. Run it from cron, e.g. nightly.
+
+    DATABASE_URL=... uv run python -m app.migrations.session_archive --dry-run
+    DATABASE_URL=... uv run python -m app.migrations.session_archive --older-than-days 365
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+_NEXT_BATCH = text("SELECT id FROM scoring_sessions WHERE id > :after ORDER BY id LIMIT :batch_size")
+
+_CANDIDATES = """
+    SELECT s.id FROM scoring_sessions s
+    WHERE s.id = ANY(:ids)
+      AND s.status = 'completed'
+      AND s.completed_at < now() - make_interval(days => :older_than_days)
+      AND EXISTS (SELECT 1 FROM ends e WHERE e.session_id = s.id)
+      AND NOT EXISTS (SELECT 1 FROM session_archives a WHERE a.session_id = s.id)
+"""
+_FIND = text(f"{_CANDIDATES} ORDER BY s.id")
+# Under the lock a session deleted (or archived by another run) since _FIND drops out.
+_LOCK = text(f"{_CANDIDATES} ORDER BY s.id FOR UPDATE OF s")
+
+_COUNT_ENDS = text("SELECT count(*) FROM ends WHERE session_id = ANY(:ids)")
+
+# The triggers on ends leave totals and the event log alone while this is set.
+_ARCHIVING = text("SELECT set_config('quiverscore.archiving', 'on', true)")
+
+# unnest() pads the four arrays to the longest, so that is the end's arrow count.
+_PACK = text("""
+    WITH per_end AS (
+        SELECT session_id,
+               array_agg(end_number ORDER BY end_number) AS end_numbers,
+               array_agg(id ORDER BY end_number) AS end_ids,
+               array_agg(stage_id ORDER BY end_number) AS stage_ids,
+               array_agg(end_total ORDER BY end_number) AS end_totals,
+               array_agg(created_at ORDER BY end_number) AS created_ats,
+               array_agg(greatest(cardinality(arrow_codes), cardinality(arrow_scores),
+                                  cardinality(arrow_x), cardinality(arrow_y))::smallint ORDER BY end_number) AS arrow_counts
+        FROM ends
+        WHERE session_id = ANY(:ids)
+        GROUP BY session_id
+    ), per_arrow AS (
+        SELECT e.session_id,
+               array_agg(u.code ORDER BY e.end_number, u.n) AS arrow_codes,
+               array_agg(u.score ORDER BY e.end_number, u.n) AS arrow_scores,
+               array_agg(u.x ORDER BY e.end_number, u.n) AS arrow_x,
+               array_agg(u.y ORDER BY e.end_number, u.n) AS arrow_y
+        FROM ends e
+        CROSS JOIN LATERAL unnest(e.arrow_codes, e.arrow_scores, e.arrow_x, e.arrow_y) WITH ORDINALITY AS u(code, score, x, y, n)
+        WHERE e.session_id = ANY(:ids)
+        GROUP BY e.session_id
+    )
+    INSERT INTO session_archives (session_id, end_numbers, end_ids, stage_ids, end_totals, created_ats,
+                                  arrow_counts, arrow_codes, arrow_scores, arrow_x, arrow_y)
+    SELECT p.session_id, p.end_numbers, p.end_ids, p.stage_ids, p.end_totals, p.created_ats, p.arrow_counts,
+           coalesce(a.arrow_codes, '{}'), coalesce(a.arrow_scores, '{}'), coalesce(a.arrow_x, '{}'), coalesce(a.arrow_y, '{}')
+    FROM per_end p
+    LEFT JOIN per_arrow a USING (session_id)
+""")
+_DELETE_ENDS = text("DELETE FROM ends WHERE session_id = ANY(:ids)")
+_DELETE_EVENTS = text("DELETE FROM end_events WHERE session_id = ANY(:ids)")
+
+
+@dataclass
+class ArchiveResult:
+    checked: int = 0
+    sessions: int = 0
+    ends: int = 0
+    seconds: float = 0.0
+
+
+def archive(connection, older_than_days: int, batch_size: int, dry_run: bool) -> ArchiveResult:
+    """Archive every completed session older than ``older_than_days``; with
+    ``dry_run`` only count them."""
+    started = time.monotonic()
+    result = ArchiveResult()
+    after = uuid.UUID(int=0)
+    params = {"older_than_days": older_than_days}
+    while True:
+        ids = connection.execute(_NEXT_BATCH, {"after": after, "batch_size": batch_size}).scalars().all()
+        if not ids:
+            break
+        result.checked += len(ids)
+        after = ids[-1]
+        if dry_run:
+            found = connection.execute(_FIND, {**params, "ids": ids}).scalars().all()
+            ends = connection.execute(_COUNT_ENDS, {"ids": found}).scalar_one() if found else 0
+        else:
+            found = connection.execute(_LOCK, {**params, "ids": ids}).scalars().all()
+            ends = 0
+            if found:
+                connection.execute(_ARCHIVING)
+                connection.execute(_PACK, {"ids": found})
+                ends = connection.execute(_DELETE_ENDS, {"ids": found}).rowcount
+                connection.execute(_DELETE_EVENTS, {"ids": found})
+        connection.commit()
+        result.sessions += len(found)
+        result.ends += ends
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def print_report(result: ArchiveResult, dry_run: bool) -> None:
+    verb = "would archive" if dry_run else "archived"
+    print(
+        f"Checked {result.checked:,} sessions; {verb} {result.sessions:,} "
+        f"({result.ends:,} ends) in {result.seconds:.1f}s."
+    )
+
+
+async def _run(older_than_days: int, batch_size: int, dry_run: bool) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        result = await connection.run_sync(archive, older_than_days, batch_size, dry_run)
+    await engine.dispose()
+    print_report(result, dry_run)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move old completed sessions' ends into session_archives.")
+    parser.add_argument("--older-than-days", type=int, default=365, help="completed at least this long ago (default: 365)")
+    parser.add_argument("--batch-size", type=int, default=500, help="sessions per batch (default: 500)")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    args = parser.parse_args()
+    asyncio.run(_run(args.older_than_days, args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Verify (and repair) the session totals the database maintains.
+
+``scoring_sessions.total_score``/``total_x_count``/``total_arrows`` are kept up
+to date by triggers on ``ends`` (revision 0a7d3e5b9c41). This recomputes them
+from the ends (archived ones included, via ``session_ends``), walking sessions
+in id order a batch at a time, and lists every
+session whose stored totals differ. With ``--fix`` each batch's drifted rows
+are locked, recomputed and rewritten in one short transaction; a submission
+racing the fix waits for the lock and then applies its delta on top.
+
+    DATABASE_URL=... uv run python -m app.migrations.session_totals          # report
+    DATABASE_URL=... uv run python -m app.migrations.session_totals --fix    # + repair
+
+Run it with ``--fix`` once after deploying 0a7d3e5b9c41: until then the API
+computed the totals itself.
+"""
+import argparse
+import asyncio
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+
+def _actual(session_id: str) -> str:
+    # Same counting as the triggers: NULL slots are arrows deleted through the view.
+    return f"""
+    SELECT coalesce(sum(e.end_total), 0) AS score,
+           coalesce(sum(cardinality(array_positions(e.arrow_codes, x.code))), 0) AS xs,
+           coalesce(sum(cardinality(e.arrow_codes) - cardinality(array_positions(e.arrow_codes, NULL))), 0) AS arrows
+    FROM session_ends e, (SELECT coalesce((SELECT code FROM score_codes WHERE value = 'X'), -1) AS code) x
+    WHERE e.session_id = {session_id}
+    """
+
+
+_DRIFTED = "(s.total_score, s.total_x_count, s.total_arrows) IS DISTINCT FROM (t.score, t.xs, t.arrows)"
+
+_NEXT_BATCH = text("SELECT id FROM scoring_sessions WHERE id > :after ORDER BY id LIMIT :batch_size")
+
+_FIND_DRIFT = text(f"""
+    SELECT s.id, s.total_score, s.total_x_count, s.total_arrows, t.score, t.xs, t.arrows
+    FROM scoring_sessions s
+    CROSS JOIN LATERAL ({_actual("s.id")}) t
+    WHERE s.id = ANY(:ids) AND {_DRIFTED}
+    ORDER BY s.id
+""")
+
+# The triggers ignore top-level writes to the totals unless this is set.
+_ALLOW_WRITES = text("SELECT set_config('quiverscore.reconcile_totals', 'on', true)")
+_LOCK = text("SELECT id FROM scoring_sessions WHERE id = ANY(:ids) ORDER BY id FOR UPDATE")
+_FIX = text(f"""
+    UPDATE scoring_sessions s
+    SET total_score = t.score, total_x_count = t.xs, total_arrows = t.arrows
+    FROM scoring_sessions o
+    CROSS JOIN LATERAL ({_actual("o.id")}) t
+    WHERE s.id = o.id AND o.id = ANY(:ids) AND {_DRIFTED}
+    RETURNING s.id
+""")
+
+
+@dataclass
+class Drift:
+    session_id: uuid.UUID
+    stored: tuple[int, int, int]
+    actual: tuple[int, int, int]
+
+
+def reconcile(connection, batch_size: int, fix: bool) -> tuple[int, list[Drift]]:
+    """Check every session; with ``fix``, rewrite the drifted ones. Returns (checked, drifted)."""
+    after = uuid.UUID(int=0)
+    checked = 0
+    drifted: list[Drift] = []
+    while True:
+        ids = connection.execute(_NEXT_BATCH, {"after": after, "batch_size": batch_size}).scalars().all()
+        if not ids:
+            break
+        checked += len(ids)
+        after = ids[-1]
+        found = [
+            Drift(row.id, (row.total_score, row.total_x_count, row.total_arrows), (row.score, row.xs, row.arrows))
+            for row in connection.execute(_FIND_DRIFT, {"ids": ids})
+        ]
+        connection.commit()
+        if found and fix:
+            found_ids = [d.session_id for d in found]
+            connection.execute(_ALLOW_WRITES)
+            connection.execute(_LOCK, {"ids": found_ids})
+            # Recomputed under the lock; a session fixed by a racing
+            # submission in the meantime drops out here.
+            fixed = set(connection.execute(_FIX, {"ids": found_ids}).scalars())
+            connection.commit()
+            found = [d for d in found if d.session_id in fixed]
+        drifted.extend(found)
+    return checked, drifted
+
+
+def print_report(checked: int, drifted: list[Drift], fixed: bool) -> None:
+    if not drifted:
+        print(f"Checked {checked:,} sessions; every total matches its ends.")
+        return
+    header = f"{'session':<38}{'stored (score/x/arrows)':<26}actual"
+    print(header)
+    print("-" * len(header))
+    for d in drifted:
+        print(f"{str(d.session_id):<38}{'/'.join(map(str, d.stored)):<26}{'/'.join(map(str, d.actual))}")
+    print(f"\n{len(drifted)} of {checked:,} sessions {'fixed' if fixed else 'drifted'}.")
+
+
+async def _run(batch_size: int, fix: bool) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        checked, drifted = await connection.run_sync(reconcile, batch_size, fix)
+    await engine.dispose()
+    print_report(checked, drifted, fix)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check scoring_sessions totals against their ends.")
+    parser.add_argument("--fix", action="store_true", help="rewrite the totals that drifted")
+    parser.add_argument("--batch-size", type=int, default=1000, help="sessions per batch (default: 1000)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size, args.fix))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Squashed baseline snapshots for bootstrapping empty databases.
+
+Building a fresh database (CI, preview environments, local setup) by replaying
+every revision from base costs one transaction per revision and redoes work
+that later revisions undo. A snapshot in ``alembic/squashed/`` builds the
+schema of one revision in a single pass. Snapshots live outside
+``alembic/versions/`` so the revision graph, and the single-head CI check, never
+see them.
+
+When ``alembic upgrade`` runs against a database with no tables and the target
+descends from a snapshot, env.py applies the newest such snapshot and stamps
+its revision in the same transaction; the revisions after it then run
+incrementally as usual. Databases that already have a schema never take this
+path. Set ``MIGRATION_SQUASHED_BOOTSTRAP=false`` to always replay from base.
+
+Regenerate a snapshot from a scratch database migrated the slow way::
+
+    DATABASE_URL=... uv run alembic upgrade <rev>
+    DATABASE_URL=... uv run python -m app.migrations.squash <rev>
+"""
+import argparse
+import asyncio
+import importlib.util
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+
+from alembic.autogenerate import render_python_code
+from alembic.operations import Operations, ops
+from alembic.script.revision import RevisionError
+from alembic.util import CommandError
+from sqlalchemy import CheckConstraint, MetaData, text
+
+from app.config import settings
+from app.migrations.backfill import CHECKPOINT_TABLE
+from app.migrations.expand_contract import LEGACY_WRITES_TABLE
+from app.migrations.indexes import DROPPED_INDEXES_TABLE
+
+log = logging.getLogger("alembic.runner")
+
+SNAPSHOT_DIR = Path(__file__).resolve().parents[2] / "alembic" / "squashed"
+
+# Tables owned by the migration tooling rather than by any revision.
+_BOOKKEEPING_TABLES = ("alembic_version", CHECKPOINT_TABLE, LEGACY_WRITES_TABLE, DROPPED_INDEXES_TABLE)
+
+_HEADER = '''"""squashed baseline at {revision}
+
+Schema as of revision {revision}, generated by ``python -m app.migrations.squash``.
+Not part of the revision graph: env.py applies it to empty databases in place
+of replaying every revision up to {revision}. Regenerate rather than edit.
+
+Create Date: {create_date}
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = {revision!r}
+
+
+def upgrade() -> None:
+'''
+
+
+def load_snapshots() -> list:
+    """Import every snapshot script in ``alembic/squashed``."""
+    snapshots = []
+    for path in sorted(SNAPSHOT_DIR.glob("*.py")):
+        spec = importlib.util.spec_from_file_location(f"_squashed_{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        snapshots.append(module)
+    return snapshots
+
+
+def _reaches(script_directory, destination: str, revision: str) -> bool:
+    """Whether upgrading to ``destination`` passes through ``revision``."""
+    try:
+        return any(script.revision == revision for script in script_directory.iterate_revisions(destination, "base"))
+    except (CommandError, RevisionError):
+        return False
+
+
+def pick_snapshot(script_directory, destination: str | None):
+    """The newest snapshot on the path from base to ``destination``, if any."""
+    if not destination:
+        return None
+    best = None
+    for snapshot in load_snapshots():
+        if not _reaches(script_directory, destination, snapshot.revision):
+            continue
+        if best is None or _reaches(script_directory, snapshot.revision, best.revision):
+            best = snapshot
+    return best
+
+
+def is_empty(connection) -> bool:
+    """True when the schema has no tables and no recorded revision."""
+    try:
+        version_table = connection.execute(text("SELECT to_regclass('alembic_version')")).scalar()
+        if version_table is not None and connection.execute(text("SELECT count(*) FROM alembic_version")).scalar():
+            return False
+        relations = connection.execute(
+            text(
+                """
+                SELECT count(*)
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = current_schema()
+                  AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+                  AND c.relname <> ALL(:bookkeeping)
+                """
+            ),
+            {"bookkeeping": list(_BOOKKEEPING_TABLES)},
+        ).scalar()
+        return relations == 0
+    finally:
+        connection.commit()
+
+
+def bootstrap(connection, migration_context, script_directory, destination: str | None) -> str | None:
+    """Apply the squashed snapshot to an empty database and stamp it.
+
+    Returns the stamped revision, or None when the incremental path applies
+    (non-empty database, no snapshot behind ``destination``, or disabled).
+    """
+    if not settings.MIGRATION_SQUASHED_BOOTSTRAP or migration_context.as_sql:
+        return None
+    snapshot = pick_snapshot(script_directory, destination)
+    if snapshot is None or not is_empty(connection):
+        return None
+    log.info("Empty database: applying squashed baseline at %s", snapshot.revision)
+    with Operations.context(migration_context):
+        with migration_context.begin_transaction(_per_migration=True):
+            snapshot.upgrade()
+            migration_context.stamp(script_directory, snapshot.revision)
+    return snapshot.revision
+
+
+# pg_get_constraintdef deparses ``status IN ('a', 'b')`` into an ANY(ARRAY[...])
+# form that Postgres then stores differently when it is parsed back.
+_DEPARSED_IN = re.compile(r"^\(?(\w+)\)?::text = ANY \(+ARRAY\[(.*)\]\)?::text\[\]\)$")
+_VARCHAR_LITERAL = re.compile(r"('(?:[^']|'')*')::character varying")
+
+
+def in_list(sqltext: str) -> tuple[str, list[str]] | None:
+    """``(column, quoted literals)`` of a reflected ``column IN (...)`` check, if it is one."""
+    match = _DEPARSED_IN.match(sqltext)
+    if match is None:
+        return None
+    column, items = match.groups()
+    return column, [value.group(1) for value in _VARCHAR_LITERAL.finditer(items)]
+
+
+def _restore_in_list(sqltext: str) -> str:
+    parsed = in_list(sqltext)
+    if parsed is None:
+        return sqltext
+    column, values = parsed
+    return f"{column} IN ({', '.join(values)})"
+
+
+def _reflect(sync_connection) -> MetaData:
+    metadata = MetaData()
+    metadata.reflect(sync_connection)
+    return metadata
+
+
+def render_snapshot(metadata: MetaData, revision: str) -> str:
+    """Render reflected tables and indexes as a snapshot script."""
+    upgrade_ops = []
+    for table in metadata.sorted_tables:
+        if table.name in _BOOKKEEPING_TABLES:
+            continue
+        for column in table.columns:
+            # Reflection reports False for every non-serial column; leave it
+            # implicit like the hand-written revisions do.
+            column.autoincrement = "auto"
+        for constraint in table.constraints:
+            if isinstance(constraint, CheckConstraint):
+                constraint.sqltext = text(_restore_in_list(str(constraint.sqltext)))
+        create_table = ops.CreateTableOp.from_table(table)
+        create_table.kw.pop("postgresql_ignore_search_path", None)
+        upgrade_ops.append(create_table)
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            create_index = ops.CreateIndexOp.from_index(index)
+            if not create_index.kw.get("postgresql_include"):
+                create_index.kw.pop("postgresql_include", None)
+            upgrade_ops.append(create_index)
+
+    body = render_python_code(ops.UpgradeOps(ops=upgrade_ops))
+    lines = [line for line in body.splitlines() if not line.lstrip().startswith("# ###")]
+    body = (
+        "\n".join(lines)
+        .replace("astext_type=Text()", "astext_type=sa.Text()")
+        .replace(", postgresql_include=[], postgresql_nulls_not_distinct=False", "")
+    )
+    return _HEADER.format(revision=revision, create_date=datetime.now()) + body + "\n"
+
+
+async def _generate(revision: str) -> Path:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        current = (await connection.execute(text("SELECT version_num FROM alembic_version"))).scalars().all()
+        if current != [revision]:
+            raise SystemExit(f"Database is at {current or 'base'}, not {revision}; run `alembic upgrade {revision}` first")
+        metadata = await connection.run_sync(_reflect)
+    await engine.dispose()
+
+    SNAPSHOT_DIR.mkdir(exist_ok=True)
+    path = SNAPSHOT_DIR / f"{revision}_squashed_baseline.py"
+    path.write_text(render_snapshot(metadata, revision))
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a squashed baseline snapshot from a migrated database.")
+    parser.add_argument("revision", help="revision the database at DATABASE_URL is migrated to")
+    args = parser.parse_args()
+    print(f"Wrote {asyncio.run(_generate(args.revision))}")
+
+
+if __name__ == "__main__":
+    main()
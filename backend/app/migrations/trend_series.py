@@ -0,0 +1,256 @@
+"""Precompute the smoothed, downsampled trend series behind ``/sessions/trends/series``.
+
+For every (user, template) with completed sessions, ``user_trends`` (revision
+c8e2a4f61b93) holds the series in completion order as parallel arrays: the
+score, the percentage of the template's maximum, a trailing moving average
+over ``WINDOW`` sessions and an EWMA with smoothing factor ``ALPHA``, both of
+the percentage. ``user_trend_samples`` holds, for each of ``RESOLUTIONS``
+shorter than the series, the positions Largest-Triangle-Three-Buckets keeps,
+so a long history ships as a few hundred points that still show its shape.
+
+A series is recomputed when ``user_template_stats`` (the rollup from
+a3f6d0c9b471) says its sessions changed, i.e. its count or score sum
+differs, or the template's max score did. A batch of series is loaded at once
+and smoothed with NumPy across all of them together. Sessions ordered after a
+series' last one are appended by the API, which falls back to computing the
+whole series itself when the stored part no longer adds up to the rollup, so
+the job only has to keep up, not be current: run it every few minutes from cron, and once with
+``--all`` after deploying c8e2a4f61b93.
+
+    DATABASE_URL=... uv run python -m app.migrations.trend_series
+    DATABASE_URL=... uv run python -m app.migrations.trend_series --all
+
+The API mirrors ``WINDOW`` and ``ALPHA`` when it appends sessions; change
+them in both places.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import text
+
+WINDOW = 5
+ALPHA = 0.2
+RESOLUTIONS = (100, 500)
+
+_NEXT_BATCH = text("""
+    SELECT s.user_id, s.template_id, rt.max_score
+    FROM user_template_stats s
+    JOIN round_templates rt ON rt.id = s.template_id
+    LEFT JOIN user_trends t ON t.user_id = s.user_id AND t.template_id = s.template_id
+    WHERE (s.user_id, s.template_id) > (:after_user, :after_template)
+      AND s.completed_sessions > 0
+      AND (:all OR (t.sessions, t.score_sum, t.max_score)
+                   IS DISTINCT FROM (s.completed_sessions, s.score_sum, rt.max_score))
+    ORDER BY s.user_id, s.template_id
+    LIMIT :batch_size
+""")
+
+# Sessions without a completed_at predate it being set; the API dates them
+# by started_at as well.
+_SESSIONS = text("""
+    SELECT ss.user_id, ss.template_id, ss.id, ss.total_score, coalesce(ss.completed_at, ss.started_at) AS at
+    FROM unnest(CAST(:users AS uuid[]), CAST(:templates AS uuid[])) AS p(user_id, template_id)
+    JOIN scoring_sessions ss ON ss.user_id = p.user_id AND ss.template_id = p.template_id
+    WHERE ss.status = 'completed'
+    ORDER BY ss.user_id, ss.template_id, at, ss.id
+""")
+
+_UPSERT = text("""
+    INSERT INTO user_trends (user_id, template_id, max_score, sessions, score_sum, session_ids, completed_ats,
+                             scores, percentages, moving_avgs, ewmas, computed_through, computed_at)
+    VALUES (:user_id, :template_id, :max_score, :sessions, :score_sum, CAST(:session_ids AS uuid[]),
+            CAST(:completed_ats AS timestamptz[]), CAST(:scores AS integer[]), CAST(:percentages AS real[]),
+            CAST(:moving_avgs AS real[]), CAST(:ewmas AS real[]), :computed_through, now())
+    ON CONFLICT (user_id, template_id) DO UPDATE
+    SET max_score = EXCLUDED.max_score, sessions = EXCLUDED.sessions, score_sum = EXCLUDED.score_sum,
+        session_ids = EXCLUDED.session_ids, completed_ats = EXCLUDED.completed_ats, scores = EXCLUDED.scores,
+        percentages = EXCLUDED.percentages, moving_avgs = EXCLUDED.moving_avgs, ewmas = EXCLUDED.ewmas,
+        computed_through = EXCLUDED.computed_through, computed_at = EXCLUDED.computed_at
+""")
+_DELETE_SAMPLES = text("""
+    DELETE FROM user_trend_samples s
+    USING unnest(CAST(:users AS uuid[]), CAST(:templates AS uuid[])) AS p(user_id, template_id)
+    WHERE s.user_id = p.user_id AND s.template_id = p.template_id
+""")
+_INSERT_SAMPLES = text("""
+    INSERT INTO user_trend_samples (user_id, template_id, points, positions)
+    VALUES (:user_id, :template_id, :points, CAST(:positions AS integer[]))
+""")
+# Series whose last completed session was deleted or abandoned since.
+_DELETE_GONE = text("""
+    DELETE FROM user_trends t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM user_template_stats s
+        WHERE s.user_id = t.user_id AND s.template_id = t.template_id AND s.completed_sessions > 0
+    )
+""")
+
+
+def moving_average(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over up to ``window`` points, restarting at each series.
+
+    ``values`` holds the series back to back; series ``k`` is
+    ``values[starts[k]:starts[k] + lengths[k]]``.
+    """
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    count = np.minimum(end - np.repeat(starts, lengths), window)
+    return (sums[end] - sums[end - count]) / count
+
+
+def ewma(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponentially weighted moving average, seeded with each series' first point.
+
+    The recurrence runs along the series, so this steps through positions
+    and advances every series still that long at once.
+    """
+    out = np.empty_like(values)
+    current = values[starts].copy()
+    out[starts] = current
+    for k in range(1, int(lengths.max(initial=0))):
+        live = lengths > k
+        at = starts[live] + k
+        current[live] = alpha * values[at] + (1 - alpha) * current[live]
+        out[at] = current[live]
+    return out
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions of the ``threshold`` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept. The rest are split into
+    ``threshold - 2`` buckets, and from each bucket LTTB keeps the point
+    forming the largest triangle with the point kept before it and the
+    average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+@dataclass
+class TrendResult:
+    series: int = 0
+    sessions: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+def _write_batch(connection, pairs, rows) -> int:
+    """Smooth and store the series for ``pairs`` from their sessions' ``rows``."""
+    max_scores = {(p.user_id, p.template_id): p.max_score for p in pairs}
+    keys = [(r.user_id, r.template_id) for r in rows]
+    scores = np.array([r.total_score for r in rows], dtype=np.float64)
+    maxes = np.array([max_scores[k] for k in keys], dtype=np.float64)
+    percentages = np.divide(scores * 100, maxes, out=np.zeros_like(scores), where=maxes > 0)
+
+    # The rows come sorted by series, so each series is one run of keys.
+    boundary = np.ones(len(rows), dtype=bool)
+    boundary[1:] = [keys[i] != keys[i - 1] for i in range(1, len(keys))]
+    starts = np.flatnonzero(boundary)
+    lengths = np.diff(np.append(starts, len(rows)))
+    moving = moving_average(percentages, starts, lengths, WINDOW)
+    smoothed = ewma(percentages, starts, lengths, ALPHA)
+    seconds = np.array([r.at.timestamp() for r in rows], dtype=np.float64)
+
+    series, samples = [], []
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        end = start + length
+        user_id, template_id = keys[start]
+        series.append({
+            "user_id": user_id,
+            "template_id": template_id,
+            "max_score": max_scores[(user_id, template_id)],
+            "sessions": length,
+            "score_sum": int(scores[start:end].sum()),
+            "session_ids": [r.id for r in rows[start:end]],
+            "completed_ats": [r.at for r in rows[start:end]],
+            "scores": [r.total_score for r in rows[start:end]],
+            "percentages": percentages[start:end].tolist(),
+            "moving_avgs": moving[start:end].tolist(),
+            "ewmas": smoothed[start:end].tolist(),
+            "computed_through": rows[end - 1].at,
+        })
+        for points in RESOLUTIONS:
+            if length > points:
+                kept = lttb(seconds[start:end], percentages[start:end], points)
+                samples.append({
+                    "user_id": user_id, "template_id": template_id, "points": points,
+                    "positions": (kept + 1).tolist(),  # Postgres arrays are 1-based
+                })
+
+    connection.execute(_DELETE_SAMPLES, {
+        "users": [p.user_id for p in pairs], "templates": [p.template_id for p in pairs],
+    })
+    if series:
+        connection.execute(_UPSERT, series)
+    if samples:
+        connection.execute(_INSERT_SAMPLES, samples)
+    return len(series)
+
+
+def refresh(connection, batch_size: int, rebuild_all: bool) -> TrendResult:
+    """Recompute the stale series (every series with ``rebuild_all``)."""
+    started = time.monotonic()
+    result = TrendResult()
+    after = (uuid.UUID(int=0), uuid.UUID(int=0))
+    while True:
+        pairs = connection.execute(_NEXT_BATCH, {
+            "after_user": after[0], "after_template": after[1], "all": rebuild_all, "batch_size": batch_size,
+        }).all()
+        if not pairs:
+            break
+        after = (pairs[-1].user_id, pairs[-1].template_id)
+        rows = connection.execute(_SESSIONS, {
+            "users": [p.user_id for p in pairs], "templates": [p.template_id for p in pairs],
+        }).all()
+        result.series += _write_batch(connection, pairs, rows)
+        result.sessions += len(rows)
+        connection.commit()
+    result.removed = connection.execute(_DELETE_GONE).rowcount
+    connection.commit()
+    result.seconds = time.monotonic() - started
+    return result
+
+
+async def _run(batch_size: int, rebuild_all: bool) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        result = await connection.run_sync(refresh, batch_size, rebuild_all)
+    await engine.dispose()
+    print(
+        f"Refreshed {result.series:,} trend series ({result.sessions:,} sessions), "
+        f"removed {result.removed:,}, in {result.seconds:.1f}s."
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute smoothed trend series into user_trends.")
+    parser.add_argument("--all", action="store_true", help="recompute every series, not just stale ones")
+    parser.add_argument("--batch-size", type=int, default=200, help="series per batch (default: 200)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size, args.all))
+
+
+if __name__ == "__main__":
+    main()
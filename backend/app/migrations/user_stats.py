@@ -0,0 +1,118 @@
+"""Rebuild the per-user stats rollups from ``scoring_sessions``.
+
+``user_stats`` and ``user_template_stats`` (revision a3f6d0c9b471) hold what
+``/sessions/stats`` used to aggregate over all of a user's sessions on every
+load. A trigger on ``scoring_sessions`` applies each session's contribution
+when it completes, is abandoned or is deleted; in-progress sessions are not
+counted, the API adds those itself. This recomputes both tables from the
+sessions, walking users in id order a batch at a time, one short transaction
+per batch.
+
+Each batch reads the users' sessions ``FOR SHARE`` and writes absolute values:
+a session completing concurrently either waits for the batch and then applies
+its change on top, or committed first and is read in its new state.
+
+    DATABASE_URL=... uv run python -m app.migrations.user_stats
+
+The revision runs the same statements as its backfill; run this after
+repairing data by hand or if the rollups are ever suspected of drifting.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+
+# Both statements see the users to rebuild as ``batch`` (a ``key`` column),
+# as app.migrations.backfill provides it. FOR SHARE can't be combined with
+# GROUP BY, hence the lateral subqueries; the status filter is applied after
+# locking so a session that settled since the statement's snapshot counts.
+REBUILD_USER_STATS = """
+    INSERT INTO user_stats AS u (user_id, sessions, completed_sessions, arrows, x_count)
+    SELECT batch.key, count(s.status), count(*) FILTER (WHERE s.status = 'completed'),
+           coalesce(sum(s.total_arrows), 0), coalesce(sum(s.total_x_count), 0)
+    FROM batch
+    LEFT JOIN LATERAL (
+        SELECT status, total_arrows, total_x_count FROM scoring_sessions
+        WHERE user_id = batch.key
+        FOR SHARE
+    ) s ON s.status <> 'in_progress'
+    GROUP BY batch.key
+    ON CONFLICT (user_id) DO UPDATE
+    SET sessions = EXCLUDED.sessions, completed_sessions = EXCLUDED.completed_sessions,
+        arrows = EXCLUDED.arrows, x_count = EXCLUDED.x_count
+"""
+
+REBUILD_TEMPLATE_STATS = """
+    INSERT INTO user_template_stats AS t (user_id, template_id, completed_sessions, score_sum, best_score, best_at)
+    SELECT s.user_id, s.template_id, count(*), sum(s.total_score), max(s.total_score),
+           (array_agg(s.completed_at ORDER BY s.total_score DESC, s.completed_at DESC NULLS LAST))[1]
+    FROM batch
+    JOIN LATERAL (
+        SELECT user_id, template_id, status, total_score, completed_at FROM scoring_sessions
+        WHERE user_id = batch.key
+        FOR SHARE
+    ) s ON s.status = 'completed'
+    GROUP BY s.user_id, s.template_id
+    ON CONFLICT (user_id, template_id) DO UPDATE
+    SET completed_sessions = EXCLUDED.completed_sessions, score_sum = EXCLUDED.score_sum,
+        best_score = EXCLUDED.best_score, best_at = EXCLUDED.best_at
+"""
+
+_BATCH = "WITH batch AS (SELECT unnest(CAST(:ids AS uuid[])) AS key) "
+
+_NEXT_BATCH = text("SELECT id FROM users WHERE id > :after ORDER BY id LIMIT :batch_size")
+
+# Templates the user no longer has a completed session of.
+_DELETE_STALE = text("""
+    DELETE FROM user_template_stats t
+    WHERE t.user_id = ANY(:ids)
+      AND NOT EXISTS (
+          SELECT 1 FROM scoring_sessions s
+          WHERE s.user_id = t.user_id AND s.template_id = t.template_id AND s.status = 'completed'
+      )
+""")
+_USER_STATS = text(_BATCH + REBUILD_USER_STATS)
+_TEMPLATE_STATS = text(_BATCH + REBUILD_TEMPLATE_STATS)
+
+
+def rebuild(connection, batch_size: int) -> tuple[int, float]:
+    """Recompute every user's rollup rows. Returns (users, seconds)."""
+    started = time.monotonic()
+    after = uuid.UUID(int=0)
+    users = 0
+    while True:
+        ids = connection.execute(_NEXT_BATCH, {"after": after, "batch_size": batch_size}).scalars().all()
+        if not ids:
+            break
+        users += len(ids)
+        after = ids[-1]
+        connection.execute(_DELETE_STALE, {"ids": ids})
+        connection.execute(_USER_STATS, {"ids": ids})
+        connection.execute(_TEMPLATE_STATS, {"ids": ids})
+        connection.commit()
+    return users, time.monotonic() - started
+
+
+async def _run(batch_size: int) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as connection:
+        users, seconds = await connection.run_sync(rebuild, batch_size)
+    await engine.dispose()
+    print(f"Rebuilt stats for {users:,} users in {seconds:.1f}s.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild user_stats and user_template_stats from the sessions.")
+    parser.add_argument("--batch-size", type=int, default=200, help="users per batch (default: 200)")
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
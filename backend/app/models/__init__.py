@@ -1,6 +1,6 @@
 from app.models.user import User
 from app.models.round_template import RoundTemplate, RoundTemplateStage
-from app.models.scoring import ScoringSession, End, Arrow, PersonalRecord
+from app.models.scoring import ScoringSession, End, EndEvent, SessionArchive, ScoreCode, PersonalRecord, UserStats, UserTemplateStats, UserTrend, UserTrendSample, TemplateScoreHistogram, TemplateHandicapTable
 from app.models.equipment import Equipment
 from app.models.setup_profile import SetupProfile, SetupEquipment
 from app.models.club import Club, ClubMember, ClubInvite, ClubEvent, ClubEventParticipant, ClubTeam, ClubTeamMember, ClubSharedRound
@@ -17,8 +17,16 @@ __all__ = [
     "RoundTemplateStage",
     "ScoringSession",
     "End",
-    "Arrow",
+    "EndEvent",
+    "SessionArchive",
+    "ScoreCode",
     "PersonalRecord",
+    "UserStats",
+    "UserTemplateStats",
+    "UserTrend",
+    "UserTrendSample",
+    "TemplateScoreHistogram",
+    "TemplateHandicapTable",
     "Equipment",
     "SetupProfile",
     "SetupEquipment",
@@ -6,19 +6,23 @@ from sqlalchemy import JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, uuid7
 
 
 class RoundTemplate(Base):
     __tablename__ = "round_templates"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     organization: Mapped[str] = mapped_column(String(50), nullable=False)  # WA, NFAA, Lancaster, ASA, IBO
     description: Mapped[str | None] = mapped_column(Text)
     is_official: Mapped[bool] = mapped_column(default=True)
-    created_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
+    created_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Sums over the stages, kept up to date by a trigger on round_template_stages.
+    max_score: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    total_ends: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    total_arrows: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
     stages: Mapped[list["RoundTemplateStage"]] = relationship(
         back_populates="template", lazy="selectin", order_by="RoundTemplateStage.stage_order"
@@ -28,7 +32,7 @@ class RoundTemplate(Base):
 class RoundTemplateStage(Base):
     __tablename__ = "round_template_stages"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id", ondelete="CASCADE"), nullable=False, index=True)
     stage_order: Mapped[int] = mapped_column(Integer, nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -1,26 +1,43 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import CheckConstraint, String, Integer, Float, DateTime, ForeignKey, UniqueConstraint, func, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, CheckConstraint, ForeignKeyConstraint, Identity, Index, String, Integer, SmallInteger, DateTime, ForeignKey, UniqueConstraint, func, text, Text
+from sqlalchemy.dialects.postgresql import ARRAY, REAL, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, uuid7
 
 
 class ScoringSession(Base):
     __tablename__ = "scoring_sessions"
     __table_args__ = (
         CheckConstraint("status IN ('in_progress', 'completed', 'abandoned')", name="ck_scoring_session_status"),
+        # The stats endpoint's per-session reads (see a3f6d0c9b471).
+        Index("ix_scoring_sessions_in_progress", "user_id", postgresql_where=text("status = 'in_progress'")),
+        Index(
+            "ix_scoring_sessions_completed", "user_id", text("completed_at DESC NULLS LAST"),
+            postgresql_where=text("status = 'completed'"),
+        ),
+        # Room for HOT updates of the totals (see 6e1b8d4f2a90); keep them unindexed.
+        {
+            "postgresql_with": {
+                "fillfactor": 80,
+                "autovacuum_vacuum_scale_factor": 0.02,
+                "autovacuum_vacuum_threshold": 500,
+                "autovacuum_analyze_scale_factor": 0.05,
+            }
+        },
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=func.uuid_generate_v7())
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id"), nullable=False, index=True)
     status: Mapped[str] = mapped_column(String(20), default="in_progress")
     total_score: Mapped[int] = mapped_column(Integer, default=0)
     total_x_count: Mapped[int] = mapped_column(Integer, default=0)
     total_arrows: Mapped[int] = mapped_column(Integer, default=0)
+    # Sequence number of the session's latest end_events row; allocated by the database.
+    last_event_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
     setup_profile_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("setup_profiles.id"), nullable=True, index=True)
     notes: Mapped[str | None] = mapped_column(Text)
     location: Mapped[str | None] = mapped_column(String(200))
@@ -37,38 +54,94 @@ class ScoringSession(Base):
 
 class End(Base):
     __tablename__ = "ends"
+    # Children ends_p00..ends_p15 are created by the migration, not the models.
+    __table_args__ = (
+        # A unique index on a partitioned table must include the partition
+        # key; this one finds an end by its id within its session.
+        UniqueConstraint("session_id", "id", name="ends_session_id_id_key"),
+        {"postgresql_partition_by": "HASH (session_id)"},
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("scoring_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Keyed by (session_id, end_number); id is the end's public id (API,
+    # session_end attachments).
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("scoring_sessions.id", ondelete="CASCADE"), primary_key=True)
+    end_number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, default=uuid7, server_default=func.uuid_generate_v7(), index=True)
     stage_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("round_template_stages.id", ondelete="SET NULL"), nullable=True, index=True)
-    end_number: Mapped[int] = mapped_column(Integer, nullable=False)
     end_total: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Arrows packed as parallel arrays; element n is arrow n. The ``arrows``
+    # view unpacks them into the old one-row-per-arrow shape.
+    arrow_codes: Mapped[list[int | None]] = mapped_column(ARRAY(SmallInteger), nullable=False, server_default="{}")  # score_codes.code
+    arrow_scores: Mapped[list[int | None]] = mapped_column(ARRAY(SmallInteger), nullable=False, server_default="{}")  # numeric equivalents
+    arrow_x: Mapped[list[float | None]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")  # optional target positions
+    arrow_y: Mapped[list[float | None]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")
 
     session: Mapped["ScoringSession"] = relationship(back_populates="ends")
     stage: Mapped["RoundTemplateStage | None"] = relationship(lazy="selectin")
-    arrows: Mapped[list["Arrow"]] = relationship(back_populates="end", lazy="selectin", order_by="Arrow.arrow_number")
-
 
-class Arrow(Base):
-    __tablename__ = "arrows"
-
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    end_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("ends.id", ondelete="CASCADE"), nullable=False, index=True)
-    arrow_number: Mapped[int] = mapped_column(Integer, nullable=False)
-    score_value: Mapped[str] = mapped_column(String(5), nullable=False)  # "X", "10", "M", etc.
-    score_numeric: Mapped[int] = mapped_column(Integer, nullable=False)  # numeric equivalent
-    x_pos: Mapped[float | None] = mapped_column(Float)  # optional target position
-    y_pos: Mapped[float | None] = mapped_column(Float)
-
-    end: Mapped["End"] = relationship(back_populates="arrows")
 
+# Append-only log of submits and undos; inserting an event applies it to ends
+# (see 9c2f5a7e1d36). Sync clients replay the events after a seq.
+class EndEvent(Base):
+    __tablename__ = "end_events"
+    __table_args__ = (
+        CheckConstraint("kind IN ('submit', 'undo')", name="ck_end_event_kind"),
+        # Children end_events_p00..end_events_p15 are created by the migration.
+        {"postgresql_partition_by": "HASH (session_id)"},
+    )
 
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("scoring_sessions.id", ondelete="CASCADE"), primary_key=True)
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)  # set by the insert trigger
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)
+    end_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    # The end's data, for submits only.
+    stage_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    end_total: Mapped[int | None] = mapped_column(Integer)
+    arrow_codes: Mapped[list[int | None] | None] = mapped_column(ARRAY(SmallInteger))
+    arrow_scores: Mapped[list[int | None] | None] = mapped_column(ARRAY(SmallInteger))
+    arrow_x: Mapped[list[float | None] | None] = mapped_column(ARRAY(REAL))
+    arrow_y: Mapped[list[float | None] | None] = mapped_column(ARRAY(REAL))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# An old completed session's ends packed into one compressed row, a column per
+# field in end order; the session_ends view unpacks them (see 4b8e2c6f0a17).
+class SessionArchive(Base):
+    __tablename__ = "session_archives"
+    __table_args__ = {"postgresql_with": {"toast_tuple_target": 128}}
+
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("scoring_sessions.id", ondelete="CASCADE"), primary_key=True)
+    end_numbers: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False, server_default="{}")
+    end_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default="{}")
+    stage_ids: Mapped[list[uuid.UUID | None]] = mapped_column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default="{}")
+    end_totals: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False, server_default="{}")
+    created_ats: Mapped[list[datetime]] = mapped_column(ARRAY(DateTime(timezone=True)), nullable=False, server_default="{}")
+    # Arrows of all the ends concatenated; arrow_counts[n] of them belong to end n.
+    arrow_counts: Mapped[list[int]] = mapped_column(ARRAY(SmallInteger), nullable=False, server_default="{}")
+    arrow_codes: Mapped[list[int | None]] = mapped_column(ARRAY(SmallInteger), nullable=False, server_default="{}")
+    arrow_scores: Mapped[list[int | None]] = mapped_column(ARRAY(SmallInteger), nullable=False, server_default="{}")
+    arrow_x: Mapped[list[float | None]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")
+    arrow_y: Mapped[list[float | None]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Dictionary for arrow score values: ends store the code, not the string.
+class ScoreCode(Base):
+    __tablename__ = "score_codes"
+
+    code: Mapped[int] = mapped_column(SmallInteger, Identity(), primary_key=True)
+    value: Mapped[str] = mapped_column(String(5), nullable=False, unique=True)  # "X", "10", "M", etc.
+
+
+# Written only by a trigger on scoring_sessions (see d5f2b8e4a617); rebuild
+# with app.migrations.personal_records.
 class PersonalRecord(Base):
     __tablename__ = "personal_records"
     __table_args__ = (UniqueConstraint("user_id", "template_id", name="uq_user_template_pr"),)
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id"), nullable=False, index=True)
     session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("scoring_sessions.id"), nullable=False, index=True)
@@ -77,3 +150,94 @@ class PersonalRecord(Base):
 
     template: Mapped["RoundTemplate"] = relationship(lazy="selectin")
     session: Mapped["ScoringSession"] = relationship(lazy="selectin")
+
+
+# Rollups of the user's completed and abandoned sessions for /sessions/stats,
+# maintained by a trigger on scoring_sessions (see a3f6d0c9b471).
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    sessions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    completed_sessions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    arrows: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    x_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+
+class UserTemplateStats(Base):
+    __tablename__ = "user_template_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id", ondelete="CASCADE"), primary_key=True)
+    completed_sessions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    score_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    # Highest total_score and when it was shot; NULL once no completed session is left.
+    best_score: Mapped[int | None] = mapped_column(Integer)
+    best_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+# A user's completed sessions of one template in completion order, with the
+# percentage smoothed; app.migrations.trend_series computes it (see c8e2a4f61b93).
+class UserTrend(Base):
+    __tablename__ = "user_trends"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id", ondelete="CASCADE"), primary_key=True)
+    # What the series was computed from, to tell when it is stale.
+    max_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    sessions: Mapped[int] = mapped_column(Integer, nullable=False)
+    score_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    session_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default="{}")
+    completed_ats: Mapped[list[datetime]] = mapped_column(ARRAY(DateTime(timezone=True)), nullable=False, server_default="{}")
+    scores: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False, server_default="{}")
+    percentages: Mapped[list[float]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")
+    moving_avgs: Mapped[list[float]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")
+    ewmas: Mapped[list[float]] = mapped_column(ARRAY(REAL), nullable=False, server_default="{}")
+    # Sessions completed after this are not in the arrays yet.
+    computed_through: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# The 1-based positions in a user_trends series that its LTTB downsample to
+# ``points`` points keeps; only for series longer than that.
+class UserTrendSample(Base):
+    __tablename__ = "user_trend_samples"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "template_id"], ["user_trends.user_id", "user_trends.template_id"], ondelete="CASCADE",
+        ),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    points: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    positions: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+
+# Cumulative counts of the template's completed sessions by score bin, for
+# percentile ranks; app.migrations.score_histograms builds it (see e7a3c1d9f528).
+class TemplateScoreHistogram(Base):
+    __tablename__ = "template_score_histograms"
+
+    template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id", ondelete="CASCADE"), primary_key=True)
+    # What the histogram was built from, to tell when it is stale.
+    max_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    sessions: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    score_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    bin_width: Mapped[int] = mapped_column(Integer, nullable=False)
+    # cumulative[k + 1] sessions scored below bin k (1-based in Postgres).
+    cumulative: Mapped[list[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Expected score per Archery GB handicap for the template's stages;
+# app.migrations.handicap_tables computes it (see f2c6b8a4d093).
+class TemplateHandicapTable(Base):
+    __tablename__ = "template_handicap_tables"
+
+    template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("round_templates.id", ondelete="CASCADE"), primary_key=True)
+    # Fingerprint of the stages, to tell when it is stale.
+    stages_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    # scores[h + 1] is the score for handicap h, 0..150 (1-based in Postgres).
+    scores: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -289,6 +289,40 @@ def test_undo_last_end_not_in_progress(client, auth_headers, create_session):
     assert resp.status_code == 422
 
 
+# ── End Events ────────────────────────────────────────────────────────
+
+
+def test_end_events_replay(client, auth_headers, create_session):
+    """GET /api/v1/sessions/{id}/events?after=N returns the submits and undos after N."""
+    session = create_session()
+    stage_id = session["template"]["stages"][0]["id"]
+    baseline = client.get(f"/api/v1/sessions/{session['id']}", headers=auth_headers).json()["last_event_seq"]
+
+    _submit_end(client, session["id"], stage_id, ["X", "10", "9"], auth_headers)
+    _submit_end(client, session["id"], stage_id, ["8", "7", "6"], auth_headers)
+    client.delete(f"/api/v1/sessions/{session['id']}/ends/last", headers=auth_headers)
+
+    resp = client.get(f"/api/v1/sessions/{session['id']}/events", params={"after": baseline}, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [e["kind"] for e in data["events"]] == ["submit", "submit", "undo"]
+    assert [e["seq"] for e in data["events"]] == [baseline + 1, baseline + 2, baseline + 3]
+    assert data["last_seq"] == baseline + 3
+    assert data["events"][0]["end"]["end_total"] == 29
+    assert [a["score_value"] for a in data["events"][0]["end"]["arrows"]] == ["X", "10", "9"]
+    assert data["events"][2]["end_number"] == 2
+    assert data["events"][2]["end"] is None
+
+    resp = client.get(f"/api/v1/sessions/{session['id']}/events", params={"after": baseline + 3}, headers=auth_headers)
+    assert resp.json() == {"last_seq": baseline + 3, "events": []}
+
+
+def test_end_events_not_found(client, auth_headers):
+    """GET events for nonexistent session returns 404."""
+    resp = client.get(f"/api/v1/sessions/{uuid.uuid4()}/events", headers=auth_headers)
+    assert resp.status_code == 404
+
+
 # ── Complete Session ──────────────────────────────────────────────────
 
 
@@ -456,6 +490,31 @@ def test_stats_with_completed_session(client, auth_headers, create_round):
     assert "count" in avg
 
 
+def test_stats_follow_session_lifecycle(client, auth_headers, create_round):
+    """GET /api/v1/sessions/stats counts in-progress and abandoned sessions and forgets deleted ones."""
+    rnd = create_round()
+    sessions = []
+    for values in (["X", "10", "9"], ["9", "9", "8"], ["10", "10", "10"]):
+        session = client.post("/api/v1/sessions", json={"template_id": rnd["id"]}, headers=auth_headers).json()
+        _submit_end(client, session["id"], session["template"]["stages"][0]["id"], values, auth_headers)
+        sessions.append(session)
+    client.post(f"/api/v1/sessions/{sessions[0]['id']}/complete", headers=auth_headers)
+    client.post(f"/api/v1/sessions/{sessions[1]['id']}/complete", headers=auth_headers)
+    client.post(f"/api/v1/sessions/{sessions[2]['id']}/abandon", headers=auth_headers)
+
+    before = client.get("/api/v1/sessions/stats", headers=auth_headers).json()
+    assert before["personal_best_score"] >= 29
+    client.delete(f"/api/v1/sessions/{sessions[0]['id']}", headers=auth_headers)
+    in_progress = client.post("/api/v1/sessions", json={"template_id": rnd["id"]}, headers=auth_headers).json()
+    _submit_end(client, in_progress["id"], in_progress["template"]["stages"][0]["id"], ["X", "X", "M"], auth_headers)
+
+    after = client.get("/api/v1/sessions/stats", headers=auth_headers).json()
+    assert after["total_sessions"] == before["total_sessions"]
+    assert after["completed_sessions"] == before["completed_sessions"] - 1
+    assert after["total_arrows"] == before["total_arrows"]
+    assert after["total_x_count"] == before["total_x_count"] + 1
+
+
 def test_stats_unauthenticated(client):
     """GET /api/v1/sessions/stats without auth returns 401."""
     resp = client.get("/api/v1/sessions/stats")
@@ -493,6 +552,76 @@ def test_personal_records_after_completion(client, auth_headers, create_round):
     assert "session_id" in pr
 
 
+def test_personal_record_replaced_only_by_higher_score(client, auth_headers, create_round):
+    """A tie or lower score keeps the record; a higher one takes it."""
+    rnd = create_round()
+
+    def complete(values):
+        session = client.post("/api/v1/sessions", json={"template_id": rnd["id"]}, headers=auth_headers).json()
+        stage_id = session["template"]["stages"][0]["id"]
+        _submit_end(client, session["id"], stage_id, values, auth_headers)
+        resp = client.post(f"/api/v1/sessions/{session['id']}/complete", headers=auth_headers)
+        assert resp.status_code == 200
+        return session["id"], resp.json()["is_personal_best"]
+
+    def record():
+        records = client.get("/api/v1/sessions/personal-records", headers=auth_headers).json()
+        return next(pr for pr in records if pr["template_name"] == rnd["name"])
+
+    first, is_best = complete(["9", "9", "9"])
+    assert is_best is True
+    _, is_best = complete(["9", "9", "9"])
+    assert is_best is False
+    _, is_best = complete(["8", "8", "8"])
+    assert is_best is False
+    assert (record()["session_id"], record()["score"]) == (first, 27)
+
+    best, is_best = complete(["10", "10", "10"])
+    assert is_best is True
+    assert (record()["session_id"], record()["score"]) == (best, 30)
+
+
+def test_session_percentile(client, auth_headers, create_round):
+    """GET /api/v1/sessions/{id}/percentile ranks completed sessions only."""
+    rnd = create_round()
+    session = client.post("/api/v1/sessions", json={"template_id": rnd["id"]}, headers=auth_headers).json()
+    stage_id = session["template"]["stages"][0]["id"]
+    _submit_end(client, session["id"], stage_id, ["10", "9", "8"], auth_headers)
+
+    resp = client.get(f"/api/v1/sessions/{session['id']}/percentile", headers=auth_headers)
+    assert resp.status_code == 422
+
+    client.post(f"/api/v1/sessions/{session['id']}/complete", headers=auth_headers)
+    resp = client.get(f"/api/v1/sessions/{session['id']}/percentile", headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["session_id"] == session["id"]
+    assert data["total_score"] == 27
+    # Null until the nightly histogram job has covered the template.
+    assert "percentile" in data
+    assert "top_percent" in data
+
+
+def test_session_handicap(client, auth_headers, create_round):
+    """GET /api/v1/sessions/{id}/handicap rates completed sessions only."""
+    rnd = create_round()
+    session = client.post("/api/v1/sessions", json={"template_id": rnd["id"]}, headers=auth_headers).json()
+    stage_id = session["template"]["stages"][0]["id"]
+    _submit_end(client, session["id"], stage_id, ["10", "9", "8"], auth_headers)
+
+    resp = client.get(f"/api/v1/sessions/{session['id']}/handicap", headers=auth_headers)
+    assert resp.status_code == 422
+
+    client.post(f"/api/v1/sessions/{session['id']}/complete", headers=auth_headers)
+    resp = client.get(f"/api/v1/sessions/{session['id']}/handicap", headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["session_id"] == session["id"]
+    assert data["total_score"] == 27
+    # Null until the handicap table job has covered the template.
+    assert "handicap" in data
+
+
 def test_personal_records_unauthenticated(client):
     """GET /api/v1/sessions/personal-records without auth returns 401."""
     resp = client.get("/api/v1/sessions/personal-records")
@@ -537,6 +666,38 @@ def test_trends_unauthenticated(client):
     assert resp.status_code == 401
 
 
+def test_trend_series(client, auth_headers, create_round):
+    """GET /api/v1/sessions/trends/series smooths one template's completed sessions."""
+    rnd = create_round()
+    for values in (["10", "10", "10"], ["9", "9", "9"]):
+        session = client.post("/api/v1/sessions", json={"template_id": rnd["id"]}, headers=auth_headers).json()
+        _submit_end(client, session["id"], session["template"]["stages"][0]["id"], values, auth_headers)
+        client.post(f"/api/v1/sessions/{session['id']}/complete", headers=auth_headers)
+
+    resp = client.get("/api/v1/sessions/trends/series", params={"template_id": rnd["id"], "points": 100}, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["template_id"] == rnd["id"]
+    assert data["max_score"] == 300
+    assert data["total_points"] == 2
+    first, second = data["points"]
+    assert (first["percentage"], first["moving_avg"], first["ewma"]) == (10.0, 10.0, 10.0)
+    assert second["total_score"] == 27
+    assert second["moving_avg"] == 9.5
+    assert second["ewma"] == 9.8
+
+
+def test_trend_series_invalid_params(client, auth_headers, create_round):
+    """GET /api/v1/sessions/trends/series rejects a bad template_id or an unsupported points."""
+    rnd = create_round()
+    resp = client.get("/api/v1/sessions/trends/series", params={"template_id": "bogus"}, headers=auth_headers)
+    assert resp.status_code == 422
+    resp = client.get("/api/v1/sessions/trends/series", params={"template_id": rnd["id"], "points": 250}, headers=auth_headers)
+    assert resp.status_code == 422
+    resp = client.get("/api/v1/sessions/trends/series", params={"template_id": str(uuid.uuid4())}, headers=auth_headers)
+    assert resp.status_code == 404
+
+
 # ── CSV Export (Single Session) ───────────────────────────────────────
 
 